@@ -3,12 +3,69 @@ import boto3
 import os
 import urllib.parse
 import time
+from botocore.exceptions import ClientError
 
 # Initialize AWS clients
 s3 = boto3.client('s3')
 textract = boto3.client('textract')
 bedrock = boto3.client('bedrock-runtime', region_name='us-east-2')  # Bedrock requires explicit region
 
+# Pointer objects naming the newest rewritten resume, one per upload session and one for all uploads
+# (the server reads them from the same keys, see sourcecode/server/utils/resume_index.py)
+LATEST_POINTER_PREFIX = 'latest-pointers/'
+GLOBAL_POINTER = '_global'
+POINTER_UPDATE_ATTEMPTS = 5
+
+
+def result_key_for(upload_key):
+    """
+    Key the rewritten resume of an upload is saved under: textract-output/<name>.pdf becomes
+    rewritten-resumes/<name>.json. The server derives the same key to fetch it directly
+    (see result_key_for in sourcecode/server/utils/resume_index.py)
+    """
+    name = upload_key[len('textract-output/'):] if upload_key.startswith('textract-output/') else upload_key
+    stem, dot, extension = name.rpartition('.')
+    if dot and extension.lower() == 'pdf':
+        name = f"{stem}.json"
+    return f"rewritten-resumes/{name}"
+
+
+def update_latest_pointer(bucket, session_id, pointer):
+    """
+    Point the latest-resume pointer of a session at a new resume, unless it already names a newer upload
+    The write is conditional on the pointer not having changed since it was read, so two uploads
+    finishing together cannot overwrite each other's update
+    """
+    pointer_key = f"{LATEST_POINTER_PREFIX}{session_id or GLOBAL_POINTER}.json"
+    for attempt in range(POINTER_UPDATE_ATTEMPTS):
+        try:
+            current = s3.get_object(Bucket=bucket, Key=pointer_key)
+            if json.loads(current['Body'].read()).get('uploadedAt', 0) > pointer['uploadedAt']:
+                print(f"Pointer {pointer_key} already names a newer upload")
+                return False
+            condition = {'IfMatch': current['ETag']}
+        except ClientError as e:
+            if e.response['Error']['Code'] not in ('NoSuchKey', '404'):
+                raise
+            condition = {'IfNoneMatch': '*'}
+
+        try:
+            s3.put_object(
+                Bucket=bucket,
+                Key=pointer_key,
+                Body=json.dumps(pointer).encode('utf-8'),
+                ContentType='application/json',
+                **condition
+            )
+            print(f"Updated pointer {pointer_key} to {pointer['key']}")
+            return True
+        except ClientError as e:
+            # Another invocation updated the pointer first; read it again
+            if e.response['Error']['Code'] not in ('PreconditionFailed', 'ConditionalRequestConflict'):
+                raise
+    print(f"Gave up updating pointer {pointer_key} after {POINTER_UPDATE_ATTEMPTS} attempts")
+    return False
+
 
 def lambda_handler(event, context):
     for record in event['Records']:
@@ -18,6 +75,10 @@ def lambda_handler(event, context):
         # Initialize job description
         job_description = ""
 
+        # Session the upload belongs to and its upload time, for the latest-resume pointers
+        session_id = None
+        uploaded_at = time.time()
+
         # Get the S3 object metadata to check for job description
         try:
             # Get the S3 object metadata
@@ -26,6 +87,10 @@ def lambda_handler(event, context):
             # Log all metadata for debugging
             print(f"S3 object metadata: {response.get('Metadata', {})}")
 
+            session_id = response.get('Metadata', {}).get('session-id')
+            if 'LastModified' in response:
+                uploaded_at = response['LastModified'].timestamp()
+
             # Check if job description is directly in the metadata
             if 'Metadata' in response and 'job-description' in response['Metadata']:
                 # URL-decode the job description
@@ -233,9 +298,9 @@ def lambda_handler(event, context):
                     formatted_resume = json.loads(rewritten_text)
                     # Save formatted JSON to S3
                     output_bucket = os.environ['OUTPUT_BUCKET']
-                    new_key = key.replace('textract-output/', 'rewritten-resumes/').replace('.pdf', '.json')
+                    new_key = result_key_for(key)
 
-                    s3.put_object(
+                    put_response = s3.put_object(
                         Bucket=output_bucket,
                         Key=new_key,
                         Body=json.dumps(formatted_resume, indent=2).encode('utf-8'),
@@ -244,6 +309,22 @@ def lambda_handler(event, context):
 
                     print(f"Saved formatted resume to S3 at {new_key}.")
 
+                    # Let the server find the latest resume with a single read instead of listing the bucket
+                    pointer = {
+                        'key': new_key,
+                        'etag': put_response.get('ETag'),
+                        'uploadKey': key,
+                        'uploadedAt': uploaded_at,
+                        'updatedAt': time.time()
+                    }
+                    try:
+                        if session_id:
+                            update_latest_pointer(output_bucket, session_id, pointer)
+                        update_latest_pointer(output_bucket, None, pointer)
+                    except Exception as e:
+                        # The resume is saved; the server falls back to its index without a pointer
+                        print(f"Error updating latest pointers: {e}")
+
                     return {
                         'statusCode': 200,
                         'body': json.dumps({
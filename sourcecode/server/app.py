@@ -2,7 +2,7 @@ import os
 import json
 import logging
 from datetime import datetime
-from flask import Flask, request, jsonify, send_file
+from flask import Flask, Response, request, jsonify, send_file
 from flask_cors import CORS
 from werkzeug.utils import secure_filename
 import boto3
@@ -14,8 +14,16 @@ from pathlib import Path
 
 # Import controllers
 from controllers.resume_controller import upload_resume, get_rewritten_resume
-from controllers.aws_controller import list_rewritten_resumes, get_latest_rewritten_resume
-from controllers.generate_controller import generate_resume, generate_pdf, generate_docx, generate_txt
+from controllers.aws_controller import list_rewritten_resumes, get_latest_rewritten_resume, resume_index
+from controllers.generate_controller import generate_resume, generate_pdf, generate_docx, generate_txt, pdf_render_pool
+from controllers.preflight_controller import preflight_resume
+from controllers.preview_controller import get_preview, get_preview_batch
+from controllers.html_pdf_controller import generate_html_pdf, html_render_pool
+from controllers.artifacts_controller import get_artifact
+from controllers.jobs_controller import create_generation_job, get_generation_job, get_generation_job_result, generation_jobs
+from models.resume import load_resume
+from utils.compression import Compressor
+from utils.spool import create_spool
 
 # Configure logging
 logging.basicConfig(level=logging.INFO,
@@ -70,6 +78,9 @@ def format_date(date_string):
 app = Flask(__name__)
 CORS(app)  # Enable CORS for all routes
 
+# Compress JSON and text responses for clients that accept gzip or brotli
+compressor = Compressor(app)
+
 # Configure maximum request size (50MB)
 app.config['MAX_CONTENT_LENGTH'] = 50 * 1024 * 1024
 
@@ -77,6 +88,9 @@ app.config['MAX_CONTENT_LENGTH'] = 50 * 1024 * 1024
 temp_dir = os.path.join(os.path.dirname(__file__), 'temp')
 os.makedirs(temp_dir, exist_ok=True)
 
+# Files written for a single download are spooled, deleted once sent and capped in size and age
+spool = create_spool('temp', 'SPOOL', os.path.join(temp_dir, 'spool'), default_max_bytes=256 * 1024 * 1024, default_max_age=600)
+
 # Middleware to log request details
 @app.before_request
 def log_request_info():
@@ -97,7 +111,7 @@ def handle_get_rewritten():
 
 @app.route('/list-rewritten-resumes', methods=['GET'])
 def handle_list_rewritten():
-    return list_rewritten_resumes()
+    return list_rewritten_resumes(request)
 
 @app.route('/latest-rewritten-resume', methods=['GET'])
 def handle_latest_rewritten():
@@ -107,6 +121,56 @@ def handle_latest_rewritten():
 def handle_generate():
     return generate_resume(request)
 
+@app.route('/generate/preflight', methods=['POST'])
+def handle_generate_preflight():
+    return preflight_resume(request)
+
+@app.route('/simple-pdf', methods=['POST'])
+def handle_simple_pdf():
+    return generate_html_pdf(request)
+
+@app.route('/artifacts/<key>.<extension>', methods=['GET', 'HEAD'])
+def handle_get_artifact(key, extension):
+    return get_artifact(key, extension, request)
+
+@app.route('/preview', methods=['POST'])
+def handle_preview():
+    return get_preview(request)
+
+@app.route('/preview/batch', methods=['POST'])
+def handle_preview_batch():
+    return get_preview_batch(request)
+
+@app.route('/generate/jobs', methods=['POST'])
+def handle_create_generation_job():
+    return create_generation_job(request)
+
+@app.route('/generate/jobs/<job_id>', methods=['GET'])
+def handle_get_generation_job(job_id):
+    return get_generation_job(job_id)
+
+@app.route('/generate/jobs/<job_id>/result', methods=['GET'])
+def handle_get_generation_job_result(job_id):
+    return get_generation_job_result(job_id)
+
+@app.route('/render-pool/stats', methods=['GET'])
+def handle_render_pool_stats():
+    stats = pdf_render_pool.stats()
+    stats['html'] = html_render_pool.stats()
+    return jsonify(stats)
+
+@app.route('/compression/stats', methods=['GET'])
+def handle_compression_stats():
+    return jsonify(compressor.stats())
+
+@app.route('/spool/stats', methods=['GET'])
+def handle_spool_stats():
+    return jsonify({'temp': spool.stats(), 'jobs': generation_jobs.spool.stats()})
+
+@app.route('/resume-index/stats', methods=['GET'])
+def handle_resume_index_stats():
+    return jsonify(resume_index.stats())
+
 @app.route('/check-ats-compatibility', methods=['POST'])
 def handle_ats_check():
     try:
@@ -123,8 +187,9 @@ def handle_ats_check():
             return jsonify({'error': 'No resume data provided'}), 400
 
         # Perform ATS compatibility check using the improved controller
+        # The model is memoized, so a following /generate for the same resume skips normalization
         from controllers.improved_ats_controller import check_ats_compatibility as improved_check_ats_compatibility
-        result = improved_check_ats_compatibility(resume_data, job_description)
+        result = improved_check_ats_compatibility(load_resume(resume_data), job_description)
 
         return jsonify({
             'success': True,
@@ -143,13 +208,8 @@ def very_simple_pdf():
     try:
         logger.info('Very simple PDF endpoint called')
 
-        # Create a temporary directory for the PDF
-        temp_dir = os.path.join(os.path.dirname(__file__), 'temp')
-        os.makedirs(temp_dir, exist_ok=True)
-
-        # Generate a unique filename
-        timestamp = int(datetime.now().timestamp())
-        output_path = os.path.join(temp_dir, f"simple-resume-{timestamp}.pdf")
+        # Allocate the PDF in the spool; it is deleted once it has been sent
+        output_path = spool.allocate('.pdf', name=f"simple-resume-{uuid.uuid4().hex}")
 
         # Create a simple PDF using ReportLab
         from reportlab.pdfgen import canvas
@@ -165,16 +225,15 @@ def very_simple_pdf():
         c.setFont("Helvetica", 10)
         c.drawString(100, 600, f"Generated at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
         c.save()
+        spool.commit(output_path)
 
         logger.info('Simple PDF created successfully')
 
-        # Send the file
-        return send_file(
-            output_path,
-            as_attachment=True,
-            download_name="simple-resume.pdf",
-            mimetype="application/pdf"
-        )
+        # Stream the file and delete it after the last chunk
+        response = Response(spool.stream(output_path), mimetype="application/pdf")
+        response.headers['Content-Disposition'] = 'attachment; filename=simple-resume.pdf'
+        response.headers['Content-Length'] = str(os.path.getsize(output_path))
+        return response
     except Exception as error:
         logger.error(f'Error in very simple PDF endpoint: {error}')
         return jsonify({
@@ -189,5 +248,10 @@ def handle_exception(e):
     return jsonify({"error": "Something went wrong!"}), 500
 
 if __name__ == '__main__':
+    # Only the reloader's serving process handles requests, so only it starts render workers
+    if os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        pdf_render_pool.warm()
+        html_render_pool.warm()
+        generation_jobs.start()
     port = int(os.environ.get('PORT', 3001))
     app.run(host='0.0.0.0', port=port, debug=True)
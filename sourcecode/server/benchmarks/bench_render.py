@@ -0,0 +1,285 @@
+#!/usr/bin/env python
+"""
+Rendering benchmark for the resume generators
+
+Renders synthetic resumes of graded sizes through generate_pdf, generate_docx and generate_txt
+directly, and through /generate with the Flask test client, and reports renders per second,
+p50/p95/p99 latency, peak RSS and output bytes for every configuration.
+
+Every configuration runs in a fresh process, so peak RSS belongs to that configuration alone.
+Renders happen in that process (PDF_RENDER_WORKERS=0) and the artifact, normalized-resume and
+PDF flowable caches are disabled, so every request is a full render.
+
+Usage:
+    python benchmarks/bench_render.py
+    python benchmarks/bench_render.py --sizes small,large --formats pdf --iterations 50
+    python benchmarks/bench_render.py --output results.json --compare previous.json
+"""
+import os
+import io
+import sys
+import json
+import time
+import random
+import logging
+import platform
+import argparse
+import subprocess
+import multiprocessing
+from datetime import datetime, timezone
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Entries per section and bullets per entry of each graded size
+SIZES = {
+    'small': {'experience': 2, 'education': 1, 'projects': 1, 'skills': 8, 'highlights': 3},
+    'medium': {'experience': 5, 'education': 2, 'projects': 3, 'skills': 16, 'highlights': 5},
+    'large': {'experience': 10, 'education': 3, 'projects': 6, 'skills': 30, 'highlights': 8},
+    'xlarge': {'experience': 25, 'education': 4, 'projects': 12, 'skills': 60, 'highlights': 12}
+}
+
+MODES = ('direct', 'http')
+FORMATS = ('pdf', 'docx', 'txt')
+
+WORDS = (
+    'designed built led migrated optimized reduced scaled automated delivered improved service pipeline '
+    'latency throughput platform customers revenue team deployment infrastructure analytics reliability '
+    'api database cache queue release quality onboarding dashboard cost security compliance'
+).split()
+
+def _sentence(rng, words):
+    text = ' '.join(rng.choice(WORDS) for _ in range(words))
+    return text[0].upper() + text[1:] + '.'
+
+def synthetic_resume(size, seed=42):
+    """Build a resume in the JSON shape the frontend sends; the same size and seed give the same resume"""
+    counts = SIZES[size]
+    rng = random.Random(f'{size}:{seed}')
+    return {
+        'basics': {
+            'name': 'Jordan Example',
+            'title': 'Senior Software Engineer',
+            'email': 'jordan@example.com',
+            'phone': '+1 555 0100',
+            'location': 'Springfield',
+            'summary': ' '.join(_sentence(rng, 14) for _ in range(3))
+        },
+        'experience': [{
+            'title': f'Engineer {index + 1}',
+            'company': f'Company {index + 1}',
+            'location': 'Remote',
+            'startDate': f'{2020 - index}-01',
+            'endDate': f'{2021 - index}-06',
+            'highlights': [_sentence(rng, 18) for _ in range(counts['highlights'])]
+        } for index in range(counts['experience'])],
+        'education': [{
+            'degree': 'BSc Computer Science',
+            'school': f'University {index + 1}',
+            'startDate': f'{2008 - 4 * index}-09',
+            'endDate': f'{2012 - 4 * index}-06'
+        } for index in range(counts['education'])],
+        'projects': [{
+            'name': f'Project {index + 1}',
+            'description': _sentence(rng, 20),
+            'highlights': [_sentence(rng, 12) for _ in range(2)],
+            'technologies': ['Python', 'Flask', 'PostgreSQL']
+        } for index in range(counts['projects'])],
+        'skills': [f'Skill {index + 1}' for index in range(counts['skills'])],
+        'certifications': [{'name': 'Cloud Practitioner', 'issuer': 'Example Institute', 'date': '2020-05'}],
+        'languages': [{'language': 'English', 'fluency': 'Native'}]
+    }
+
+def percentile(samples, fraction):
+    """Nearest-rank percentile of a sorted list"""
+    index = max(0, min(len(samples) - 1, int(round(fraction * len(samples) + 0.5)) - 1))
+    return samples[index]
+
+def peak_rss_bytes():
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+def _direct_renderer(format_type, template, design_settings):
+    from controllers.generate_controller import generate_docx, generate_pdf, generate_txt
+
+    def render(resume_data):
+        output = io.BytesIO()
+        if format_type == 'pdf':
+            generate_pdf(resume_data, template, design_settings, output)
+        elif format_type == 'docx':
+            generate_docx(resume_data, template, design_settings, output)
+        else:
+            generate_txt(resume_data, output)
+        return len(output.getvalue())
+    return render
+
+def _http_renderer(format_type, template, design_settings):
+    from app import app
+    client = app.test_client()
+
+    def render(resume_data):
+        response = client.post('/generate', json={
+            'resumeData': resume_data,
+            'template': template,
+            'designSettings': design_settings,
+            'format': format_type
+        })
+        if response.status_code != 200:
+            raise RuntimeError(f'/generate answered {response.status_code}: {response.get_data(as_text=True)[:200]}')
+        return len(response.get_data())
+    return render
+
+def run_configuration(config):
+    """Benchmark one configuration in the current process and return its result"""
+    sys.path.insert(0, SERVER_DIR)
+    os.chdir(SERVER_DIR)
+    logging.disable(logging.INFO)
+
+    design_settings = {'font': config['font']}
+    factory = _direct_renderer if config['mode'] == 'direct' else _http_renderer
+    render = factory(config['format'], config['template'], design_settings)
+    resume_data = synthetic_resume(config['size'])
+
+    for _ in range(config['warmup']):
+        render(resume_data)
+
+    latencies = []
+    output_bytes = 0
+    started = time.perf_counter()
+    for _ in range(config['iterations']):
+        render_started = time.perf_counter()
+        output_bytes = render(resume_data)
+        latencies.append(time.perf_counter() - render_started)
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        **config,
+        'rps': round(config['iterations'] / elapsed, 2),
+        'meanMs': round(1000 * sum(latencies) / len(latencies), 3),
+        'p50Ms': round(1000 * percentile(latencies, 0.50), 3),
+        'p95Ms': round(1000 * percentile(latencies, 0.95), 3),
+        'p99Ms': round(1000 * percentile(latencies, 0.99), 3),
+        'peakRssBytes': peak_rss_bytes(),
+        'outputBytes': output_bytes
+    }
+
+def _isolated(config, results):
+    try:
+        results.put(run_configuration(config))
+    except Exception as error:
+        results.put({**config, 'error': f'{type(error).__name__}: {error}'})
+
+def run_isolated(config):
+    """Run a configuration in a fresh process so its peak RSS is not inflated by earlier ones"""
+    context = multiprocessing.get_context('spawn')
+    results = context.Queue()
+    process = context.Process(target=_isolated, args=(config, results))
+    process.start()
+    result = results.get()
+    process.join()
+    return result
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            cwd=SERVER_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except Exception:
+        return None
+
+def _key(result):
+    return (result['mode'], result['format'], result['size'], result['template'], result['font'])
+
+def compare(results, baseline_path):
+    """Print the change in p50 latency, throughput and peak RSS against an earlier results file"""
+    with open(baseline_path) as f:
+        baseline = {_key(result): result for result in json.load(f)['results'] if 'error' not in result}
+
+    print(f'\nCompared with {baseline_path}:')
+    for result in results:
+        previous = baseline.get(_key(result))
+        if previous is None or 'error' in result:
+            continue
+        changes = ', '.join(
+            f'{label} {100 * (result[field] - previous[field]) / previous[field]:+.1f}%'
+            for label, field in (('p50', 'p50Ms'), ('rps', 'rps'), ('rss', 'peakRssBytes'))
+            if previous[field]
+        )
+        print(f'  {" ".join(_key(result))}: {changes}')
+
+def _list(value, allowed=None):
+    items = [item.strip() for item in value.split(',') if item.strip()]
+    if allowed is not None:
+        unknown = [item for item in items if item not in allowed]
+        if unknown:
+            raise argparse.ArgumentTypeError(f'unknown value(s) {", ".join(unknown)}; choose from {", ".join(allowed)}')
+    return items
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark resume rendering')
+    parser.add_argument('--modes', type=lambda value: _list(value, MODES), default=list(MODES))
+    parser.add_argument('--formats', type=lambda value: _list(value, FORMATS), default=list(FORMATS))
+    parser.add_argument('--sizes', type=lambda value: _list(value, SIZES), default=list(SIZES))
+    parser.add_argument('--templates', type=_list, default=['modern'])
+    parser.add_argument('--fonts', type=_list, default=['Helvetica'])
+    parser.add_argument('--iterations', type=int, default=20)
+    parser.add_argument('--warmup', type=int, default=3)
+    parser.add_argument('--output', help='Write results to this JSON file')
+    parser.add_argument('--compare', help='Earlier results file to compare against')
+    parser.add_argument('--in-process', action='store_true', help='Run every configuration in this process (peak RSS is then cumulative)')
+    args = parser.parse_args()
+
+    # Renders happen in the benchmark process and are never answered from a cache: not from the
+    # artifact cache, and not from the memoized normalized resume or PDF flowables either
+    os.environ['PDF_RENDER_WORKERS'] = '0'
+    os.environ['HTML_RENDER_WORKERS'] = '0'
+    os.environ['ARTIFACT_CACHE_MAX_BYTES'] = '0'
+    os.environ.pop('ARTIFACT_CACHE_DIR', None)
+    os.environ['RESUME_CACHE_SIZE'] = '0'
+    os.environ['PDF_FLOWABLE_CACHE_SIZE'] = '0'
+
+    configs = [
+        {
+            'mode': mode, 'format': format_type, 'size': size, 'template': template, 'font': font,
+            'iterations': args.iterations, 'warmup': args.warmup
+        }
+        for mode in args.modes
+        for format_type in args.formats
+        for size in args.sizes
+        for template in args.templates
+        for font in args.fonts
+    ]
+
+    print(f'{"mode":<7} {"format":<6} {"size":<7} {"template":<10} {"font":<10} {"rps":>8} {"p50 ms":>8} '
+          f'{"p95 ms":>8} {"p99 ms":>8} {"peak RSS MB":>11} {"bytes":>9}')
+    results = []
+    for config in configs:
+        result = run_configuration(config) if args.in_process else run_isolated(config)
+        results.append(result)
+        label = f'{result["mode"]:<7} {result["format"]:<6} {result["size"]:<7} {result["template"]:<10} {result["font"]:<10}'
+        if 'error' in result:
+            print(f'{label} failed: {result["error"]}')
+            continue
+        print(f'{label} {result["rps"]:>8.1f} {result["p50Ms"]:>8.2f} {result["p95Ms"]:>8.2f} {result["p99Ms"]:>8.2f} '
+              f'{result["peakRssBytes"] / 1024 / 1024:>11.1f} {result["outputBytes"]:>9}')
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({
+                'commit': git_commit(),
+                'recordedAt': datetime.now(timezone.utc).isoformat(),
+                'python': platform.python_version(),
+                'platform': platform.platform(),
+                'cpus': os.cpu_count(),
+                'results': results
+            }, f, indent=2)
+        print(f'\nResults written to {args.output}')
+
+    if args.compare:
+        compare(results, args.compare)
+
+if __name__ == '__main__':
+    main()
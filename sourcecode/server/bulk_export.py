@@ -0,0 +1,307 @@
+#!/usr/bin/env python
+"""
+Bulk export of rewritten resumes to rendered files
+
+Lists the resume JSON files under a source prefix, fetches them with a pool of I/O threads,
+renders them in a pool of worker processes and writes the results back in parallel. At most
+--window resumes are in flight at once, so memory stays flat however large the corpus is.
+
+Sources and destinations are either S3 URIs (s3://bucket/prefix/) or local directories.
+With --checkpoint the export can be interrupted and resumed: the checkpoint records the
+last key up to which every resume has been handled, and failures are appended to
+<checkpoint>.failed as JSON lines.
+
+Usage:
+    python bulk_export.py --template elegant
+    python bulk_export.py --source s3://my-bucket/rewritten-resumes/ --dest s3://my-bucket/exports/pdf/
+    python bulk_export.py --source ./resumes --dest ./rendered --format docx --checkpoint export.ckpt
+"""
+import io
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+import threading
+import multiprocessing
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dotenv import load_dotenv
+from renderers.document import build_document
+from renderers.pdf import render_pdf, warm_renderer
+from renderers.docx import render_docx
+from renderers.txt import render_txt
+from utils.storage import create_s3_client, get_bucket
+
+# Configure logging
+logging.basicConfig(level=logging.INFO,
+                    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPES = {
+    'pdf': 'application/pdf',
+    'docx': 'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
+    'txt': 'text/plain'
+}
+
+def render_export(raw, template, design_settings, format_type):
+    """Parse one stored resume and render it; runs in the worker processes"""
+    document = build_document(json.loads(raw))
+    output = io.BytesIO()
+    if format_type == 'pdf':
+        render_pdf(document, template, design_settings, output)
+    elif format_type == 'docx':
+        render_docx(document, template, design_settings, output)
+    else:
+        render_txt(document, output)
+    return output.getvalue()
+
+class LocalStore:
+    """A directory standing in for the bucket; keys are paths relative to it"""
+
+    def __init__(self, root):
+        self.root = root
+
+    def __str__(self):
+        return self.root
+
+    def list(self, prefix='', start_after=None):
+        """Yield the keys under prefix in sorted order, starting after start_after"""
+        base = os.path.join(self.root, prefix)
+        # Keys are sorted as whole strings, like S3 lists them, so the walk is collected first
+        keys = sorted(
+            os.path.relpath(os.path.join(directory, file_name), self.root).replace(os.sep, '/')
+            for directory, _, files in os.walk(base)
+            for file_name in files
+        )
+        for key in keys:
+            if start_after is None or key > start_after:
+                yield key
+
+    def get(self, key):
+        with open(os.path.join(self.root, key), 'rb') as f:
+            return f.read()
+
+    def put(self, key, data, content_type):
+        path = os.path.join(self.root, key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = f'{path}.tmp'
+        with open(temp_path, 'wb') as f:
+            f.write(data)
+        os.replace(temp_path, path)
+
+class S3Store:
+    """An S3 bucket; listing is paginated, so keys are produced as they are needed"""
+
+    def __init__(self, bucket, max_connections):
+        self.bucket = bucket
+        # One connection per I/O thread
+        self.client = create_s3_client(max_pool_connections=max_connections)
+
+    def __str__(self):
+        return f's3://{self.bucket}'
+
+    def list(self, prefix='', start_after=None):
+        """Yield the keys under prefix in S3's (lexicographic) order, starting after start_after"""
+        params = {'Bucket': self.bucket, 'Prefix': prefix}
+        if start_after:
+            params['StartAfter'] = start_after
+        for page in self.client.get_paginator('list_objects_v2').paginate(**params):
+            for item in page.get('Contents', []):
+                if not item['Key'].endswith('/'):
+                    yield item['Key']
+
+    def get(self, key):
+        return self.client.get_object(Bucket=self.bucket, Key=key)['Body'].read()
+
+    def put(self, key, data, content_type):
+        self.client.put_object(Bucket=self.bucket, Key=key, Body=data, ContentType=content_type)
+
+def open_location(location, max_connections):
+    """Return (store, prefix) for an s3://bucket/prefix URI or a local directory"""
+    if location.startswith('s3://'):
+        bucket, _, prefix = location[len('s3://'):].partition('/')
+        if not bucket:
+            raise ValueError(f'No bucket in {location}; set AWS_S3_BUCKET or pass a full s3:// URI')
+        return S3Store(bucket, max_connections), prefix
+    return LocalStore(location), ''
+
+class Checkpoint:
+    """
+    Resume point of an export
+    Keys complete out of order, so the checkpoint holds the watermark: the last key before which
+    every listed key is finished. Memory is bounded by the in-flight window, not the corpus
+    """
+
+    def __init__(self, path, source):
+        self.path = path
+        self.source = source
+        self.after = None
+        self.counters = {'done': 0, 'failed': 0, 'bytes': 0}
+        self._pending = OrderedDict()
+        self._lock = threading.Lock()
+
+        if path and os.path.exists(path):
+            with open(path) as f:
+                state = json.load(f)
+            if state.get('source') != source:
+                raise ValueError(f'Checkpoint {path} belongs to {state.get("source")}, not {source}')
+            self.after = state.get('after')
+            self.counters.update(state.get('counters', {}))
+
+    def start(self, key):
+        with self._lock:
+            self._pending[key] = False
+
+    def finish(self, key, size=None, error=None):
+        with self._lock:
+            self._pending[key] = True
+            if error is None:
+                self.counters['done'] += 1
+                self.counters['bytes'] += size
+            else:
+                self.counters['failed'] += 1
+            # Listing order is key order, so the watermark advances over the finished head of the window
+            while self._pending:
+                head, finished = next(iter(self._pending.items()))
+                if not finished:
+                    break
+                self._pending.popitem(last=False)
+                self.after = head
+
+        if error is not None and self.path:
+            with self._lock, open(f'{self.path}.failed', 'a') as f:
+                f.write(json.dumps({'key': key, 'error': error}) + '\n')
+
+    def in_flight(self):
+        with self._lock:
+            return len(self._pending)
+
+    def save(self):
+        if not self.path:
+            return
+        with self._lock:
+            state = {'source': self.source, 'after': self.after, 'counters': dict(self.counters), 'savedAt': time.time()}
+        temp_path = f'{self.path}.tmp'
+        with open(temp_path, 'w') as f:
+            json.dump(state, f)
+        os.replace(temp_path, self.path)
+
+def _report(checkpoint, started, baseline, previous):
+    """
+    Print progress; totals include earlier runs, but rates count only this run's work,
+    measured against the counters restored from the checkpoint (baseline)
+    """
+    now = time.time()
+    counters = dict(checkpoint.counters)
+    processed = counters['done'] + counters['failed'] - baseline['done'] - baseline['failed']
+    interval_processed = counters['done'] + counters['failed'] - previous[1]
+    written = counters['bytes'] - baseline['bytes']
+    elapsed = max(now - started, 1e-6)
+    print(
+        f'{counters["done"]} exported, {counters["failed"]} failed, {checkpoint.in_flight()} in flight | '
+        f'{processed / elapsed:.1f}/s overall, {interval_processed / max(now - previous[0], 1e-6):.1f}/s now, '
+        f'{written / 1024 / 1024 / elapsed:.2f} MB/s written',
+        flush=True
+    )
+    return now, counters['done'] + counters['failed']
+
+def export(args):
+    bucket = get_bucket() or ''
+    source = args.source or f's3://{bucket}/rewritten-resumes/'
+    destination = args.dest or f's3://{bucket}/rendered-resumes/{args.template}/'
+    design_settings = json.loads(args.design_settings) if args.design_settings else None
+
+    source_store, source_prefix = open_location(source, args.io_workers)
+    dest_store, dest_prefix = open_location(destination, args.io_workers)
+    checkpoint = Checkpoint(args.checkpoint, source)
+    if checkpoint.after:
+        print(f'Resuming after {checkpoint.after} ({checkpoint.counters["done"]} already exported)', flush=True)
+
+    render_pool = ProcessPoolExecutor(
+        max_workers=args.workers,
+        mp_context=multiprocessing.get_context('spawn'),
+        initializer=warm_renderer
+    )
+    io_pool = ThreadPoolExecutor(max_workers=args.io_workers, thread_name_prefix='export-io')
+    # Every resume holds a slot from listing until its result is written
+    window = threading.BoundedSemaphore(args.window)
+
+    def process(key):
+        try:
+            raw = source_store.get(key)
+            artifact = render_pool.submit(render_export, raw, args.template, design_settings, args.format).result()
+            del raw
+            stem = key[len(source_prefix):]
+            stem = stem[:-len('.json')] if stem.endswith('.json') else stem
+            dest_store.put(f'{dest_prefix}{stem}.{args.format}', artifact, CONTENT_TYPES[args.format])
+            checkpoint.finish(key, size=len(artifact))
+        except Exception as error:
+            logger.error(f'Error exporting {key}: {error}')
+            checkpoint.finish(key, error=str(error))
+        finally:
+            window.release()
+
+    started = time.time()
+    # Counters restored from the checkpoint, so rates cover only this run
+    baseline = dict(checkpoint.counters)
+    previous = (started, baseline['done'] + baseline['failed'])
+    last_save = started
+    try:
+        for key in source_store.list(source_prefix, start_after=checkpoint.after):
+            if not key.endswith('.json'):
+                continue
+            while not window.acquire(timeout=args.report_every):
+                previous = _report(checkpoint, started, baseline, previous)
+            checkpoint.start(key)
+            io_pool.submit(process, key)
+
+            now = time.time()
+            if now - previous[0] >= args.report_every:
+                previous = _report(checkpoint, started, baseline, previous)
+            if now - last_save >= args.checkpoint_every:
+                checkpoint.save()
+                last_save = now
+
+        # Wait for the window to drain
+        for _ in range(args.window):
+            while not window.acquire(timeout=args.report_every):
+                previous = _report(checkpoint, started, baseline, previous)
+    finally:
+        io_pool.shutdown(wait=True)
+        render_pool.shutdown(wait=True)
+        checkpoint.save()
+
+    _report(checkpoint, started, baseline, previous)
+    print(f'Export from {source} to {destination} finished in {time.time() - started:.1f}s', flush=True)
+    return checkpoint.counters['failed'] - baseline['failed']
+
+def main():
+    dotenv_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.env')
+    if os.path.exists(dotenv_path):
+        load_dotenv(dotenv_path)
+
+    parser = argparse.ArgumentParser(description='Render every stored rewritten resume')
+    parser.add_argument('--source', help='s3://bucket/prefix/ or a directory (default: s3://$AWS_S3_BUCKET/rewritten-resumes/)')
+    parser.add_argument('--dest', help='s3://bucket/prefix/ or a directory (default: s3://$AWS_S3_BUCKET/rendered-resumes/<template>/)')
+    parser.add_argument('--format', choices=sorted(CONTENT_TYPES), default='pdf')
+    parser.add_argument('--template', default='modern')
+    parser.add_argument('--design-settings', help='designSettings as JSON, applied to every resume')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 2, help='Render processes')
+    parser.add_argument('--io-workers', type=int, default=16, help='Threads fetching and writing objects')
+    parser.add_argument('--window', type=int, help='Resumes in flight at most (default: twice the I/O threads)')
+    parser.add_argument('--checkpoint', help='File recording progress, for resuming an interrupted export')
+    parser.add_argument('--checkpoint-every', type=float, default=10, help='Seconds between checkpoint writes')
+    parser.add_argument('--report-every', type=float, default=5, help='Seconds between throughput reports')
+    args = parser.parse_args()
+    args.window = args.window or 2 * args.io_workers
+
+    # Per-resume renderer logging would drown the throughput reports
+    logging.getLogger().setLevel(logging.WARNING)
+
+    failed = export(args)
+    sys.exit(1 if failed else 0)
+
+if __name__ == '__main__':
+    main()
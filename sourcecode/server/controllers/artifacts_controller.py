@@ -0,0 +1,67 @@
+import os
+import io
+import re
+import logging
+from datetime import datetime, timezone
+from flask import jsonify, send_file
+from controllers.generate_controller import CONTENT_TYPES
+from utils.artifact_cache import artifact_cache
+from utils.rasterizer import IMAGE_FORMATS
+
+# Configure logging
+logging.basicConfig(level=logging.INFO,
+                    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Artifacts never change under their key, so clients may keep them this long (seconds)
+ARTIFACT_MAX_AGE = int(os.environ.get('ARTIFACT_MAX_AGE', 86400))
+
+ARTIFACT_CONTENT_TYPES = {**CONTENT_TYPES, **IMAGE_FORMATS}
+
+ARTIFACT_KEY = re.compile('[0-9a-f]{64}')
+
+def get_artifact(key, extension, request):
+    """
+    Serve a cached artifact by its content hash
+    Supports HEAD, Range/If-Range, ETag and Last-Modified; artifacts on disk are sent with sendfile
+    when the server supports it, so resumed downloads cost only the bytes they transfer
+    """
+    if not ARTIFACT_KEY.fullmatch(key) or extension not in ARTIFACT_CONTENT_TYPES:
+        return jsonify({'error': 'Not found', 'message': 'Unknown artifact'}), 404
+
+    # The key is a content hash and says nothing about the format, so the extension must match
+    # the one the artifact was stored with; a PDF is never served as text/plain
+    if artifact_cache.format(key) != extension:
+        return jsonify({'error': 'Not found', 'message': 'Unknown artifact'}), 404
+
+    download_name = request.args.get('name')
+    options = {
+        'mimetype': ARTIFACT_CONTENT_TYPES[extension],
+        'as_attachment': bool(download_name),
+        'download_name': f'{download_name}.{extension}' if download_name else None,
+        'conditional': True,
+        'etag': key,
+        'max_age': ARTIFACT_MAX_AGE
+    }
+
+    path = artifact_cache.path(key)
+    if path is not None:
+        response = send_file(path, **options)
+    else:
+        artifact = artifact_cache.get(key)
+        if artifact is None:
+            return jsonify({'error': 'Not found', 'message': 'The artifact has expired; generate it again'}), 404
+        stored_at = artifact_cache.stored_at(key)
+        response = send_file(
+            io.BytesIO(artifact),
+            last_modified=datetime.fromtimestamp(stored_at, timezone.utc) if stored_at else None,
+            **options
+        )
+
+    # Werkzeug only sets Accept-Ranges on range responses; advertise it so clients know they can resume
+    response.headers.setdefault('Accept-Ranges', 'bytes')
+
+    # Resumes are personal; only the client may cache them, never a shared proxy
+    response.cache_control.public = None
+    response.cache_control.private = True
+    return response
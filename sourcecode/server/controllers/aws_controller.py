@@ -1,8 +1,12 @@
 import os
 import json
 import logging
-import boto3
+import threading
+from collections import OrderedDict
+from botocore.exceptions import ClientError
 from flask import jsonify
+from utils.resume_index import SESSION_ID, UPLOAD_PREFIX, ResumeIndex, latest_pointer_key, result_key_for
+from utils.storage import get_bucket, get_s3_client
 
 # Configure logging
 logging.basicConfig(level=logging.INFO,
@@ -16,28 +20,144 @@ logger.info(f'Bucket: {os.environ.get("AWS_S3_BUCKET")}')
 logger.info(f'Access Key ID: {"****" + os.environ.get("AWS_ACCESS_KEY_ID", "")[-4:] if os.environ.get("AWS_ACCESS_KEY_ID") else "Not set"}')
 logger.info(f'Secret Access Key: {"****" if os.environ.get("AWS_SECRET_ACCESS_KEY") else "Not set"}')
 
-# Configure AWS S3
-s3 = boto3.client(
-    's3',
-    aws_access_key_id=os.environ.get('AWS_ACCESS_KEY_ID'),
-    aws_secret_access_key=os.environ.get('AWS_SECRET_ACCESS_KEY'),
-    region_name=os.environ.get('AWS_REGION', 'us-east-1')
+# Local index of the rewritten resumes in the bucket, so requests don't list the bucket
+resume_index = ResumeIndex(
+    os.environ.get('RESUME_INDEX_DB') or os.path.join(os.path.dirname(os.path.dirname(__file__)), 'temp', 'resume_index.sqlite3'),
+    sync_interval=float(os.environ.get('RESUME_INDEX_SYNC_INTERVAL', 300))
 )
 
-def list_rewritten_resumes():
+# Seconds a client polling for a resume that is still being processed should wait
+PENDING_RETRY_AFTER = int(os.environ.get('PENDING_RETRY_AFTER', 5))
+
+# Seconds a client should wait before retrying while a fresh resume index is being filled
+INDEX_SYNC_RETRY_AFTER = int(os.environ.get('INDEX_SYNC_RETRY_AFTER', 10))
+
+# Parsed resume bodies kept by key and ETag; a stored resume never changes under the same ETag
+RESUME_BODY_CACHE_SIZE = int(os.environ.get('RESUME_BODY_CACHE_SIZE', 64))
+
+_body_cache = OrderedDict()
+_body_cache_lock = threading.Lock()
+
+def _cache_body(key, etag, json_content):
+    if not etag or not RESUME_BODY_CACHE_SIZE:
+        return
+    with _body_cache_lock:
+        _body_cache[(key, etag)] = json_content
+        _body_cache.move_to_end((key, etag))
+        while len(_body_cache) > RESUME_BODY_CACHE_SIZE:
+            _body_cache.popitem(last=False)
+
+def fetch_resume_json(key, etag=None):
     """
-    List all rewritten resumes in the S3 bucket
+    Get a resume JSON object from S3 and record it in the index
+    With the ETag of the current version, a cached body is returned without a request
+    Returns the parsed JSON; raises on a missing object or invalid JSON
     """
+    if etag:
+        with _body_cache_lock:
+            json_content = _body_cache.get((key, etag))
+            if json_content is not None:
+                _body_cache.move_to_end((key, etag))
+                logger.info(f'Serving cached body of {key}')
+                return json_content
+
+    file_data = get_s3_client().get_object(Bucket=get_bucket(), Key=key)
+    # Read the content once and store it
+    file_content = file_data['Body'].read()
+    logger.info(f'File content received for {key}, size: {len(file_content)}')
+
+    json_content = json.loads(file_content.decode('utf-8'))
+    basics = json_content.get('basics') if isinstance(json_content, dict) else None
+    resume_index.record_object(
+        key, len(file_content), file_data.get('ETag'), file_data['LastModified'],
+        candidate_name=basics.get('name') if isinstance(basics, dict) else None
+    )
+    _cache_body(key, file_data.get('ETag'), json_content)
+    return json_content
+
+def _is_missing(error):
+    return error.response.get('Error', {}).get('Code') in ('NoSuchKey', 'NotFound', '404')
+
+def read_latest_pointer(session_id=None):
+    """Return the latest-resume pointer the lambda maintains for a session (or for all uploads), or None"""
     try:
-        params = {
-            'Bucket': os.environ.get('AWS_S3_BUCKET'),
-            'Prefix': 'rewritten-resumes/'
-        }
-
-        data = s3.list_objects_v2(**params)
+        pointer_data = get_s3_client().get_object(Bucket=get_bucket(), Key=latest_pointer_key(session_id))
+    except ClientError as error:
+        if _is_missing(error):
+            return None
+        raise
+    return json.loads(pointer_data['Body'].read().decode('utf-8'))
+
+def _pending_upload(key, result_key):
+    """Return the upload whose result has not been written yet, or None if there is no such upload"""
+    upload = resume_index.find_upload(result_key)
+    if upload is None and key.startswith(UPLOAD_PREFIX):
+        # Uploads the index has not recorded, e.g. made through another server
+        try:
+            head = get_s3_client().head_object(Bucket=get_bucket(), Key=key)
+            upload = {'upload_key': key, 'result_key': result_key, 'uploaded_at': head['LastModified'].timestamp()}
+        except ClientError as error:
+            if not _is_missing(error):
+                raise
+    return upload
+
+def rewritten_resume_response(key):
+    """
+    Respond with the rewritten resume of an upload key, a rewritten-resume key or a file name
+    The result key follows from the key, so this is one GET. An upload still being processed gets
+    202 with Retry-After, an unknown key 404; neither falls back to another resume
+    """
+    result_key = result_key_for(key)
+    try:
+        return jsonify(fetch_resume_json(result_key))
+    except ClientError as error:
+        if not _is_missing(error):
+            raise
+
+    upload = _pending_upload(key, result_key)
+    if upload is None:
+        logger.info(f'No rewritten resume or upload for {key}')
+        return jsonify({
+            'error': 'Resume not found',
+            'message': f'No rewritten resume or upload matches {key}'
+        }), 404
+
+    logger.info(f'Rewritten resume {result_key} is still being processed')
+    response = jsonify({
+        'status': 'pending',
+        'message': 'The resume is still being processed',
+        'uploadKey': upload['upload_key'],
+        'resultKey': result_key,
+        'uploadedAt': upload['uploaded_at']
+    })
+    response.status_code = 202
+    response.headers['Retry-After'] = str(PENDING_RETRY_AFTER)
+    return response
+
+def index_syncing_response():
+    """503 response for lookups that need the resume index before its first sync has finished"""
+    response = jsonify({
+        'error': 'Resume index is syncing',
+        'message': 'The list of rewritten resumes is being built, please retry shortly'
+    })
+    response.status_code = 503
+    response.headers['Retry-After'] = str(INDEX_SYNC_RETRY_AFTER)
+    return response
+
+def list_rewritten_resumes(request):
+    """
+    List the rewritten resumes in the S3 bucket
+    Answered from the resume index; ?limit= and ?startAfter= page through it in key order
+    """
+    try:
+        # An index still being filled would report an empty bucket
+        if not resume_index.ensure_synced():
+            return index_syncing_response()
 
-        # Filter out the folder itself and only return actual files
-        files = [item for item in data.get('Contents', []) if not item['Key'].endswith('/')]
+        files = resume_index.list(
+            start_after=request.args.get('startAfter'),
+            limit=request.args.get('limit', type=int)
+        )
 
         return jsonify(files)
     except Exception as error:
@@ -47,224 +167,65 @@ def list_rewritten_resumes():
 def get_latest_rewritten_resume(request):
     """
     Get the latest rewritten resume from S3
+    The latest key is read from the pointer the lambda maintains per session (?session= or the
+    X-Session-Id header) or for all uploads; its body usually comes from the body cache.
+    Resumes written before pointers existed are found through the resume index
     """
     try:
         logger.info('Fetching latest rewritten resume...')
 
-        # Check if a specific key was provided in the query
+        # A specific key is looked up directly; it never resolves to another upload's resume
         specific_key = request.args.get('key')
         if specific_key:
             logger.info(f'Specific key requested: {specific_key}')
-
-            # Try to get the object with the specific key
-            try:
-                get_params = {
-                    'Bucket': os.environ.get('AWS_S3_BUCKET'),
-                    'Key': specific_key
-                }
-
-                logger.info(f'Fetching file with specific key: {specific_key}')
-                file_data = s3.get_object(**get_params)
-                # Read the content once and store it
-                file_content = file_data["Body"].read()
-                logger.info(f'File found with specific key, size: {len(file_content)}')
-
-                try:
-                    json_content = json.loads(file_content.decode('utf-8'))
-                    logger.info('JSON parsed successfully for specific key')
-
-                    return jsonify(json_content)
-                except json.JSONDecodeError as parse_error:
-                    logger.error(f'Error parsing JSON for specific key: {parse_error}')
-                    return jsonify({
-                        'error': 'Error parsing resume data',
-                        'message': str(parse_error)
-                    }), 500
-            except Exception as get_error:
-                logger.error(f'Error getting object with specific key: {get_error}')
-
-                # If the key starts with 'textract-output/', try to find the corresponding processed file
-                if specific_key.startswith('textract-output/'):
-                    logger.info('Input file key detected. Trying to find corresponding processed file...')
-
-                    # Extract the filename from the key
-                    filename = specific_key.split('/')[-1]
-                    logger.info(f'Extracted filename: {filename}')
-
-                    # Try to find a processed file with a similar name in rewritten-resumes/
-                    try:
-                        list_params = {
-                            'Bucket': os.environ.get('AWS_S3_BUCKET'),
-                            'Prefix': 'rewritten-resumes/'
-                        }
-
-                        data = s3.list_objects_v2(**list_params)
-                        logger.info(f'Found {len(data.get("Contents", []))} objects with prefix "rewritten-resumes/"')
-
-                        if data.get('Contents') and len(data['Contents']) > 0:
-                            # Filter out the folder itself
-                            files = [item for item in data['Contents'] if not item['Key'].endswith('/')]
-                            logger.info(f'Found {len(files)} files after filtering')
-
-                            # Sort by LastModified date (newest first)
-                            files.sort(key=lambda x: x['LastModified'], reverse=True)
-
-                            # Try to find a file that contains parts of the original filename
-                            filename_without_ext = filename.split('.')[0]
-                            matching_files = [file for file in files if filename_without_ext in file['Key']]
-
-                            if matching_files:
-                                logger.info(f'Found {len(matching_files)} matching files for {filename_without_ext}')
-                                logger.info(f'Using the most recent matching file: {matching_files[0]["Key"]}')
-
-                                get_params = {
-                                    'Bucket': os.environ.get('AWS_S3_BUCKET'),
-                                    'Key': matching_files[0]['Key']
-                                }
-
-                                file_data = s3.get_object(**get_params)
-
-                                # Read the file content once
-                                file_content = file_data['Body'].read().decode('utf-8')
-                                json_content = json.loads(file_content)
-
-                                return jsonify(json_content)
-                            else:
-                                logger.info('No matching processed files found, continuing to try other methods')
-                    except Exception as list_error:
-                        logger.error(f'Error listing objects: {list_error}')
-
-        # Try multiple prefixes to find the resume
-        prefixes_to_try = [
-            'rewritten-resumes/',
-            'rewritten_resumes/',
-            'rewrittenresumes/',
-            'rewritten-resume/',
-            'rewritten/'
-        ]
-
-        all_files = []
-
-        # Try each prefix
-        for prefix in prefixes_to_try:
-            logger.info(f'Trying prefix: {prefix}')
-
-            params = {
-                'Bucket': os.environ.get('AWS_S3_BUCKET'),
-                'Prefix': prefix
-            }
-
-            logger.info(f'S3 list params: {json.dumps(params)}')
-
-            try:
-                # Try to list objects in the bucket with this prefix
-                data = s3.list_objects_v2(**params)
-                logger.info(f'Found {len(data.get("Contents", []))} objects with prefix "{prefix}"')
-
-                if data.get('Contents') and len(data['Contents']) > 0:
-                    # Filter out the folder itself and only return actual files
-                    files = [item for item in data['Contents'] if not item['Key'].endswith('/')]
-                    logger.info(f'Found {len(files)} files after filtering for prefix "{prefix}"')
-
-                    # Add these files to our collection
-                    all_files.extend(files)
-            except Exception as list_error:
-                logger.error(f'Error listing objects with prefix "{prefix}": {list_error}')
-
-        logger.info(f'Found a total of {len(all_files)} files across all prefixes')
-
-        if not all_files:
-            logger.error('No objects found in the bucket with any of the tried prefixes')
-
-            # List all objects in the bucket to see what's available
-            try:
-                logger.info('Listing all objects in the bucket to debug...')
-                all_objects_params = {
-                    'Bucket': os.environ.get('AWS_S3_BUCKET')
-                }
-
-                all_objects_data = s3.list_objects_v2(**all_objects_params)
-                logger.info(f'Found {len(all_objects_data.get("Contents", []))} total objects in the bucket')
-
-                if all_objects_data.get('Contents') and len(all_objects_data['Contents']) > 0:
-                    logger.info('Sample of objects in the bucket:')
-                    for index, item in enumerate(all_objects_data['Contents'][:10]):
-                        logger.info(f'{index + 1}. {item["Key"]} ({item["LastModified"]})')
-
-                    # Check for files containing the user's name
-                    name_patterns = ['AbdulWasay', 'Abdul', 'Wasay', 'CV']
-                    for pattern in name_patterns:
-                        matching_objects = [item for item in all_objects_data['Contents'] if pattern in item['Key']]
-                        if matching_objects:
-                            logger.info(f'Found {len(matching_objects)} objects containing "{pattern}":')
-                            for index, item in enumerate(matching_objects[:5]):
-                                logger.info(f'{index + 1}. {item["Key"]} ({item["LastModified"]})')
-
-                            # Add these files to our collection
-                            all_files.extend(matching_objects)
-            except Exception as list_all_error:
-                logger.error(f'Error listing all objects: {list_all_error}')
-
-        # If we still have no files, return 404
-        if not all_files:
+            return rewritten_resume_response(specific_key)
+
+        session_id = request.args.get('session') or request.headers.get('X-Session-Id')
+        if session_id and not SESSION_ID.fullmatch(session_id):
+            return jsonify({'error': 'Invalid session id'}), 400
+
+        pointer = read_latest_pointer(session_id)
+        if pointer:
+            logger.info(f'Latest pointer of {session_id or "all uploads"}: {pointer["key"]}')
+            latest_file = {'Key': pointer['key'], 'ETag': pointer.get('etag')}
+        elif session_id:
+            # Never fall back to another session's resume
+            return jsonify({
+                'error': 'No rewritten resume for this session',
+                'message': 'No resume uploaded in this session has been processed yet'
+            }), 404
+        else:
+            # Only clients from before session ids send none; they keep getting the newest resume of all uploads
+            if not resume_index.ensure_synced():
+                return index_syncing_response()
+            latest_file = resume_index.latest()
+
+        # If there are no files, return 404
+        if not latest_file:
             return jsonify({
                 'error': 'No rewritten resumes found in the bucket',
                 'message': 'The server could not find any resume files in the S3 bucket',
-                'prefixesTried': prefixes_to_try
+                'prefixesTried': list(resume_index.prefixes)
             }), 404
 
-        # Log all files for debugging
-        logger.info('All files found:')
-        for index, file in enumerate(all_files):
-            logger.info(f'{index + 1}. {file["Key"]} ({file["LastModified"]})')
-
-        # Sort by LastModified date (newest first)
-        all_files.sort(key=lambda x: x['LastModified'], reverse=True)
-
-        # Log all files with their timestamps for debugging
-        logger.info('All files sorted by modification date:')
-        for index, file in enumerate(all_files[:5]):
-            logger.info(f'{index + 1}. {file["Key"]} - {file["LastModified"]} ({file["LastModified"].isoformat()})')
-
-        # Get the most recent file
-        latest_file = all_files[0]
         logger.info(f'Latest file: {latest_file["Key"]}')
-        logger.info(f'Last modified: {latest_file["LastModified"]} ({latest_file["LastModified"].isoformat()})')
 
-        # Now fetch the content of this file
         get_params = {
-            'Bucket': os.environ.get('AWS_S3_BUCKET'),
+            'Bucket': get_bucket(),
             'Key': latest_file['Key']
         }
 
-        logger.info(f'Fetching file content with params: {json.dumps(get_params)}')
-
         try:
-            # Try to get the object
-            file_data = s3.get_object(**get_params)
-            # Read the content once and store it
-            file_content = file_data["Body"].read()
-            logger.info(f'File content received, size: {len(file_content)}')
-
-            try:
-                # Try to parse the JSON
-                json_content = json.loads(file_content.decode('utf-8'))
-                logger.info('JSON parsed successfully')
-                logger.info(f'JSON content keys: {list(json_content.keys())}')
-
-                return jsonify(json_content)
-            except json.JSONDecodeError as parse_error:
-                logger.error(f'Error parsing JSON: {parse_error}')
-
-                # Log the raw content for debugging
-                raw_content = file_content.decode('utf-8')
-                logger.info(f'Raw content (first 200 chars): {raw_content[:200]}')
-
-                return jsonify({
-                    'error': 'Error parsing resume data',
-                    'message': str(parse_error),
-                    'rawData': raw_content[:200] + '...'  # Send first 200 chars for debugging
-                }), 500
+            json_content = fetch_resume_json(latest_file['Key'], etag=latest_file.get('ETag'))
+            logger.info('JSON parsed successfully')
+            return jsonify(json_content)
+        except json.JSONDecodeError as parse_error:
+            logger.error(f'Error parsing JSON: {parse_error}')
+            return jsonify({
+                'error': 'Error parsing resume data',
+                'message': str(parse_error),
+                'rawData': parse_error.doc[:200] + '...'  # Send first 200 chars for debugging
+            }), 500
         except Exception as get_error:
             logger.error(f'Error getting object: {get_error}')
             return jsonify({
@@ -0,0 +1,83 @@
+import os
+import io
+import logging
+from flask import Response, jsonify, send_file
+from models.resume import load_resume
+from renderers.html import HtmlRendererUnavailable, render_html_pdf_bytes, warm_html_renderer
+from controllers.generate_controller import parse_generate_request, render_busy_response
+from utils.artifact_cache import artifact_cache, artifact_url, compute_artifact_key
+from utils.render_pool import RenderQueueFull, RenderTimeout, create_render_pool
+
+# Configure logging
+logging.basicConfig(level=logging.INFO,
+                    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Worker processes that keep WeasyPrint, the compiled template and parsed stylesheets loaded
+html_render_pool = create_render_pool('html', 'HTML_RENDER', initializer=warm_html_renderer, default_workers=2)
+HTML_RENDER_TIMEOUT = float(os.environ.get('HTML_RENDER_TIMEOUT', 60))
+
+# Cache key format of PDFs rendered from the HTML template, kept apart from ReportLab PDFs
+HTML_PDF_FORMAT = 'html.pdf'
+
+def render_html_pdf(resume, template, design_settings):
+    """Render a resume through the HTML template and return the PDF bytes"""
+    if html_render_pool.enabled:
+        # The raw resume is sent to the worker, which builds (and memoizes) the model itself
+        return html_render_pool.run(render_html_pdf_bytes, resume.raw, template, design_settings, timeout=HTML_RENDER_TIMEOUT)
+    return render_html_pdf_bytes(resume, template, design_settings)
+
+def generate_html_pdf(request):
+    """
+    Generate a PDF from the HTML resume template
+    Python replacement of the Node service's /simple-pdf endpoint
+    """
+    try:
+        options, error_response = parse_generate_request(request)
+        if error_response:
+            return error_response
+
+        resume = load_resume(options['resume_data'])
+        template = options['template'] or 'modern'
+        design_settings = options['design_settings']
+        safe_file_name = ''.join(c if c.isalnum() else '-' for c in options['file_name']).lower() or 'resume'
+
+        artifact_key = compute_artifact_key(resume.digest, template, design_settings, HTML_PDF_FORMAT)
+        if request.if_none_match.contains_weak(artifact_key):
+            response = Response(status=304)
+            response.set_etag(artifact_key)
+            return response
+
+        artifact = artifact_cache.get(artifact_key)
+        if artifact is None:
+            logger.info('Generating PDF from HTML template...')
+            artifact = render_html_pdf(resume, template, design_settings)
+            if not artifact:
+                raise ValueError('Generated file is empty')
+            artifact_cache.put(artifact_key, artifact, 'pdf')
+            logger.info(f'HTML PDF artifact {artifact_key} rendered. Size: {len(artifact)} bytes')
+
+        response = send_file(
+            io.BytesIO(artifact),
+            as_attachment=True,
+            download_name=f'{safe_file_name}.pdf',
+            mimetype='application/pdf',
+            etag=artifact_key
+        )
+        response.headers['Content-Location'] = artifact_url(artifact_key, 'pdf')
+        return response
+    except RenderQueueFull as busy_error:
+        logger.warning(f'Shedding HTML PDF render: {busy_error}')
+        return render_busy_response(busy_error)
+    except RenderTimeout as timeout_error:
+        logger.error(f'HTML PDF render timed out: {timeout_error}')
+        return jsonify({'error': 'File generation timed out', 'message': str(timeout_error)}), 504
+    except HtmlRendererUnavailable as unavailable_error:
+        logger.error(str(unavailable_error))
+        return jsonify({'error': 'HTML renderer unavailable', 'message': str(unavailable_error)}), 501
+    except Exception as error:
+        logger.error(f'Error generating PDF from HTML: {error}')
+        return jsonify({
+            'error': 'File generation failed',
+            'message': f'Error generating PDF from HTML: {str(error)}'
+        }), 500
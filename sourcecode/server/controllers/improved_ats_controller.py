@@ -3,19 +3,20 @@ import logging
 import re
 import string
 from collections import Counter
-from typing import Dict, List, Tuple, Any, Optional
+from typing import Dict, List, Tuple, Any, Optional, Union
+from models.resume import Resume, load_resume
 
 # Configure logging
 logging.basicConfig(level=logging.INFO,
                     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-def check_ats_compatibility(resume_data: Dict[str, Any], job_description: Optional[str] = None) -> Dict[str, Any]:
+def check_ats_compatibility(resume_data: Union[Dict[str, Any], Resume], job_description: Optional[str] = None) -> Dict[str, Any]:
     """
     Analyze a resume for ATS compatibility and return a detailed score and recommendations.
 
     Args:
-        resume_data (dict): The resume data in JSON format
+        resume_data (dict or Resume): The resume data in JSON format, or the typed resume model
         job_description (str, optional): Job description to check for keyword matching
 
     Returns:
@@ -23,6 +24,11 @@ def check_ats_compatibility(resume_data: Dict[str, Any], job_description: Option
     """
     logger.info("Starting enhanced ATS compatibility check")
 
+    # Fields are read from the typed model; text and section checks look at the JSON as submitted,
+    # which is serialized once for all of them
+    resume = load_resume(resume_data)
+    resume_text = json.dumps(resume.raw)
+
     # Initialize results
     results = {
         "overall_score": 0,
@@ -36,7 +42,7 @@ def check_ats_compatibility(resume_data: Dict[str, Any], job_description: Option
     scores = {}
 
     # 1. Check for basic contact information (10 points)
-    contact_score, contact_feedback = check_contact_info(resume_data)
+    contact_score, contact_feedback = check_contact_info(resume)
     scores["contact_info"] = contact_score
     results["sections"]["contact_info"] = {
         "score": contact_score,
@@ -45,7 +51,7 @@ def check_ats_compatibility(resume_data: Dict[str, Any], job_description: Option
     }
 
     # 2. Check for proper section headers (15 points)
-    headers_score, headers_feedback = check_section_headers(resume_data)
+    headers_score, headers_feedback = check_section_headers(resume)
     scores["section_headers"] = headers_score
     results["sections"]["section_headers"] = {
         "score": headers_score,
@@ -54,7 +60,7 @@ def check_ats_compatibility(resume_data: Dict[str, Any], job_description: Option
     }
 
     # 3. Check content quality and length (25 points)
-    content_score, content_feedback = check_content_quality(resume_data)
+    content_score, content_feedback = check_content_quality(resume, resume_text)
     scores["content_quality"] = content_score
     results["sections"]["content_quality"] = {
         "score": content_score,
@@ -64,7 +70,7 @@ def check_ats_compatibility(resume_data: Dict[str, Any], job_description: Option
 
     # 4. Check for keyword matching with job description (30 points)
     if job_description:
-        keyword_score, keyword_feedback = check_keyword_matching(resume_data, job_description)
+        keyword_score, keyword_feedback = check_keyword_matching(resume, job_description, resume_text)
         scores["keyword_matching"] = keyword_score
         results["sections"]["keyword_matching"] = {
             "score": keyword_score,
@@ -85,7 +91,7 @@ def check_ats_compatibility(resume_data: Dict[str, Any], job_description: Option
         })
 
     # 5. Check for formatting issues (10 points)
-    format_score, format_feedback = check_formatting(resume_data)
+    format_score, format_feedback = check_formatting(resume, resume_text)
     scores["formatting"] = format_score
     results["sections"]["formatting"] = {
         "score": format_score,
@@ -94,7 +100,7 @@ def check_ats_compatibility(resume_data: Dict[str, Any], job_description: Option
     }
 
     # 6. Check language quality (10 points)
-    language_score, language_feedback = check_language_quality(resume_data)
+    language_score, language_feedback = check_language_quality(resume, resume_text)
     scores["language_quality"] = language_score
     results["sections"]["language_quality"] = {
         "score": language_score,
@@ -139,30 +145,33 @@ def check_ats_compatibility(resume_data: Dict[str, Any], job_description: Option
     logger.info(f"Enhanced ATS compatibility check completed with score: {total_score}")
     return results
 
-def check_contact_info(resume_data: Dict[str, Any]) -> Tuple[int, List[str]]:
+def _experience(resume: Resume):
+    """Experience entries, or JSON Resume work entries if there is no experience section"""
+    return resume.experience if resume.experience is not None else resume.work
+
+def _submitted_summary(resume: Resume):
+    """The top-level summary if one was submitted, even an empty one, otherwise the summary in basics"""
+    return resume.raw["summary"] if "summary" in resume.raw else resume.basics.summary
+
+def _written_highlights(job) -> Tuple:
+    """Highlights as written; the model's stand-in made from the description isn't scored as one"""
+    return job.highlights if job.has_highlights else ()
+
+def check_contact_info(resume: Resume) -> Tuple[int, List[str]]:
     """Check if all necessary contact information is present and properly formatted"""
     score = 10
     feedback = []
 
-    # Check basics section
-    basics = resume_data.get("basics", {})
-    if not basics and isinstance(resume_data, dict):
-        # Try to find contact info at the top level if basics doesn't exist
-        basics = {
-            "name": resume_data.get("name", ""),
-            "email": resume_data.get("email", ""),
-            "phone": resume_data.get("phone", ""),
-            "location": resume_data.get("location", ""),
-            "linkedin": resume_data.get("linkedin", "")
-        }
+    # Contact info at the top level is already moved to basics by the model
+    basics = resume.basics
 
     # Check for name
-    if not basics.get("name"):
+    if not basics.name:
         score -= 3
         feedback.append("Missing name in contact information - this is critical for ATS identification")
 
     # Check for email
-    email = basics.get("email", "")
+    email = basics.email
     if not email:
         score -= 2
         feedback.append("Missing email address - essential contact information for employers")
@@ -171,18 +180,18 @@ def check_contact_info(resume_data: Dict[str, Any]) -> Tuple[int, List[str]]:
         feedback.append("Email address format may not be recognized by ATS systems")
 
     # Check for phone
-    phone = basics.get("phone", "")
+    phone = basics.phone
     if not phone:
         score -= 2
         feedback.append("Missing phone number - essential contact information for employers")
 
     # Check for location
-    if not basics.get("location"):
+    if not basics.location:
         score -= 1
         feedback.append("Missing location information - helps with geographic matching")
 
     # Check for LinkedIn (optional but recommended)
-    if not basics.get("linkedin") and not basics.get("profiles", []):
+    if not basics.linkedin and not basics.profiles:
         score -= 1
         feedback.append("Consider adding LinkedIn profile URL for better professional presence")
 
@@ -192,7 +201,7 @@ def check_contact_info(resume_data: Dict[str, Any]) -> Tuple[int, List[str]]:
 
     return max(0, score), feedback
 
-def check_section_headers(resume_data: Dict[str, Any]) -> Tuple[int, List[str]]:
+def check_section_headers(resume: Resume) -> Tuple[int, List[str]]:
     """Check if the resume has standard section headers and proper organization"""
     score = 15
     feedback = []
@@ -205,8 +214,9 @@ def check_section_headers(resume_data: Dict[str, Any]) -> Tuple[int, List[str]]:
 
     # Check which standard sections are present
     found_sections = []
+    section_keys = {key.lower() for key in resume.raw}
     for section in standard_sections:
-        if section in resume_data or any(s.lower() == section for s in resume_data.keys()):
+        if section in section_keys:
             found_sections.append(section)
 
     # Calculate score based on presence of key sections
@@ -226,7 +236,7 @@ def check_section_headers(resume_data: Dict[str, Any]) -> Tuple[int, List[str]]:
         feedback.append("Missing skills section - crucial for keyword matching in ATS systems")
 
     # Check for summary/objective
-    if "summary" not in found_sections and not resume_data.get("basics", {}).get("summary"):
+    if "summary" not in found_sections and not resume.basics.summary:
         score -= 2
         feedback.append("Missing professional summary - helps establish relevance quickly")
 
@@ -236,7 +246,7 @@ def check_section_headers(resume_data: Dict[str, Any]) -> Tuple[int, List[str]]:
 
     return max(0, score), feedback
 
-def check_content_quality(resume_data: Dict[str, Any]) -> Tuple[int, List[str]]:
+def check_content_quality(resume: Resume, resume_text: Optional[str] = None) -> Tuple[int, List[str]]:
     """Check the quality and length of content in the resume with detailed scoring"""
     max_score = 25
     current_score = max_score
@@ -244,11 +254,7 @@ def check_content_quality(resume_data: Dict[str, Any]) -> Tuple[int, List[str]]:
     detailed_feedback = []
 
     # Check summary/objective (5 points)
-    summary = ""
-    if "summary" in resume_data:
-        summary = resume_data["summary"]
-    elif resume_data.get("basics", {}).get("summary"):
-        summary = resume_data["basics"]["summary"]
+    summary = _submitted_summary(resume)
 
     if not summary:
         current_score -= 5
@@ -276,7 +282,7 @@ def check_content_quality(resume_data: Dict[str, Any]) -> Tuple[int, List[str]]:
             feedback.append("Summary could be strengthened with more industry-relevant keywords")
 
     # Check experience entries (8 points)
-    experience = resume_data.get("experience", resume_data.get("work", []))
+    experience = _experience(resume)
     if not experience or len(experience) == 0:
         current_score -= 8
         feedback.append("No work experience entries found - this is critical content for ATS evaluation")
@@ -288,7 +294,7 @@ def check_content_quality(resume_data: Dict[str, Any]) -> Tuple[int, List[str]]:
         # Check for dates (1 point)
         missing_dates = 0
         for job in experience:
-            if not job.get("startDate") or not job.get("endDate"):
+            if not job.start_date or not job.end_date:
                 missing_dates += 1
 
         if missing_dates > 0:
@@ -300,9 +306,9 @@ def check_content_quality(resume_data: Dict[str, Any]) -> Tuple[int, List[str]]:
         # Check for job titles and companies (2 points)
         missing_titles_companies = 0
         for job in experience:
-            if not job.get("position") and not job.get("title"):
+            if not job.position and not job.title:
                 missing_titles_companies += 0.5
-            if not job.get("company") and not job.get("organization"):
+            if not job.company and not job.organization:
                 missing_titles_companies += 0.5
 
         if missing_titles_companies > 0:
@@ -316,8 +322,8 @@ def check_content_quality(resume_data: Dict[str, Any]) -> Tuple[int, List[str]]:
         short_descriptions = 0
 
         for job in experience:
-            description = job.get("description", "")
-            highlights = job.get("highlights", [])
+            description = job.description or ""
+            highlights = _written_highlights(job)
 
             if not description and not highlights:
                 missing_descriptions += 1
@@ -348,8 +354,8 @@ def check_content_quality(resume_data: Dict[str, Any]) -> Tuple[int, List[str]]:
                                  "generated", "delivered", "achieved", "won", "awarded", "recognized"]
 
         for job in experience:
-            description = job.get("description", "").lower()
-            highlights = [h.lower() for h in job.get("highlights", [])]
+            description = (job.description or "").lower()
+            highlights = [h.lower() for h in _written_highlights(job)]
 
             # Check for action verbs
             has_action_verb = False
@@ -394,7 +400,7 @@ def check_content_quality(resume_data: Dict[str, Any]) -> Tuple[int, List[str]]:
             detailed_feedback.append("Experience: 8/8 points - Excellent experience section")
 
     # Check education (4 points)
-    education = resume_data.get("education", [])
+    education = resume.education
     if not education or len(education) == 0:
         current_score -= 4
         feedback.append("No education entries found - include your educational background")
@@ -406,9 +412,9 @@ def check_content_quality(resume_data: Dict[str, Any]) -> Tuple[int, List[str]]:
         # Check for institution and degree (2 points)
         missing_edu_info = 0
         for edu in education:
-            if not edu.get("institution"):
+            if not edu.institution:
                 missing_edu_info += 0.5
-            if not edu.get("area") and not edu.get("studyType"):
+            if not edu.area and not edu.study_type:
                 missing_edu_info += 0.5
 
         if missing_edu_info > 0:
@@ -420,7 +426,7 @@ def check_content_quality(resume_data: Dict[str, Any]) -> Tuple[int, List[str]]:
         # Check for dates (1 point)
         missing_edu_dates = 0
         for edu in education:
-            if not edu.get("startDate") or not edu.get("endDate"):
+            if not edu.start_date or not edu.end_date:
                 missing_edu_dates += 1
 
         if missing_edu_dates > 0:
@@ -432,7 +438,7 @@ def check_content_quality(resume_data: Dict[str, Any]) -> Tuple[int, List[str]]:
         # Check for additional details (1 point)
         has_details = False
         for edu in education:
-            if edu.get("gpa") or edu.get("courses") or edu.get("highlights") or edu.get("activities"):
+            if edu.gpa or edu.courses or edu.highlights or edu.activities:
                 has_details = True
                 break
 
@@ -451,7 +457,7 @@ def check_content_quality(resume_data: Dict[str, Any]) -> Tuple[int, List[str]]:
             detailed_feedback.append("Education: 4/4 points - Excellent education section")
 
     # Check skills section (5 points)
-    skills = resume_data.get("skills", [])
+    skills = resume.skills
     if not skills or len(skills) == 0:
         current_score -= 5
         feedback.append("Missing skills section or no skills listed - skills are crucial for ATS keyword matching")
@@ -474,7 +480,8 @@ def check_content_quality(resume_data: Dict[str, Any]) -> Tuple[int, List[str]]:
         # Check for skill categorization (1 point)
         has_categories = False
         for skill in skills:
-            if isinstance(skill, dict) and (skill.get("category") or skill.get("level")):
+            # Only a category given as such counts; keyword groups are labelled by their name
+            if skill.level or (isinstance(skill.raw, dict) and skill.raw.get("category")):
                 has_categories = True
                 break
 
@@ -487,7 +494,7 @@ def check_content_quality(resume_data: Dict[str, Any]) -> Tuple[int, List[str]]:
         technical_indicators = ["programming", "software", "technology", "system", "database", "framework", "language"]
         soft_indicators = ["communication", "leadership", "teamwork", "problem-solving", "management", "organization"]
 
-        skills_text = json.dumps(skills).lower()
+        skills_text = json.dumps([skill.raw for skill in skills]).lower()
         has_technical = any(indicator in skills_text for indicator in technical_indicators)
         has_soft = any(indicator in skills_text for indicator in soft_indicators)
 
@@ -510,7 +517,7 @@ def check_content_quality(resume_data: Dict[str, Any]) -> Tuple[int, List[str]]:
             detailed_feedback.append("Skills: 5/5 points - Excellent skills section")
 
     # Check overall resume length and structure (3 points)
-    resume_str = json.dumps(resume_data)
+    resume_str = resume_text if resume_text is not None else json.dumps(resume.raw)
     content_length = len(resume_str)
 
     length_score = 3
@@ -530,17 +537,9 @@ def check_content_quality(resume_data: Dict[str, Any]) -> Tuple[int, List[str]]:
         length_issues.append(f"Resume too long ({content_length} chars) (-1 point)")
 
     # Check for additional sections (certifications, projects, etc.)
-    additional_sections = 0
-    if resume_data.get("certifications") and len(resume_data.get("certifications", [])) > 0:
-        additional_sections += 1
-    if resume_data.get("projects") and len(resume_data.get("projects", [])) > 0:
-        additional_sections += 1
-    if resume_data.get("awards") and len(resume_data.get("awards", [])) > 0:
-        additional_sections += 1
-    if resume_data.get("publications") and len(resume_data.get("publications", [])) > 0:
-        additional_sections += 1
-    if resume_data.get("volunteer") and len(resume_data.get("volunteer", [])) > 0:
-        additional_sections += 1
+    # Sections are counted as submitted, like the section headers
+    additional_sections = sum(1 for section in ("certifications", "projects", "awards", "publications", "volunteer")
+                              if resume.raw.get(section))
 
     if additional_sections == 0:
         length_score = max(0, length_score - 1)
@@ -564,7 +563,7 @@ def check_content_quality(resume_data: Dict[str, Any]) -> Tuple[int, List[str]]:
 
     return max(0, current_score), feedback
 
-def check_keyword_matching(resume_data: Dict[str, Any], job_description: str) -> Tuple[int, List[str]]:
+def check_keyword_matching(resume: Resume, job_description: str, resume_text: Optional[str] = None) -> Tuple[int, List[str]]:
     """Check how well the resume matches keywords from the job description with detailed analysis"""
     max_score = 30
     current_score = 0
@@ -606,7 +605,7 @@ def check_keyword_matching(resume_data: Dict[str, Any], job_description: str) ->
             top_keywords.append(skill)
 
     # Convert resume to text for keyword searching
-    resume_text = json.dumps(resume_data).lower()
+    resume_text = (resume_text if resume_text is not None else json.dumps(resume.raw)).lower()
 
     # Count matching keywords
     matched_keywords = []
@@ -635,11 +634,7 @@ def check_keyword_matching(resume_data: Dict[str, Any], job_description: str) ->
     placement_issues = []
 
     # Check for keywords in summary (3 points)
-    summary = ""
-    if "summary" in resume_data:
-        summary = resume_data["summary"]
-    elif resume_data.get("basics", {}).get("summary"):
-        summary = resume_data["basics"]["summary"]
+    summary = _submitted_summary(resume)
 
     summary_keywords = 0
     if summary:
@@ -657,11 +652,11 @@ def check_keyword_matching(resume_data: Dict[str, Any], job_description: str) ->
         feedback.append("Add more job-specific keywords to your professional summary")
 
     # Check for keywords in experience (4 points)
-    experience = resume_data.get("experience", resume_data.get("work", []))
+    experience = _experience(resume)
     experience_keywords = 0
 
     if experience:
-        experience_text = json.dumps(experience).lower()
+        experience_text = json.dumps([job.raw for job in experience]).lower()
         for keyword in top_keywords:
             if keyword in experience_text:
                 experience_keywords += 1
@@ -675,11 +670,11 @@ def check_keyword_matching(resume_data: Dict[str, Any], job_description: str) ->
         feedback.append("Incorporate more job-specific keywords in your work experience descriptions")
 
     # Check for keywords in skills (3 points)
-    skills = resume_data.get("skills", [])
+    skills = resume.skills
     skills_keywords = 0
 
     if skills:
-        skills_text = json.dumps(skills).lower()
+        skills_text = json.dumps([skill.raw for skill in skills]).lower()
         for keyword in top_keywords:
             if keyword in skills_text:
                 skills_keywords += 1
@@ -786,7 +781,7 @@ def check_keyword_matching(resume_data: Dict[str, Any], job_description: str) ->
 
     return current_score, feedback
 
-def check_formatting(resume_data: Dict[str, Any]) -> Tuple[int, List[str]]:
+def check_formatting(resume: Resume, resume_text: Optional[str] = None) -> Tuple[int, List[str]]:
     """Check for potential formatting issues that might affect ATS parsing with detailed scoring"""
     max_score = 10
     current_score = max_score
@@ -794,7 +789,7 @@ def check_formatting(resume_data: Dict[str, Any]) -> Tuple[int, List[str]]:
     detailed_feedback = []
 
     # Convert to string to check for potential formatting issues
-    resume_str = json.dumps(resume_data)
+    resume_str = resume_text if resume_text is not None else json.dumps(resume.raw)
 
     # 1. Check for ATS-unfriendly structures (4 points)
     structure_score = 4
@@ -902,7 +897,7 @@ def check_formatting(resume_data: Dict[str, Any]) -> Tuple[int, List[str]]:
 
     # Check for section heading consistency
     section_headings = []
-    for key in resume_data.keys():
+    for key in resume.raw:
         if key not in ["basics", "meta", "schema"]:
             section_headings.append(key)
 
@@ -939,7 +934,7 @@ def check_formatting(resume_data: Dict[str, Any]) -> Tuple[int, List[str]]:
 
     return max(0, current_score), feedback
 
-def check_language_quality(resume_data: Dict[str, Any]) -> Tuple[int, List[str]]:
+def check_language_quality(resume: Resume, resume_text: Optional[str] = None) -> Tuple[int, List[str]]:
     """Check the language quality, including grammar, spelling, and professional tone with detailed scoring"""
     max_score = 10
     current_score = max_score
@@ -947,7 +942,7 @@ def check_language_quality(resume_data: Dict[str, Any]) -> Tuple[int, List[str]]
     detailed_feedback = []
 
     # Convert resume to text for analysis
-    resume_str = json.dumps(resume_data).lower()
+    resume_str = (resume_text if resume_text is not None else json.dumps(resume.raw)).lower()
 
     # 1. Check for professional tone (3 points)
     tone_score = 3
@@ -1053,15 +1048,15 @@ def check_language_quality(resume_data: Dict[str, Any]) -> Tuple[int, List[str]]
         grammar_issues.append(f"Some spelling errors ({error_count}) (-1 point)")
 
     # Check for consistency in tense (current jobs should use present tense)
-    experience = resume_data.get("experience", resume_data.get("work", []))
+    experience = _experience(resume) or ()
     tense_issues_count = 0
 
     for job in experience:
         is_current = False
-        if job.get("endDate") in ["Present", "present", "Current", "current", ""]:
+        if job.end_date in ["Present", "present", "Current", "current", ""]:
             is_current = True
 
-        description = job.get("description", "").lower()
+        description = (job.description or "").lower()
 
         # Skip if no description
         if not description:
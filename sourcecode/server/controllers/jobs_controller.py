@@ -0,0 +1,339 @@
+import os
+import time
+import uuid
+import queue
+import socket
+import logging
+import itertools
+import threading
+import zipfile
+from flask import jsonify, send_file
+from models.resume import load_resume
+from renderers.document import build_document
+from controllers.generate_controller import (
+    ALLOWED_FORMATS, CONTENT_TYPES, artifact_format, parse_generate_request, render_format
+)
+from utils.artifact_cache import artifact_cache, compute_artifact_key
+from utils.job_store import JobStore, JOB_QUEUED, JOB_DONE, JOB_FAILED
+from utils.render_pool import RenderQueueFull
+from utils.spool import create_spool
+
+# Configure logging
+logging.basicConfig(level=logging.INFO,
+                    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Named priorities; lower numbers are processed first
+PRIORITIES = {'high': 0, 'normal': 5, 'low': 9}
+
+# Finished artifacts are deleted after this many seconds
+JOB_TTL = int(os.environ.get('GENERATION_JOB_TTL', 3600))
+
+# How often idle workers look for expired jobs
+JANITOR_INTERVAL = 30
+
+# Seconds without a heartbeat after which another process takes over a process's unfinished jobs
+JOB_STALE_AFTER = float(os.environ.get('GENERATION_JOB_STALE_AFTER', 60))
+
+# How many times a job waits for a saturated render pool before failing
+MAX_BUSY_RETRIES = 10
+
+JOBS_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'temp', 'jobs')
+
+class GenerationJobQueue:
+    """
+    Priority queue of generation jobs processed by a pool of worker threads
+    Job state lives in the JobStore. Jobs belong to the process that queued them; when a process
+    stops, another one sharing the store takes over its unfinished jobs
+    """
+
+    def __init__(self, store, spool, workers, ttl, stale_after=JOB_STALE_AFTER):
+        self.store = store
+        self.spool = spool
+        self.workers = workers
+        self.ttl = ttl
+        self.stale_after = stale_after
+        self.owner = None
+        self._queue = queue.PriorityQueue()
+        self._sequence = itertools.count()
+        self._lock = threading.Lock()
+        self._started = False
+
+    def start(self):
+        """Start the worker threads and take over jobs left unfinished by stopped processes"""
+        with self._lock:
+            if self._started:
+                return
+            # Set here rather than at import, so every forked server process gets its own
+            self.owner = f'{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}'
+            self._started = True
+
+        self.spool.start()
+        self._take_over_stale()
+
+        for index in range(self.workers):
+            threading.Thread(target=self._work, name=f'generation-job-{index}', daemon=True).start()
+        threading.Thread(target=self._heartbeat, name='generation-job-heartbeat', daemon=True).start()
+
+    def create(self, job_id, request_data, priority):
+        """Store a new job owned by this process and queue it"""
+        self.start()
+        self.store.create(job_id, request_data, priority, owner=self.owner)
+        self.submit(job_id, priority)
+
+    def submit(self, job_id, priority):
+        self._queue.put((priority, next(self._sequence), job_id))
+
+    def _take_over_stale(self):
+        taken_over = self.store.take_over_stale(self.owner, self.stale_after)
+        for job_id, priority in taken_over:
+            self.submit(job_id, priority)
+        if taken_over:
+            logger.info(f'Took over {len(taken_over)} unfinished generation jobs')
+
+    def _heartbeat(self):
+        # Several beats per stale period, so a busy process is never mistaken for a stopped one
+        while True:
+            time.sleep(self.stale_after / 4)
+            try:
+                self.store.heartbeat(self.owner)
+                self._take_over_stale()
+            except Exception as error:
+                logger.error(f'Generation job heartbeat failed: {error}')
+
+    def depth(self):
+        return self._queue.qsize()
+
+    def _work(self):
+        last_purge = 0
+        while True:
+            try:
+                _, _, job_id = self._queue.get(timeout=JANITOR_INTERVAL)
+            except queue.Empty:
+                job_id = None
+
+            if job_id is not None:
+                self._process(job_id)
+
+            if time.time() - last_purge >= JANITOR_INTERVAL:
+                last_purge = time.time()
+                self.purge_expired()
+
+    def _render(self, artifact_key, resume, document, template, design_settings, format_type, optimize=None):
+        # Background jobs wait for a saturated render pool instead of being shed like requests
+        for attempt in range(MAX_BUSY_RETRIES):
+            try:
+                return render_format(artifact_key, resume, document, template, design_settings, format_type, optimize)
+            except RenderQueueFull as busy_error:
+                if attempt == MAX_BUSY_RETRIES - 1:
+                    raise
+                time.sleep(busy_error.retry_after)
+
+    def _process(self, job_id):
+        # A job can be queued twice, e.g. when it is taken over; only the claim that wins runs it
+        if not self.store.claim(job_id, self.owner):
+            return
+        request_data = self.store.get_request(job_id)
+        # Each run writes its own file, so a run that lost the job never touches the winner's result
+        run_name = f'{job_id}-{uuid.uuid4().hex[:8]}'
+
+        logger.info(f'Processing generation job {job_id}')
+
+        try:
+            resume = load_resume(request_data['resume_data'])
+            template = request_data['template']
+            design_settings = request_data['design_settings']
+            formats = request_data['formats']
+            file_name = request_data['file_name']
+            # Jobs queued before optimization reached jobs have no optimize option
+            optimize = request_data.get('optimize')
+
+            document = None
+            artifacts = {}
+            for index, format_type in enumerate(formats):
+                artifact_key = compute_artifact_key(
+                    resume.digest, template, design_settings, artifact_format(format_type, optimize)
+                )
+                artifact = artifact_cache.get(artifact_key)
+                if artifact is None:
+                    # The document model is built once and shared by every format
+                    document = document or build_document(resume)
+                    artifact = self._render(
+                        artifact_key, resume, document, template, design_settings, format_type, optimize
+                    )
+                artifacts[format_type] = artifact
+                self.store.update(job_id, owner=self.owner, progress=round((index + 1) / (len(formats) + 1), 2))
+
+            if len(formats) == 1:
+                format_type = formats[0]
+                result_name = f'{file_name}.{format_type}'
+                content_type = CONTENT_TYPES[format_type]
+                result_path = self.spool.allocate(f'.{format_type}', name=run_name)
+                with open(result_path, 'wb') as f:
+                    f.write(artifacts[format_type])
+            else:
+                result_name = f'{file_name}.zip'
+                content_type = 'application/zip'
+                result_path = self.spool.allocate('.zip', name=run_name)
+                with zipfile.ZipFile(result_path, 'w') as archive:
+                    for format_type, artifact in artifacts.items():
+                        compress_type = zipfile.ZIP_DEFLATED if format_type == 'txt' else zipfile.ZIP_STORED
+                        archive.writestr(f'{file_name}.{format_type}', artifact, compress_type=compress_type)
+            self.spool.commit(result_path)
+
+            finished = self.store.update(
+                job_id,
+                owner=self.owner,
+                status=JOB_DONE,
+                progress=1.0,
+                result_path=result_path,
+                result_name=result_name,
+                content_type=content_type,
+                expires_at=time.time() + self.ttl
+            )
+            if not finished:
+                # Another process took the job over while this one was stalled; its result is used
+                self.spool.remove(result_path)
+                logger.warning(f'Generation job {job_id} was taken over by another process')
+                return
+            logger.info(f'Generation job {job_id} finished')
+        except Exception as error:
+            logger.error(f'Generation job {job_id} failed: {error}')
+            self.store.update(
+                job_id, owner=self.owner, status=JOB_FAILED, error=str(error), expires_at=time.time() + self.ttl
+            )
+
+    def purge_expired(self):
+        """Delete expired jobs and their artifacts"""
+        for job in self.store.pop_expired():
+            if job['result_path']:
+                self.spool.remove(job['result_path'])
+
+# Job files outlive their TTL only until the janitor's next sweep, and are capped in total size
+job_spool = create_spool(
+    'jobs', 'GENERATION_JOBS', JOBS_DIR,
+    default_max_bytes=1024 * 1024 * 1024,
+    default_max_age=JOB_TTL + JANITOR_INTERVAL
+)
+job_store = JobStore(os.environ.get('GENERATION_JOBS_DB') or os.path.join(job_spool.root, 'jobs.sqlite3'))
+generation_jobs = GenerationJobQueue(
+    job_store,
+    job_spool,
+    workers=int(os.environ.get('GENERATION_JOB_WORKERS', 2)),
+    ttl=JOB_TTL
+)
+
+def _job_status(job):
+    status = {
+        'jobId': job['id'],
+        'status': job['status'],
+        'progress': job['progress'],
+        'createdAt': job['created_at'],
+        'updatedAt': job['updated_at'],
+        'expiresAt': job['expires_at']
+    }
+    if job['status'] == JOB_DONE:
+        status['resultUrl'] = f"/generate/jobs/{job['id']}/result"
+    if job['status'] == JOB_FAILED:
+        status['error'] = job['error']
+    return status
+
+def parse_priority(value):
+    """Return the numeric priority of a priority name or an integer from 0 to 9, or None if it is neither"""
+    if value is None:
+        return PRIORITIES['normal']
+    if isinstance(value, str):
+        return PRIORITIES.get(value.lower())
+    # bool is an int subclass, but true/false are not priorities
+    if isinstance(value, int) and not isinstance(value, bool) and 0 <= value <= 9:
+        return value
+    return None
+
+def create_generation_job(request):
+    """
+    Queue a generation job and return its id immediately
+    """
+    try:
+        options, error_response = parse_generate_request(request)
+        if error_response:
+            return error_response
+
+        formats = options['formats']
+        unsupported_formats = [format_type for format_type in formats if format_type not in ALLOWED_FORMATS]
+        if unsupported_formats or not formats:
+            logger.error(f'Unsupported format requested: {unsupported_formats}')
+            return jsonify({
+                'error': 'Unsupported format',
+                'message': 'Only PDF, DOCX, and TXT formats are supported'
+            }), 400
+
+        priority = parse_priority(options['priority'])
+        if priority is None:
+            return jsonify({
+                'error': 'Invalid priority',
+                'message': f'priority must be one of {", ".join(PRIORITIES)} or an integer from 0 to 9'
+            }), 400
+
+        job_id = str(uuid.uuid4())
+        generation_jobs.create(job_id, {
+            'resume_data': options['resume_data'],
+            'template': options['template'],
+            'design_settings': options['design_settings'],
+            'formats': formats,
+            'optimize': options['optimize'],
+            'file_name': ''.join(c if c.isalnum() else '-' for c in options['file_name']).lower() or 'resume'
+        }, priority)
+        logger.info(f'Queued generation job {job_id} with priority {priority}')
+
+        response = jsonify({
+            'jobId': job_id,
+            'status': JOB_QUEUED,
+            'statusUrl': f'/generate/jobs/{job_id}',
+            'resultUrl': f'/generate/jobs/{job_id}/result'
+        })
+        response.status_code = 202
+        response.headers['Location'] = f'/generate/jobs/{job_id}'
+        return response
+    except Exception as error:
+        logger.error(f'Error creating generation job: {error}')
+        return jsonify({
+            'error': 'Error creating generation job',
+            'message': str(error)
+        }), 500
+
+def get_generation_job(job_id):
+    """
+    Return the status and progress of a generation job
+    """
+    job = job_store.get(job_id)
+    if not job:
+        return jsonify({'error': 'Job not found', 'message': f'No generation job with id {job_id}'}), 404
+
+    return jsonify(_job_status(job))
+
+def get_generation_job_result(job_id):
+    """
+    Stream the artifact of a finished generation job
+    """
+    job = job_store.get(job_id)
+    if not job:
+        return jsonify({'error': 'Job not found', 'message': f'No generation job with id {job_id}'}), 404
+
+    if job['status'] == JOB_FAILED:
+        return jsonify({'error': 'File generation failed', 'message': job['error']}), 500
+
+    if job['status'] != JOB_DONE:
+        response = jsonify(_job_status(job))
+        response.status_code = 409
+        response.headers['Retry-After'] = '1'
+        return response
+
+    if not os.path.exists(job['result_path']):
+        return jsonify({'error': 'Result expired', 'message': 'The generated file is no longer available'}), 410
+
+    return send_file(
+        job['result_path'],
+        as_attachment=True,
+        download_name=job['result_name'],
+        mimetype=job['content_type']
+    )
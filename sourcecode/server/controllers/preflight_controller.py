@@ -0,0 +1,54 @@
+import logging
+from flask import jsonify
+from models.resume import load_resume
+from renderers.document import build_document
+from renderers.pdf import measure_layout, fit_scale
+from controllers.generate_controller import parse_fit_to_pages, parse_generate_request
+
+# Configure logging
+logging.basicConfig(level=logging.INFO,
+                    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+def preflight_resume(request):
+    """
+    Estimate the PDF layout of a resume without rendering it
+    Returns the page count and per-section heights; with fitToPages it also returns the
+    scale of font sizes and spacing that /generate will use to fit the resume on that many pages
+    """
+    try:
+        options, error_response = parse_generate_request(request)
+        if error_response:
+            return error_response
+
+        template = options['template']
+        design_settings = dict(options['design_settings'] or {})
+        body_target = (request.get_json(silent=True) or {}).get('fitToPages')
+        try:
+            target_pages = parse_fit_to_pages(body_target) or design_settings.get('fitToPages')
+        except ValueError as fit_error:
+            return jsonify({'error': 'Invalid fitToPages', 'message': str(fit_error)}), 400
+
+        document = build_document(load_resume(options['resume_data']))
+        result = measure_layout(document, design_settings, template=template)
+
+        if target_pages:
+            scale = fit_scale(document, design_settings, target_pages, template)
+            fitted = measure_layout(document, design_settings, scale, template) if scale != 1.0 else result
+            result['fit'] = {
+                'targetPages': target_pages,
+                'scale': scale,
+                'pages': fitted['pages'],
+                'fits': fitted['pages'] <= target_pages,
+                'designSettings': {**design_settings, 'fitToPages': target_pages}
+            }
+
+        return jsonify(result)
+    except (TypeError, ValueError) as error:
+        return jsonify({'error': 'Invalid request', 'message': str(error)}), 400
+    except Exception as error:
+        logger.error(f'Error during layout pre-flight: {error}')
+        return jsonify({
+            'error': 'Error during layout pre-flight',
+            'message': str(error)
+        }), 500
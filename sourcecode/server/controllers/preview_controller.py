@@ -0,0 +1,170 @@
+import os
+import io
+import base64
+import logging
+from flask import Response, jsonify, send_file
+from models.resume import load_resume
+from renderers.document import build_document
+from controllers.generate_controller import (
+    PDF_RENDER_TIMEOUT, bundle_executor, parse_generate_request, pdf_render_pool,
+    render_and_cache, render_busy_response
+)
+from utils.artifact_cache import artifact_cache, artifact_url, compute_artifact_key
+from utils.rasterizer import IMAGE_FORMATS, RasterizerUnavailable, available_rasterizer, rasterize_first_page
+from utils.render_pool import RenderQueueFull, RenderTimeout
+
+# Configure logging
+logging.basicConfig(level=logging.INFO,
+                    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Allowed preview widths in pixels
+DEFAULT_PREVIEW_WIDTH = 300
+MIN_PREVIEW_WIDTH = 50
+MAX_PREVIEW_WIDTH = 2000
+
+# Seconds browsers may reuse a preview without asking again
+PREVIEW_MAX_AGE = int(os.environ.get('PREVIEW_MAX_AGE', 3600))
+
+# Largest number of previews one batch request may ask for
+PREVIEW_BATCH_MAX = int(os.environ.get('PREVIEW_BATCH_MAX', 24))
+
+# Report a missing rasterizer when the server starts rather than on the first preview request
+PREVIEW_RASTERIZER = available_rasterizer()
+if PREVIEW_RASTERIZER:
+    logger.info(f'Previews are rasterized with {PREVIEW_RASTERIZER}')
+else:
+    logger.warning('No PDF rasterizer installed (pip install PyMuPDF, or poppler-utils for pdftoppm); '
+                   '/preview and /preview/batch will answer 501')
+
+def _preview_options(data):
+    width = int(data.get('width') or DEFAULT_PREVIEW_WIDTH)
+    if not MIN_PREVIEW_WIDTH <= width <= MAX_PREVIEW_WIDTH:
+        raise ValueError(f'width must be between {MIN_PREVIEW_WIDTH} and {MAX_PREVIEW_WIDTH}')
+
+    image_format = str(data.get('imageFormat') or 'png').lower()
+    if image_format not in IMAGE_FORMATS:
+        raise ValueError(f'imageFormat must be one of {", ".join(IMAGE_FORMATS)}')
+    return width, image_format
+
+def preview_key(resume, template, design_settings, width, image_format):
+    """Artifact cache key of a page-1 preview; the size and image format take the place of the file format"""
+    return compute_artifact_key(resume.digest, template, design_settings, f'preview-{width}.{image_format}')
+
+def render_preview(resume, template, design_settings, width, image_format):
+    """
+    Return (key, image bytes) of page 1 of the resume's PDF
+    The PDF and the preview are both taken from the artifact cache when present
+    """
+    key = preview_key(resume, template, design_settings, width, image_format)
+    image = artifact_cache.get(key)
+    if image is not None:
+        return key, image
+
+    pdf_key = compute_artifact_key(resume.digest, template, design_settings, 'pdf')
+    pdf = artifact_cache.get(pdf_key)
+    if pdf is None:
+        pdf = render_and_cache(pdf_key, build_document(resume), template, design_settings, 'pdf')
+
+    # Rasterizing is CPU-bound too, so it runs in the PDF render pool when one is enabled
+    if pdf_render_pool.enabled:
+        image = pdf_render_pool.run(rasterize_first_page, pdf, width, image_format, timeout=PDF_RENDER_TIMEOUT)
+    else:
+        image = rasterize_first_page(pdf, width, image_format)
+
+    artifact_cache.put(key, image, image_format)
+    logger.info(f'Preview {key} rendered at {width}px. Size: {len(image)} bytes')
+    return key, image
+
+def _error_response(error):
+    if isinstance(error, RenderQueueFull):
+        return render_busy_response(error)
+    if isinstance(error, RenderTimeout):
+        return jsonify({'error': 'Preview timed out', 'message': str(error)}), 504
+    if isinstance(error, RasterizerUnavailable):
+        return jsonify({'error': 'Preview unavailable', 'message': str(error)}), 501
+    if isinstance(error, ValueError):
+        return jsonify({'error': 'Invalid request', 'message': str(error)}), 400
+
+    logger.error(f'Error generating preview: {error}')
+    return jsonify({'error': 'Error generating preview', 'message': str(error)}), 500
+
+def get_preview(request):
+    """
+    Render page 1 of a resume to PNG or WebP at the requested width
+    Accepts the body of /generate plus optional width and imageFormat
+    """
+    try:
+        options, error_response = parse_generate_request(request)
+        if error_response:
+            return error_response
+
+        width, image_format = _preview_options(request.get_json(silent=True) or request.form)
+        resume = load_resume(options['resume_data'])
+        template = options['template']
+        design_settings = options['design_settings']
+
+        key = preview_key(resume, template, design_settings, width, image_format)
+        if request.if_none_match.contains_weak(key):
+            response = Response(status=304)
+            response.set_etag(key)
+            return response
+
+        key, image = render_preview(resume, template, design_settings, width, image_format)
+        response = send_file(io.BytesIO(image), mimetype=IMAGE_FORMATS[image_format], etag=key)
+        response.cache_control.no_cache = None
+        response.cache_control.max_age = PREVIEW_MAX_AGE
+        response.headers['Content-Location'] = artifact_url(key, image_format)
+        return response
+    except Exception as error:
+        return _error_response(error)
+
+def get_preview_batch(request):
+    """
+    Render previews of several resumes in one call
+    Body: {"items": [{"resumeData", "template", "designSettings"}, ...], "width", "imageFormat"};
+    every item is answered with a data URI or its own error, in request order
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        items = data.get('items')
+        if not isinstance(items, list) or not items:
+            return jsonify({'error': 'Missing data', 'message': 'items must be a non-empty list'}), 400
+        if len(items) > PREVIEW_BATCH_MAX:
+            return jsonify({
+                'error': 'Too many items',
+                'message': f'At most {PREVIEW_BATCH_MAX} previews can be requested at once'
+            }), 400
+
+        width, image_format = _preview_options(data)
+
+        def preview_item(item):
+            resume = load_resume(item.get('resumeData'))
+            return render_preview(resume, item.get('template'), item.get('designSettings'), width, image_format)
+
+        # Items that are not resumes get their own error instead of a placeholder preview
+        futures = [
+            bundle_executor.submit(preview_item, item)
+            if isinstance(item, dict) and isinstance(item.get('resumeData'), dict) else None
+            for item in items
+        ]
+
+        previews = []
+        for future in futures:
+            if future is None:
+                previews.append({'error': 'Missing data', 'message': 'Each item must be an object with resumeData'})
+                continue
+            try:
+                key, image = future.result()
+                previews.append({
+                    'etag': key,
+                    'url': artifact_url(key, image_format),
+                    'dataUri': f'data:{IMAGE_FORMATS[image_format]};base64,{base64.b64encode(image).decode("ascii")}'
+                })
+            except Exception as error:
+                logger.error(f'Error generating preview in batch: {error}')
+                previews.append({'error': type(error).__name__, 'message': str(error)})
+
+        return jsonify({'width': width, 'imageFormat': image_format, 'previews': previews})
+    except Exception as error:
+        return _error_response(error)
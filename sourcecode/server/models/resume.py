@@ -0,0 +1,341 @@
+import os
+import json
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+# Configure logging
+logging.basicConfig(level=logging.INFO,
+                    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Number of normalized resumes kept for reuse across requests
+RESUME_CACHE_SIZE = int(os.environ.get('RESUME_CACHE_SIZE', 256))
+
+# Keys of basics that may also appear at the top level of the resume
+BASICS_KEYS = ('name', 'title', 'email', 'phone', 'location', 'linkedin')
+
+def _as_tuple(value) -> Tuple:
+    if value is None:
+        return ()
+    if isinstance(value, (list, tuple)):
+        return tuple(value)
+    return (value,)
+
+def _as_date(value) -> Optional[str]:
+    if value is None or isinstance(value, str):
+        return value
+    return str(value)
+
+class _Model:
+    """
+    Base class of the resume model
+    Instances are treated as immutable, so copies share every unchanged attribute
+    """
+    __slots__ = ()
+
+    def replace(self, **changes):
+        """Return a copy with some attributes replaced; all other attributes are shared"""
+        clone = object.__new__(type(self))
+        for name in self.__slots__:
+            setattr(clone, name, changes.pop(name) if name in changes else getattr(self, name))
+        if changes:
+            raise AttributeError(f'{type(self).__name__} has no attributes {sorted(changes)}')
+        return clone
+
+    def __eq__(self, other):
+        return type(self) is type(other) and all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+
+    def __repr__(self):
+        fields = ', '.join(f'{name}={getattr(self, name)!r}' for name in self.__slots__ if name != 'raw')
+        return f'{type(self).__name__}({fields})'
+
+class Basics(_Model):
+    __slots__ = ('name', 'title', 'email', 'phone', 'location', 'linkedin', 'profiles', 'summary', 'image', 'raw')
+
+    def __init__(self, raw: Dict[str, Any]):
+        self.raw = raw
+        self.name = raw.get('name')
+        self.title = raw.get('title')
+        self.email = raw.get('email')
+        self.phone = raw.get('phone')
+        self.location = raw.get('location')
+        self.linkedin = raw.get('linkedin')
+        self.profiles = _as_tuple(raw.get('profiles'))
+        self.summary = raw.get('summary')
+        # Photo as a data URI; JSON Resume calls it image, older exports picture
+        self.image = raw.get('image') or raw.get('picture')
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = dict(self.raw)
+        for key in BASICS_KEYS + ('summary',):
+            value = getattr(self, key)
+            if value is not None or key in data:
+                data[key] = value
+        return data
+
+class Experience(_Model):
+    __slots__ = (
+        'title', 'position', 'company', 'organization', 'location', 'start_date', 'end_date',
+        'description', 'highlights', 'has_highlights', 'logo', 'raw'
+    )
+
+    def __init__(self, raw: Dict[str, Any]):
+        self.raw = raw
+        self.title = raw.get('title')
+        # JSON Resume names the title position; some exports name the company organization
+        self.position = raw.get('position')
+        self.company = raw.get('company')
+        self.organization = raw.get('organization')
+        self.location = raw.get('location')
+        self.start_date = _as_date(raw.get('startDate'))
+        self.end_date = _as_date(raw.get('endDate'))
+        self.description = raw.get('description')
+        self.logo = raw.get('logo')
+
+        # Ensure highlights exists; a lone description becomes the only highlight
+        self.has_highlights = 'highlights' in raw
+        if self.has_highlights:
+            self.highlights = _as_tuple(raw['highlights'])
+        elif 'description' in raw:
+            self.highlights = (raw['description'],)
+        else:
+            self.highlights = ()
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = dict(self.raw)
+        data['highlights'] = list(self.highlights)
+        if 'startDate' in data:
+            data['startDate'] = self.start_date
+        if 'endDate' in data:
+            data['endDate'] = self.end_date
+        return data
+
+class Education(_Model):
+    __slots__ = (
+        'degree', 'school', 'institution', 'study_type', 'area', 'start_date', 'end_date',
+        'gpa', 'courses', 'highlights', 'activities', 'raw'
+    )
+
+    def __init__(self, raw: Dict[str, Any]):
+        self.raw = raw
+        self.study_type = raw.get('studyType')
+        self.area = raw.get('area')
+        self.institution = raw.get('institution')
+        # Map studyType to degree and institution to school if they don't exist
+        self.degree = raw['degree'] if 'degree' in raw else self.study_type
+        self.school = raw['school'] if 'school' in raw else self.institution
+        self.start_date = _as_date(raw.get('startDate'))
+        self.end_date = _as_date(raw.get('endDate'))
+        # Optional details, kept as given
+        self.gpa = raw.get('gpa')
+        self.courses = raw.get('courses')
+        self.highlights = raw.get('highlights')
+        self.activities = raw.get('activities')
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = dict(self.raw)
+        if 'degree' in data or 'studyType' in data:
+            data['degree'] = self.degree
+        if 'school' in data or 'institution' in data:
+            data['school'] = self.school
+        if 'startDate' in data:
+            data['startDate'] = self.start_date
+        if 'endDate' in data:
+            data['endDate'] = self.end_date
+        return data
+
+class Skill(_Model):
+    """A skill is either a plain name or a category with a list of items"""
+    __slots__ = ('name', 'category', 'items', 'level', 'raw')
+
+    def __init__(self, raw):
+        self.raw = raw
+        self.name = None
+        self.category = None
+        self.items = None
+        self.level = None
+
+        if isinstance(raw, dict):
+            self.level = raw.get('level')
+            if 'name' in raw and 'keywords' in raw:
+                self.category = raw['name']
+                self.items = _as_tuple(raw['keywords'])
+            elif 'name' in raw:
+                self.name = raw['name']
+            elif 'category' in raw and 'items' in raw:
+                self.category = raw['category']
+                self.items = _as_tuple(raw['items'])
+        elif isinstance(raw, str):
+            self.name = raw
+
+    def to_dict(self):
+        if isinstance(self.raw, dict) and 'name' in self.raw and 'keywords' in self.raw:
+            return {'category': self.category, 'items': list(self.items)}
+        if self.name is not None:
+            return self.name
+        return self.raw
+
+class Project(_Model):
+    __slots__ = ('name', 'description', 'highlights', 'technologies', 'raw')
+
+    def __init__(self, raw: Dict[str, Any]):
+        self.raw = raw
+        self.name = raw.get('name')
+        self.description = raw.get('description')
+        self.highlights = _as_tuple(raw['highlights']) if raw.get('highlights') else ()
+        # Map keywords to technologies if technologies doesn't exist
+        if 'technologies' in raw:
+            self.technologies = raw['technologies']
+        elif 'keywords' in raw:
+            self.technologies = _as_tuple(raw['keywords'])
+        else:
+            self.technologies = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = dict(self.raw)
+        if 'technologies' not in data and self.technologies is not None:
+            data['technologies'] = list(self.technologies)
+        return data
+
+class Certification(_Model):
+    __slots__ = ('name', 'issuer', 'date', 'raw')
+
+    def __init__(self, raw: Dict[str, Any]):
+        self.raw = raw
+        self.name = raw.get('name')
+        self.issuer = raw.get('issuer')
+        self.date = raw.get('date')
+
+    def to_dict(self) -> Dict[str, Any]:
+        return self.raw
+
+class Language(_Model):
+    __slots__ = ('language', 'proficiency', 'raw')
+
+    def __init__(self, raw):
+        self.raw = raw
+        if isinstance(raw, dict):
+            self.language = raw.get('language')
+            # Map fluency to proficiency if proficiency doesn't exist
+            self.proficiency = raw.get('fluency', raw.get('proficiency'))
+        else:
+            self.language = None
+            self.proficiency = raw
+
+    def to_dict(self):
+        if isinstance(self.raw, dict) and 'proficiency' not in self.raw and 'fluency' in self.raw:
+            return {**self.raw, 'proficiency': self.raw['fluency']}
+        return self.raw
+
+def _entries(raw, key, model, accepts_scalars=False):
+    value = raw.get(key)
+    if not isinstance(value, list):
+        return None
+    # Entries that are not objects cannot be normalized and are dropped, except for
+    # skills and languages which are often given as plain strings
+    return tuple(model(item) for item in value if accepts_scalars or isinstance(item, dict))
+
+class Resume(_Model):
+    """
+    Typed, normalized view of a resume
+    Built in a single pass from raw JSON without copying it; raw sub-objects are shared, never mutated
+    """
+    __slots__ = (
+        'basics', 'summary', 'experience', 'education', 'skills', 'projects',
+        'certifications', 'languages', 'achievements', 'work', 'raw', 'digest'
+    )
+
+    def __init__(self, raw: Dict[str, Any], digest: Optional[str] = None):
+        self.raw = raw
+        self.digest = digest
+
+        basics = raw.get('basics') if isinstance(raw.get('basics'), dict) else {}
+        # If name, title, etc. are at the top level but not in basics, move them to basics
+        promoted = {key: raw[key] for key in BASICS_KEYS if key in raw and key not in basics}
+        self.basics = Basics({**basics, **promoted} if promoted else basics)
+
+        self.summary = raw.get('summary') or self.basics.summary
+
+        self.experience = _entries(raw, 'experience', Experience)
+        self.education = _entries(raw, 'education', Education)
+        self.skills = _entries(raw, 'skills', Skill, accepts_scalars=True)
+        self.languages = _entries(raw, 'languages', Language, accepts_scalars=True)
+        self.projects = _entries(raw, 'projects', Project)
+        self.certifications = _entries(raw, 'certifications', Certification)
+        # JSON Resume work entries; they are scored, but only experience is rendered
+        self.work = _entries(raw, 'work', Experience)
+
+        # Map awards to achievements if achievements doesn't exist
+        if 'achievements' not in raw and isinstance(raw.get('awards'), list):
+            self.achievements = tuple({
+                'title': award.get('title', 'Award'),
+                'date': award.get('date', ''),
+                'organization': award.get('awarder', ''),
+                'description': award.get('summary', '')
+            } for award in raw['awards'])
+        else:
+            self.achievements = raw.get('achievements')
+
+    def replace(self, **changes):
+        # A modified resume no longer matches the digest of its input
+        changes.setdefault('digest', None)
+        return super().replace(**changes)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Return the normalized resume as plain dicts, in the shape produced by normalize_resume_data
+        Unchanged sub-objects are shared with the input, so treat the result as read-only
+        """
+        data = dict(self.raw)
+        data['basics'] = self.basics.to_dict()
+
+        # If summary is in basics but not at top level, copy it to top level
+        if 'summary' not in self.raw and 'summary' in self.basics.raw:
+            data['summary'] = self.basics.summary
+
+        for key in ('experience', 'education', 'skills', 'languages', 'projects', 'certifications'):
+            entries = getattr(self, key)
+            if entries is not None:
+                data[key] = [entry.to_dict() for entry in entries]
+
+        if 'achievements' not in self.raw and self.achievements is not None:
+            data['achievements'] = list(self.achievements)
+
+        return data
+
+def resume_digest(raw) -> str:
+    """Hash of the raw resume JSON, independent of key order"""
+    payload = json.dumps(raw, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+_resume_cache = OrderedDict()
+_resume_cache_lock = threading.Lock()
+
+def load_resume(raw) -> Resume:
+    """
+    Build the typed resume model from raw JSON
+    Results are memoized by the hash of the input, so repeated requests for the same resume skip normalization
+    """
+    if isinstance(raw, Resume):
+        return raw
+    if not raw:
+        raw = {}
+
+    digest = resume_digest(raw)
+    with _resume_cache_lock:
+        resume = _resume_cache.get(digest)
+        if resume is not None:
+            _resume_cache.move_to_end(digest)
+            return resume
+
+    resume = Resume(raw, digest)
+
+    with _resume_cache_lock:
+        _resume_cache[digest] = resume
+        while len(_resume_cache) > RESUME_CACHE_SIZE:
+            _resume_cache.popitem(last=False)
+
+    return resume
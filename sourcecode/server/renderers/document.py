@@ -0,0 +1,271 @@
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import List, Optional
+from models.resume import load_resume
+from renderers.images import EmbeddedImage, load_image
+
+# Configure logging
+logging.basicConfig(level=logging.INFO,
+                    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Block kinds understood by every output backend
+#   name, headline, contact  - resume header lines
+#   item_title               - first line of an entry (job, degree, project, ...)
+#   item_subtitle            - secondary entry line (dates, school, issuer and date)
+#   paragraph                - free text
+#   bullet                   - one bullet point
+#   keyed_list               - labelled list of items, e.g. a skill category
+#   fields                   - labelled values listed together, e.g. languages
+#   entry_break              - end of an entry within a section
+#   image                    - a prepared image (photo or logo, given by the label); its run holds the digest
+BLOCK_KINDS = (
+    'name', 'headline', 'contact', 'item_title', 'item_subtitle',
+    'paragraph', 'bullet', 'keyed_list', 'fields', 'entry_break', 'image'
+)
+
+@dataclass
+class Run:
+    """A piece of text, optionally labelled (e.g. 'Email' or a language name)"""
+    text: str
+    label: str = ''
+
+@dataclass
+class Block:
+    """A layout-independent unit of content made of runs"""
+    kind: str
+    runs: List[Run] = field(default_factory=list)
+    label: str = ''
+    # Left out of repr and comparisons; the digest in runs identifies the image
+    image: Optional[EmbeddedImage] = field(default=None, repr=False, compare=False)
+
+    @property
+    def text(self):
+        """Plain text of the block; labelled runs are joined as 'Label: text | ...'"""
+        if any(run.label for run in self.runs):
+            return " | ".join(f"{run.label}: {run.text}" if run.label else run.text for run in self.runs)
+        return ''.join(run.text for run in self.runs)
+
+@dataclass
+class Section:
+    """A titled group of blocks; the header section has no title"""
+    key: str
+    title: str
+    blocks: List[Block] = field(default_factory=list)
+
+    @property
+    def has_entries(self):
+        return any(block.kind == 'entry_break' for block in self.blocks)
+
+@dataclass
+class ResumeDocument:
+    """Format-independent resume built once per request and shared by all backends"""
+    name: str
+    title: str
+    sections: List[Section] = field(default_factory=list)
+
+# Helper function to format dates from YYYY-MM to Month Year
+def format_date(date_string):
+    """Format date from YYYY-MM to Month Year"""
+    if not date_string:
+        return ''
+
+    # Handle 'Present' or other non-date strings
+    if date_string.lower() == 'present' or '-' not in date_string:
+        return date_string
+
+    try:
+        year, month = date_string.split('-')
+        date = datetime(int(year), int(month), 1)
+        return date.strftime('%B %Y')
+    except Exception as e:
+        logger.error(f'Error formatting date: {e}')
+        return date_string
+
+def _text_block(kind, text):
+    return Block(kind, [Run(str(text))])
+
+def _format_location(location):
+    if isinstance(location, dict):
+        location_str = location.get('city', '')
+        if location.get('region'):
+            location_str += f", {location['region']}"
+        return location_str
+    return location
+
+def _degree_text(edu):
+    if edu.study_type and edu.area:
+        return f"{edu.study_type} in {edu.area}"
+    elif edu.study_type:
+        return edu.study_type
+    elif edu.area:
+        return f"Degree in {edu.area}"
+    elif edu.degree:
+        return edu.degree
+    return "Degree"
+
+def _or_default(value, default):
+    return default if value is None else value
+
+def _image_block(value, role):
+    image = load_image(value, role)
+    if image is None:
+        return None
+    return Block('image', [Run(image.digest)], label=role, image=image)
+
+def _skill_block(skill):
+    if skill.items is not None:
+        return Block('keyed_list', [Run(str(item)) for item in skill.items], label=skill.category)
+    elif skill.name is not None:
+        return _text_block('paragraph', skill.name)
+    return None
+
+def build_header_section(basics):
+    """Build the header section with name, headline and contact line"""
+    contact = []
+    if basics.email:
+        contact.append(Run(str(basics.email), label='Email'))
+    if basics.phone:
+        contact.append(Run(str(basics.phone), label='Phone'))
+    if basics.location:
+        contact.append(Run(str(_format_location(basics.location)), label='Location'))
+
+    blocks = []
+    photo = _image_block(basics.image, 'photo')
+    if photo:
+        blocks.append(photo)
+
+    blocks += [
+        _text_block('name', _or_default(basics.name, 'No Name')),
+        _text_block('headline', _or_default(basics.title, 'No Title'))
+    ]
+    if contact:
+        blocks.append(Block('contact', contact))
+
+    return Section('header', '', blocks)
+
+def build_experience_section(experience):
+    blocks = []
+    for exp in experience:
+        logo = _image_block(exp.logo, 'logo')
+        if logo:
+            blocks.append(logo)
+        blocks.append(_text_block('item_title', f"{_or_default(exp.title, 'Position')} at {_or_default(exp.company, 'Company')}"))
+
+        start_date = format_date(exp.start_date or '')
+        end_date = format_date(_or_default(exp.end_date, 'Present'))
+        blocks.append(_text_block('item_subtitle', f"{start_date} - {end_date}"))
+
+        if exp.location:
+            blocks.append(_text_block('item_subtitle', exp.location))
+
+        if exp.highlights:
+            blocks.extend(_text_block('bullet', highlight) for highlight in exp.highlights)
+        elif exp.description:
+            blocks.append(_text_block('paragraph', exp.description))
+
+        blocks.append(Block('entry_break'))
+    return Section('experience', 'EXPERIENCE', blocks)
+
+def build_education_section(education):
+    blocks = []
+    for edu in education:
+        blocks.append(_text_block('item_title', _degree_text(edu)))
+
+        if edu.institution or edu.school:
+            blocks.append(_text_block('item_subtitle', edu.institution or edu.school))
+
+        start_date = format_date(edu.start_date or '')
+        end_date = format_date(_or_default(edu.end_date, 'Present'))
+        if start_date or end_date:
+            blocks.append(_text_block('item_subtitle', f"{start_date} - {end_date}"))
+
+        blocks.append(Block('entry_break'))
+    return Section('education', 'EDUCATION', blocks)
+
+def build_skills_section(skills):
+    blocks = [block for block in (_skill_block(skill) for skill in skills) if block is not None]
+    return Section('skills', 'SKILLS', blocks)
+
+def build_projects_section(projects):
+    blocks = []
+    for project in projects:
+        blocks.append(_text_block('item_title', _or_default(project.name, 'Project')))
+
+        if project.description:
+            blocks.append(_text_block('paragraph', project.description))
+
+        blocks.extend(_text_block('bullet', highlight) for highlight in project.highlights)
+
+        blocks.append(Block('entry_break'))
+    return Section('projects', 'PROJECTS', blocks)
+
+def build_certifications_section(certifications):
+    blocks = []
+    for cert in certifications:
+        blocks.append(_text_block('item_title', _or_default(cert.name, 'Certification')))
+
+        fields = []
+        if cert.issuer:
+            fields.append(Run(str(cert.issuer), label='Issuer'))
+        if cert.date:
+            fields.append(Run(format_date(cert.date), label='Date'))
+        if fields:
+            blocks.append(Block('item_subtitle', fields))
+
+        blocks.append(Block('entry_break'))
+    return Section('certifications', 'CERTIFICATIONS', blocks)
+
+def build_languages_section(languages):
+    runs = [
+        Run(str(_or_default(lang.proficiency, 'Fluent')), label=str(_or_default(lang.language, 'Language')))
+        if isinstance(lang.raw, dict) else Run(str(lang.raw))
+        for lang in languages
+    ]
+    return Section('languages', 'LANGUAGES', [Block('fields', runs)])
+
+# Section builders in document order
+SECTION_BUILDERS = (
+    ('experience', build_experience_section),
+    ('education', build_education_section),
+    ('skills', build_skills_section),
+    ('projects', build_projects_section),
+    ('certifications', build_certifications_section),
+    ('languages', build_languages_section)
+)
+
+def iter_sections(resume):
+    """
+    Yield the sections of the document model one at a time, in document order
+    Lets streaming backends emit a section before the following ones are built
+    """
+    resume = load_resume(resume)
+    yield build_header_section(resume.basics)
+
+    if resume.summary:
+        yield Section('summary', 'SUMMARY', [_text_block('paragraph', resume.summary)])
+
+    for key, builder in SECTION_BUILDERS:
+        entries = getattr(resume, key)
+        if entries:
+            yield builder(entries)
+
+def build_document(resume):
+    """
+    Build the intermediate document model from the typed resume model (or raw resume data)
+    This is the only place that walks the resume; backends only consume the result
+    """
+    resume = load_resume(resume)
+    basics = resume.basics
+    return ResumeDocument(
+        name=_or_default(basics.name, 'No Name'),
+        title=_or_default(basics.title, 'No Title'),
+        sections=list(iter_sections(resume))
+    )
+
+def as_document(resume):
+    """Return the document model for a resume, or the document itself if one is given"""
+    if isinstance(resume, ResumeDocument):
+        return resume
+    return build_document(resume)
@@ -0,0 +1,311 @@
+import re
+import zipfile
+import logging
+from functools import lru_cache
+from xml.sax.saxutils import escape
+from renderers.output import open_output
+
+# Configure logging
+logging.basicConfig(level=logging.INFO,
+                    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+DEFAULT_FONT = 'Helvetica'
+DEFAULT_PRIMARY_COLOR = '4a6cf7'
+
+# Characters that are not allowed in XML 1.0 documents
+INVALID_XML_CHARS = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f\ufffe\uffff]')
+
+WORD_NAMESPACE = 'http://schemas.openxmlformats.org/wordprocessingml/2006/main'
+
+# Static package parts, encoded once at import and written verbatim into every document
+CONTENT_TYPES_XML = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/word/document.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>'
+    '<Override PartName="/word/styles.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.styles+xml"/>'
+    '<Override PartName="/docProps/core.xml" '
+    'ContentType="application/vnd.openxmlformats-package.core-properties+xml"/>'
+    '</Types>'
+).encode('utf-8')
+
+PACKAGE_RELS_XML = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="word/document.xml"/>'
+    '<Relationship Id="rId2" '
+    'Type="http://schemas.openxmlformats.org/package/2006/relationships/metadata/core-properties" '
+    'Target="docProps/core.xml"/>'
+    '</Relationships>'
+).encode('utf-8')
+
+DOCUMENT_RELS_START = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles" '
+    'Target="styles.xml"/>'
+)
+DOCUMENT_RELS_XML = (DOCUMENT_RELS_START + '</Relationships>').encode('utf-8')
+
+IMAGE_RELATIONSHIP = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships/image'
+
+# Documents with images also declare the media types and the DrawingML namespaces
+CONTENT_TYPES_WITH_MEDIA_XML = CONTENT_TYPES_XML.replace(
+    b'<Default Extension="xml" ContentType="application/xml"/>',
+    b'<Default Extension="xml" ContentType="application/xml"/>'
+    b'<Default Extension="png" ContentType="image/png"/>'
+    b'<Default Extension="jpeg" ContentType="image/jpeg"/>'
+)
+
+CORE_XML_TEMPLATE = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<cp:coreProperties '
+    'xmlns:cp="http://schemas.openxmlformats.org/package/2006/metadata/core-properties" '
+    'xmlns:dc="http://purl.org/dc/elements/1.1/">'
+    '<dc:title>{title}</dc:title>'
+    '<dc:creator>{author}</dc:creator>'
+    '<dc:subject>Professional Resume</dc:subject>'
+    '<cp:keywords>resume, cv, professional</cp:keywords>'
+    '</cp:coreProperties>'
+)
+
+DOCUMENT_START = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    f'<w:document xmlns:w="{WORD_NAMESPACE}"><w:body>'
+).encode('utf-8')
+
+DOCUMENT_WITH_MEDIA_START = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    f'<w:document xmlns:w="{WORD_NAMESPACE}" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships" '
+    'xmlns:wp="http://schemas.openxmlformats.org/drawingml/2006/wordprocessingDrawing" '
+    'xmlns:a="http://schemas.openxmlformats.org/drawingml/2006/main" '
+    'xmlns:pic="http://schemas.openxmlformats.org/drawingml/2006/picture"><w:body>'
+).encode('utf-8')
+
+# DrawingML sizes are in English Metric Units
+EMU_PER_POINT = 12700
+
+INLINE_IMAGE_TEMPLATE = (
+    '<w:r><w:drawing><wp:inline distT="0" distB="0" distL="0" distR="0">'
+    '<wp:extent cx="{cx}" cy="{cy}"/><wp:docPr id="{id}" name="Picture {id}"/>'
+    '<a:graphic><a:graphicData uri="http://schemas.openxmlformats.org/drawingml/2006/picture">'
+    '<pic:pic><pic:nvPicPr><pic:cNvPr id="{id}" name="{name}"/><pic:cNvPicPr/></pic:nvPicPr>'
+    '<pic:blipFill><a:blip r:embed="{rel_id}"/><a:stretch><a:fillRect/></a:stretch></pic:blipFill>'
+    '<pic:spPr><a:xfrm><a:off x="0" y="0"/><a:ext cx="{cx}" cy="{cy}"/></a:xfrm>'
+    '<a:prstGeom prst="rect"><a:avLst/></a:prstGeom></pic:spPr>'
+    '</pic:pic></a:graphicData></a:graphic></wp:inline></w:drawing></w:r>'
+)
+
+# A4 with the same 40pt margins as the PDF backend (sizes in twentieths of a point)
+DOCUMENT_END = (
+    '<w:sectPr>'
+    '<w:pgSz w:w="11906" w:h="16838"/>'
+    '<w:pgMar w:top="800" w:right="800" w:bottom="800" w:left="800" w:header="708" w:footer="708" w:gutter="0"/>'
+    '</w:sectPr>'
+    '</w:body></w:document>'
+).encode('utf-8')
+
+# Paragraph styles mirroring the PDF backend: (style id, display name, size in half-points,
+# bold, centered, primary colour, space after in twentieths of a point, left indent)
+PARAGRAPH_STYLES = (
+    ('Name', 'Resume Name', 36, True, True, False, 200, 0),
+    ('Headline', 'Resume Headline', 24, False, True, False, 100, 0),
+    ('Contact', 'Resume Contact', 16, False, True, False, 300, 0),
+    ('SectionTitle', 'Resume Section Title', 20, True, False, True, 100, 0),
+    ('ItemTitle', 'Resume Item Title', 18, True, False, False, 40, 0),
+    ('ItemSubtitle', 'Resume Item Subtitle', 16, False, False, False, 40, 0),
+    ('Normal', 'Normal', 16, False, False, False, 100, 0),
+    ('Bullet', 'Resume Bullet', 16, False, False, False, 40, 400)
+)
+
+# Document block kind -> paragraph style id
+BLOCK_STYLES = {
+    'name': 'Name',
+    'headline': 'Headline',
+    'contact': 'Contact',
+    'item_title': 'ItemTitle',
+    'item_subtitle': 'ItemSubtitle',
+    'paragraph': 'Normal',
+    'fields': 'Normal',
+    'keyed_list': 'Normal',
+    'bullet': 'Bullet'
+}
+
+# Space left after a section, matching the PDF backend (in twentieths of a point)
+SECTION_SPACING = {'summary': 200, 'languages': 200}
+DEFAULT_SECTION_SPACING = 100
+
+def _xml_text(text):
+    return escape(INVALID_XML_CHARS.sub('', str(text)))
+
+def _style_xml(style_id, name, size, bold, centered, colored, space_after, indent, primary_color):
+    paragraph_properties = f'<w:spacing w:before="0" w:after="{space_after}"/>'
+    if centered:
+        paragraph_properties += '<w:jc w:val="center"/>'
+    if indent:
+        paragraph_properties += f'<w:ind w:left="{indent}" w:hanging="200"/>'
+
+    run_properties = ''
+    if bold:
+        run_properties += '<w:b/>'
+    if colored:
+        run_properties += f'<w:color w:val="{primary_color}"/>'
+    run_properties += f'<w:sz w:val="{size}"/><w:szCs w:val="{size}"/>'
+
+    default = ' w:default="1"' if style_id == 'Normal' else ''
+    based_on = '' if style_id == 'Normal' else '<w:basedOn w:val="Normal"/>'
+    return (
+        f'<w:style w:type="paragraph"{default} w:styleId="{style_id}">'
+        f'<w:name w:val="{name}"/>{based_on}<w:qFormat/>'
+        f'<w:pPr>{paragraph_properties}</w:pPr><w:rPr>{run_properties}</w:rPr>'
+        '</w:style>'
+    )
+
+@lru_cache(maxsize=64)
+def build_styles_xml(font_family, primary_color):
+    """Return the encoded styles part for a font and primary colour; cached per combination"""
+    font = escape(font_family, {'"': '&quot;'})
+    styles = ''.join(_style_xml(*style, primary_color) for style in PARAGRAPH_STYLES)
+    return (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        f'<w:styles xmlns:w="{WORD_NAMESPACE}">'
+        '<w:docDefaults><w:rPrDefault><w:rPr>'
+        f'<w:rFonts w:ascii="{font}" w:hAnsi="{font}" w:cs="{font}" w:eastAsia="{font}"/>'
+        '<w:sz w:val="16"/><w:szCs w:val="16"/>'
+        '</w:rPr></w:rPrDefault></w:docDefaults>'
+        f'{styles}'
+        '</w:styles>'
+    ).encode('utf-8')
+
+def _design_options(design_settings):
+    font_family = (design_settings or {}).get('font') or DEFAULT_FONT
+    primary_color = ((design_settings or {}).get('colors') or {}).get('primary') or DEFAULT_PRIMARY_COLOR
+    primary_color = str(primary_color).lstrip('#')
+    if not re.fullmatch('[0-9a-fA-F]{6}', primary_color):
+        primary_color = DEFAULT_PRIMARY_COLOR
+    return str(font_family), primary_color.upper()
+
+def _run(text, bold=False):
+    properties = '<w:rPr><w:b/></w:rPr>' if bold else ''
+    return f'<w:r>{properties}<w:t xml:space="preserve">{_xml_text(text)}</w:t></w:r>'
+
+def _paragraph(style_id, runs, space_after=None):
+    properties = f'<w:pStyle w:val="{style_id}"/>'
+    if space_after is not None:
+        properties += f'<w:spacing w:after="{space_after}"/>'
+    return f'<w:p><w:pPr>{properties}</w:pPr>{runs}</w:p>'
+
+def _block_runs(block):
+    kind = block.kind
+    if kind == 'bullet':
+        return _run(f'• {block.text}')
+    if kind == 'keyed_list':
+        return _run(f'{block.label}: ', bold=True) + _run(', '.join(run.text for run in block.runs))
+    if kind == 'fields' or any(run.label for run in block.runs):
+        # Labelled values are listed as 'Label: text | ...' with bold labels
+        parts = []
+        for index, run in enumerate(block.runs):
+            separator = ' | ' if index else ''
+            if run.label:
+                parts.append(_run(f'{separator}{run.label}: ', bold=True) + _run(run.text))
+            else:
+                parts.append(_run(f'{separator}{run.text}'))
+        return ''.join(parts)
+    return _run(block.text)
+
+def document_images(document):
+    """Return the distinct images of a document in order of appearance, keyed by digest"""
+    images = {}
+    for section in document.sections:
+        for block in section.blocks:
+            if block.kind == 'image':
+                images.setdefault(block.image.digest, block.image)
+    return images
+
+def _image_paragraph(block, relationship_id, drawing_id):
+    image = block.image
+    drawing = INLINE_IMAGE_TEMPLATE.format(
+        cx=round(image.width * EMU_PER_POINT),
+        cy=round(image.height * EMU_PER_POINT),
+        id=drawing_id,
+        name=f'{image.digest}.{image.extension}',
+        rel_id=relationship_id
+    )
+    # The photo is centered like the header, logos start their entry
+    alignment = '<w:jc w:val="center"/>' if block.label == 'photo' else ''
+    return f'<w:p><w:pPr><w:pStyle w:val="Normal"/><w:spacing w:after="80"/>{alignment}</w:pPr>{drawing}</w:p>'
+
+def _image_relationship_ids(images):
+    # rId1 is the styles part
+    return {digest: f'rId{index + 2}' for index, digest in enumerate(images)}
+
+def iter_document_xml(document, images=None):
+    """Yield the encoded body of word/document.xml one section at a time"""
+    relationship_ids = _image_relationship_ids(images or {})
+    drawing_ids = iter(range(1, 1 << 30))
+    yield DOCUMENT_WITH_MEDIA_START if relationship_ids else DOCUMENT_START
+    for section in document.sections:
+        parts = []
+        if section.title:
+            parts.append(_paragraph('SectionTitle', _run(section.title)))
+
+        for block in section.blocks:
+            if block.kind == 'entry_break':
+                parts.append(_paragraph('Normal', '', space_after=0))
+            elif block.kind == 'image':
+                if block.image.digest in relationship_ids:
+                    parts.append(_image_paragraph(block, relationship_ids[block.image.digest], next(drawing_ids)))
+            elif block.kind in BLOCK_STYLES:
+                parts.append(_paragraph(BLOCK_STYLES[block.kind], _block_runs(block)))
+
+        if section.key != 'header':
+            spacing = SECTION_SPACING.get(section.key, DEFAULT_SECTION_SPACING)
+            parts.append(_paragraph('Normal', '', space_after=spacing))
+
+        yield ''.join(parts).encode('utf-8')
+    yield DOCUMENT_END
+
+def _document_rels_xml(images):
+    if not images:
+        return DOCUMENT_RELS_XML
+    relationships = ''.join(
+        f'<Relationship Id="{relationship_id}" Type="{IMAGE_RELATIONSHIP}" Target="media/{digest}.{images[digest].extension}"/>'
+        for digest, relationship_id in _image_relationship_ids(images).items()
+    )
+    return (DOCUMENT_RELS_START + relationships + '</Relationships>').encode('utf-8')
+
+def render_docx(document, template, design_settings, output):
+    """
+    Render the document model to DOCX (Office Open XML)
+    The package is written straight into a zip stream, so output may be a file path or
+    any writable binary file object, including non-seekable ones
+    """
+    font_family, primary_color = _design_options(design_settings)
+    core_xml = CORE_XML_TEMPLATE.format(
+        title=_xml_text(f'Resume - {document.name}'),
+        author=_xml_text(document.name)
+    ).encode('utf-8')
+
+    images = document_images(document)
+
+    with open_output(output) as f:
+        with zipfile.ZipFile(f, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+            archive.writestr('[Content_Types].xml', CONTENT_TYPES_WITH_MEDIA_XML if images else CONTENT_TYPES_XML)
+            archive.writestr('_rels/.rels', PACKAGE_RELS_XML)
+            archive.writestr('docProps/core.xml', core_xml)
+            archive.writestr('word/_rels/document.xml.rels', _document_rels_xml(images))
+            archive.writestr('word/styles.xml', build_styles_xml(font_family, primary_color))
+            # Each distinct image is stored once, uncompressed: JPEG and PNG data is compressed already
+            for digest, image in images.items():
+                archive.writestr(f'word/media/{digest}.{image.extension}', image.data, compress_type=zipfile.ZIP_STORED)
+            with archive.open('word/document.xml', 'w') as part:
+                for chunk in iter_document_xml(document, images):
+                    part.write(chunk)
@@ -0,0 +1,323 @@
+import os
+import re
+import json
+import uuid
+import hashlib
+import logging
+import threading
+from collections import OrderedDict, namedtuple
+from weakref import WeakKeyDictionary
+import reportlab
+from reportlab import rl_config
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTEncoding, TTFNameBytes, TTFont, TTFontFace
+from reportlab.lib.fonts import addMapping
+
+# Configure logging
+logging.basicConfig(level=logging.INFO,
+                    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Regular and bold font names of a family as registered with ReportLab
+FontFamily = namedtuple('FontFamily', ['regular', 'bold'])
+
+# The standard Type1 families every PDF viewer provides; they need no embedding
+BUILTIN_FAMILIES = {
+    'helvetica': FontFamily('Helvetica', 'Helvetica-Bold'),
+    'times': FontFamily('Times-Roman', 'Times-Bold'),
+    'courier': FontFamily('Courier', 'Courier-Bold')
+}
+
+# Common font names that map onto a built-in family
+FONT_ALIASES = {
+    'arial': 'helvetica',
+    'sansserif': 'helvetica',
+    'timesroman': 'times',
+    'timesnewroman': 'times',
+    'serif': 'times',
+    'couriernew': 'courier',
+    'monospace': 'courier'
+}
+
+DEFAULT_FAMILY = BUILTIN_FAMILIES['helvetica']
+
+# File name suffixes of the TrueType styles that are registered
+STYLE_SUFFIXES = {
+    '': 'regular',
+    'regular': 'regular',
+    'roman': 'regular',
+    'book': 'regular',
+    'bold': 'bold',
+    'italic': 'italic',
+    'oblique': 'italic',
+    'bolditalic': 'bold_italic',
+    'boldoblique': 'bold_italic'
+}
+
+# Parsed fonts are kept here across processes, so a worker loads a font's metrics instead of parsing the file
+FONT_METRICS_DIR = os.environ.get('FONT_METRICS_DIR') or os.path.join(
+    os.path.dirname(os.path.dirname(__file__)), 'temp', 'font-metrics'
+)
+
+# Total size of embedded font subsets kept for reuse by later documents
+FONT_SUBSET_CACHE_BYTES = int(os.environ.get('FONT_SUBSET_CACHE_BYTES', 16 * 1024 * 1024))
+
+def _default_font_dirs():
+    bundled = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'fonts')
+    return [bundled, '/usr/share/fonts', '/usr/local/share/fonts', os.path.expanduser('~/.fonts')]
+
+def family_key(name):
+    """Normalize a font family name for lookup: 'Open Sans' and 'open-sans' are the same family"""
+    return re.sub('[^a-z0-9]', '', str(name).lower())
+
+def discover_fonts(font_dirs):
+    """
+    Find TrueType files below the given directories and group them by family
+    Files are expected to be named like 'Family-Style.ttf' (e.g. 'Roboto-Bold.ttf');
+    only the file names are read here, the fonts themselves are parsed on first use
+    """
+    families = {}
+    for font_dir in font_dirs:
+        if not os.path.isdir(font_dir):
+            continue
+        for root, _, files in os.walk(font_dir):
+            for file_name in files:
+                stem, extension = os.path.splitext(file_name)
+                if extension.lower() != '.ttf':
+                    continue
+                family, _, suffix = stem.rpartition('-') if '-' in stem else (stem, '', '')
+                style = STYLE_SUFFIXES.get(family_key(suffix))
+                if style is None:
+                    continue
+                # The first directory wins, so bundled fonts override system fonts
+                families.setdefault(family_key(family), {}).setdefault(style, os.path.join(root, file_name))
+    return {key: styles for key, styles in families.items() if 'regular' in styles}
+
+class SubsetCache:
+    """
+    LRU cache of embedded TrueType subsets, bounded by total bytes
+    A subset is keyed by the font file and its glyphs in subset order, which fixes the bytes. ReportLab
+    puts the ASCII block in the first subset of every document, so that subset is built once per font
+    """
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def get(self, face, subset):
+        key = (face.filename, tuple(subset))
+        with self._lock:
+            data = self._entries.get(key)
+            if data is not None:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return data
+            self._misses += 1
+
+        data = TTFontFace.makeSubset(face, subset)
+        if len(data) <= self.max_bytes:
+            with self._lock:
+                previous = self._entries.pop(key, None)
+                if previous is not None:
+                    self._size -= len(previous)
+                self._entries[key] = data
+                self._size += len(data)
+                while self._size > self.max_bytes:
+                    _, evicted = self._entries.popitem(last=False)
+                    self._size -= len(evicted)
+        return data
+
+    def stats(self):
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'bytes': self._size,
+                'maxBytes': self.max_bytes,
+                'hits': self._hits,
+                'misses': self._misses
+            }
+
+subset_cache = SubsetCache(FONT_SUBSET_CACHE_BYTES)
+
+class CachedFace(TTFontFace):
+    """Parsed TrueType face whose subsets come from the subset cache"""
+
+    def makeSubset(self, subset):
+        return subset_cache.get(self, subset)
+
+class CachedTTFont(TTFont):
+    """TrueType font made from an already parsed face"""
+
+    def __init__(self, name, face):
+        # TTFont.__init__ without parsing the file again
+        self.fontName = name
+        self.face = face
+        self.encoding = TTEncoding()
+        self.state = WeakKeyDictionary()
+        self._asciiReadable = rl_config.ttfAsciiReadable
+
+def _face_metrics(face):
+    """
+    The parsed attributes of a face as JSON data, without the font file itself
+    Name strings, byte strings and maps keyed by character or glyph number are kept apart, so
+    _load_metrics can restore their types
+    """
+    metrics = {'names': {}, 'bytes': {}, 'maps': {}, 'values': {}}
+    for field, value in vars(face).items():
+        if field == '_ttf_data':
+            continue
+        if isinstance(value, TTFNameBytes):
+            metrics['names'][field] = value.ustr
+        elif isinstance(value, bytes):
+            metrics['bytes'][field] = value.decode('latin-1')
+        elif isinstance(value, dict) and all(isinstance(key, int) for key in value):
+            metrics['maps'][field] = list(value.items())
+        else:
+            metrics['values'][field] = value
+    return metrics
+
+def _load_metrics(path, metrics):
+    """Rebuild a face from the data of _face_metrics and the bytes of its font file"""
+    face = CachedFace.__new__(CachedFace)
+    face.__dict__.update(metrics['values'])
+    face.__dict__.update({field: TTFNameBytes(value.encode('utf-8')) for field, value in metrics['names'].items()})
+    face.__dict__.update({field: value.encode('latin-1') for field, value in metrics['bytes'].items()})
+    face.__dict__.update({field: {key: value for key, value in items} for field, items in metrics['maps'].items()})
+    # Subsets are cut from the file's bytes, so they are read again rather than stored twice
+    with open(path, 'rb') as f:
+        face._ttf_data = f.read()
+    if os.path.abspath(face.filename) != os.path.abspath(path):
+        raise ValueError(f'metrics belong to {face.filename}')
+    return face
+
+def load_face(path, metrics_dir=FONT_METRICS_DIR):
+    """
+    Return the parsed face of a TrueType file
+    Faces' metrics are stored as JSON in metrics_dir under the file's path, size and modification time,
+    so every later process loads the parsed metrics instead of parsing the file. Unlike a pickle, a
+    metrics file can at worst hold wrong widths, never code that runs when it is loaded
+    """
+    stat = os.stat(path)
+    cache_path = None
+    if metrics_dir:
+        fingerprint = f'{os.path.abspath(path)}:{stat.st_size}:{stat.st_mtime_ns}:{reportlab.Version}'
+        cache_path = os.path.join(metrics_dir, hashlib.sha1(fingerprint.encode('utf-8')).hexdigest() + '.json')
+        try:
+            with open(cache_path, 'r', encoding='utf-8') as f:
+                return _load_metrics(path, json.load(f))
+        except FileNotFoundError:
+            pass
+        except Exception as error:
+            logger.warning(f'Ignoring unreadable font metrics cache for {path}: {error}')
+
+    face = CachedFace(path)
+    if cache_path:
+        try:
+            os.makedirs(metrics_dir, mode=0o700, exist_ok=True)
+            # Write to a temporary name first so other processes never load a partial file
+            temp_path = f'{cache_path}.{uuid.uuid4().hex}.tmp'
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(_face_metrics(face), f, separators=(',', ':'))
+            os.replace(temp_path, cache_path)
+        except Exception as error:
+            logger.warning(f'Error caching font metrics for {path}: {error}')
+    return face
+
+class FontRegistry:
+    """
+    Resolves design font names to fonts registered with ReportLab
+    TrueType families are indexed when a process starts; parsed faces come from the metrics cache,
+    so registering a family doesn't parse its files, and only the glyphs a PDF uses are embedded
+    """
+
+    def __init__(self, font_dirs):
+        self.font_dirs = font_dirs
+        self._available = None
+        self._resolved = {}
+        self._lock = threading.Lock()
+
+    def _discover(self):
+        if self._available is None:
+            self._available = discover_fonts(self.font_dirs)
+            logger.info(f'Discovered {len(self._available)} TrueType font families')
+        return self._available
+
+    def index(self):
+        """Index the available families; called at process start so requests never walk the font directories"""
+        with self._lock:
+            return len(self._discover())
+
+    def _register(self, key, styles):
+        names = {}
+        for style, path in styles.items():
+            font_name = f'{key}-{style}'
+            pdfmetrics.registerFont(CachedTTFont(font_name, load_face(path)))
+            names[style] = font_name
+
+        regular = names['regular']
+        bold = names.get('bold', regular)
+        # Map <b> and <i> markup inside paragraphs onto the family's own faces
+        addMapping(regular, 0, 0, regular)
+        addMapping(regular, 1, 0, bold)
+        addMapping(regular, 0, 1, names.get('italic', regular))
+        addMapping(regular, 1, 1, names.get('bold_italic', bold))
+        return FontFamily(regular, bold)
+
+    def resolve(self, name):
+        """
+        Return the FontFamily for a design font name
+        Unknown or unreadable fonts fall back to Helvetica instead of failing the render
+        """
+        key = family_key(name or '')
+        with self._lock:
+            family = self._resolved.get(key)
+            if family is not None:
+                return family
+
+            lookup = FONT_ALIASES.get(key, key)
+            if lookup in BUILTIN_FAMILIES:
+                family = BUILTIN_FAMILIES[lookup]
+            elif lookup in self._discover():
+                try:
+                    family = self._register(lookup, self._discover()[lookup])
+                except Exception as error:
+                    logger.error(f'Error registering font {name}: {error}')
+                    family = DEFAULT_FAMILY
+            else:
+                if key:
+                    logger.warning(f'Font {name} is not available, using {DEFAULT_FAMILY.regular}')
+                family = DEFAULT_FAMILY
+
+            self._resolved[key] = family
+            return family
+
+    def families(self):
+        """Return the names of all available families"""
+        with self._lock:
+            return sorted(set(BUILTIN_FAMILIES) | set(self._discover()))
+
+def _font_dirs_from_env():
+    configured = os.environ.get('FONT_DIRS')
+    if configured:
+        return [path for path in configured.split(os.pathsep) if path]
+    return _default_font_dirs()
+
+# Process-wide registry used by the PDF backend
+font_registry = FontRegistry(_font_dirs_from_env())
+
+def resolve_font(name):
+    return font_registry.resolve(name)
+
+def preload_fonts():
+    """
+    Index the font directories and register the families listed in PDF_PRELOAD_FONTS
+    Runs when render workers start, so requests neither walk the directories nor load fonts
+    """
+    font_registry.index()
+    for name in os.environ.get('PDF_PRELOAD_FONTS', '').split(','):
+        if name.strip():
+            resolve_font(name.strip())
@@ -0,0 +1,332 @@
+import os
+import re
+import logging
+from functools import lru_cache
+from jinja2 import Environment
+from markupsafe import Markup
+from models.resume import load_resume
+from renderers.document import format_date
+
+# Configure logging
+logging.basicConfig(level=logging.INFO,
+                    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+TEMPLATES_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'templates')
+PDF_TEMPLATE_FILE = 'resume-pdf.html'
+
+# Page setup the Node renderer passed to puppeteer
+PAGE_CSS = '@page { size: A4; margin: 20mm; }'
+
+STYLE_BLOCK = re.compile(r'<style>(.*?)</style>', re.DOTALL)
+
+class HtmlRendererUnavailable(Exception):
+    """Raised when WeasyPrint or its system libraries (Pango) are not installed"""
+
+def _to_jinja(source):
+    # The templates use Handlebars placeholders: {{{raw}}} is inserted as is, {{value}} is escaped
+    source = re.sub(r'\{\{\{\s*(\w+)\s*\}\}\}', r'{{ \1|safe }}', source)
+    return re.sub(r'\{\{\s*(\w+)\s*\}\}', r'{{ \1 }}', source)
+
+@lru_cache(maxsize=None)
+def compile_template(file_name=PDF_TEMPLATE_FILE):
+    """
+    Load and compile a page template once per process
+    Returns (page template, stylesheet template): the <style> block is split off so its CSS
+    can be parsed once per design and reused, instead of being parsed again inside every page
+    """
+    with open(os.path.join(TEMPLATES_DIR, file_name), encoding='utf-8') as f:
+        source = f.read()
+
+    match = STYLE_BLOCK.search(source)
+    css_source = match.group(1) if match else ''
+    page_source = STYLE_BLOCK.sub('', source, count=1)
+
+    environment = Environment(autoescape=True)
+    return environment.from_string(_to_jinja(page_source)), environment.from_string(_to_jinja(css_source))
+
+_weasyprint_error = None
+
+def _weasyprint():
+    # Imported lazily: WeasyPrint loads Pango through ctypes, which may be missing on the host
+    global _weasyprint_error
+    if _weasyprint_error is None:
+        try:
+            import weasyprint
+            return weasyprint
+        except (ImportError, OSError) as error:
+            _weasyprint_error = str(error)
+    raise HtmlRendererUnavailable(f'WeasyPrint is not available: {_weasyprint_error}')
+
+@lru_cache(maxsize=1)
+def _font_config():
+    from weasyprint.text.fonts import FontConfiguration
+    return FontConfiguration()
+
+def _design_values(design_settings):
+    design_settings = design_settings or {}
+    return (
+        str(design_settings.get('font') or 'Helvetica'),
+        float(design_settings.get('fontSize') or 12),
+        str((design_settings.get('colors') or {}).get('primary') or '#4a6cf7')
+    )
+
+@lru_cache(maxsize=64)
+def _stylesheets(file_name, font_family, font_size, primary_color):
+    # Parsing CSS is a large share of WeasyPrint's per-document work; parsed sheets are reused
+    weasyprint = _weasyprint()
+    _, css_template = compile_template(file_name)
+    css = css_template.render(fontFamily=font_family, fontSize=font_size, primaryColor=primary_color)
+    return (
+        weasyprint.CSS(string=PAGE_CSS, font_config=_font_config()),
+        weasyprint.CSS(string=css, font_config=_font_config())
+    )
+
+def _refuse_url(url):
+    # Resumes are rendered from local data only; never fetch remote resources while rendering
+    raise ValueError(f'Fetching {url} is not allowed')
+
+def _section(title, content):
+    return Markup(
+        '<div class="resume-section"><div class="section-header">'
+        '<div class="section-title">{}</div></div>'
+        '<div class="section-content">{}</div></div>'
+    ).format(title, content)
+
+def _period(start_date, end_date):
+    start = format_date(start_date) if start_date else ''
+    end = format_date(end_date) if end_date else 'Present'
+    return f'{start} - {end}'
+
+def _header_html(basics):
+    raw = basics.raw
+    contact = []
+    if basics.email:
+        contact.append(('📧', basics.email))
+    if basics.phone:
+        contact.append(('📱', basics.phone))
+    if isinstance(basics.location, dict):
+        location = ', '.join(str(part) for part in (basics.location.get('city'), basics.location.get('region')) if part)
+        if location:
+            contact.append(('📍', location))
+    elif basics.location:
+        contact.append(('📍', basics.location))
+    if raw.get('url') or raw.get('website'):
+        contact.append(('🌐', raw.get('url') or raw.get('website')))
+    for profile in raw.get('profiles') or []:
+        if isinstance(profile, dict):
+            contact.append(('🔗', f"{profile.get('network', '')}: {profile.get('username') or profile.get('url', '')}"))
+
+    contact_html = Markup('').join(
+        Markup('<div class="resume-contact-item"><span>{}</span> {}</div>').format(icon, text) for icon, text in contact
+    )
+    return Markup(
+        '<div class="resume-header"><div class="resume-header-content">'
+        '<div class="resume-name-title"><div class="resume-name">{}</div><div class="resume-title">{}</div></div>'
+        '<div class="resume-contact">{}</div>'
+        '</div></div>'
+    ).format(basics.name or 'Your Name', raw.get('label') or basics.title or 'Professional Title', contact_html)
+
+def _experience_html(experience):
+    items = []
+    for exp in experience:
+        company = exp.company or exp.raw.get('name') or 'Company'
+        if exp.location:
+            company = f'{company} | {exp.location}'
+        period = format_date(exp.raw['period']) if exp.raw.get('period') else _period(exp.start_date, exp.end_date)
+        description = exp.raw.get('summary') or exp.description
+        bullets = Markup('').join(Markup('<li class="experience-bullet">{}</li>').format(h) for h in exp.highlights)
+
+        items.append(Markup(
+            '<div class="experience-item"><div class="experience-header">'
+            '<div class="experience-title-company"><div class="experience-title">{}</div>'
+            '<div class="experience-company">{}</div></div>'
+            '<div class="experience-period">{}</div></div>{}{}</div>'
+        ).format(
+            exp.raw.get('position') or exp.title or 'Position',
+            company,
+            period,
+            Markup('<div class="experience-description">{}</div>').format(description) if description else '',
+            Markup('<ul class="experience-bullets">{}</ul>').format(bullets) if bullets else ''
+        ))
+    return Markup('').join(items)
+
+def _education_html(education):
+    items = []
+    for edu in education:
+        degree = edu.study_type or edu.degree or ''
+        if edu.area:
+            degree = f'{degree} in {edu.area}' if degree else edu.area
+        school = edu.institution or edu.school or 'Institution'
+        if edu.raw.get('location'):
+            school = f"{school} | {edu.raw['location']}"
+        year = format_date(edu.raw['year']) if edu.raw.get('year') else _period(edu.start_date, edu.end_date)
+
+        items.append(Markup(
+            '<div class="education-item"><div class="education-header">'
+            '<div class="education-degree-school"><div class="education-degree">{}</div>'
+            '<div class="education-school">{}</div></div>'
+            '<div class="education-year">{}</div></div></div>'
+        ).format(degree, school, year))
+    return Markup('').join(items)
+
+def _skills_html(skills):
+    items = []
+    for skill in skills:
+        if skill.items:
+            skill_items = Markup('').join(Markup('<div class="skill-item">{}</div>').format(item) for item in skill.items)
+            items.append(Markup(
+                '<div class="skill-category"><div class="skill-category-name">{}</div>'
+                '<div class="skill-items">{}</div></div>'
+            ).format(skill.category, skill_items))
+        elif isinstance(skill.raw, str):
+            items.append(Markup('<div class="skill-item">{}</div>').format(skill.raw))
+    return Markup('<div class="skills-container">{}</div>').format(Markup('').join(items))
+
+def _projects_html(projects):
+    items = []
+    for project in projects:
+        url = project.raw.get('url') or project.raw.get('website')
+        technologies = project.technologies or ()
+        if isinstance(technologies, str):
+            technologies = (technologies,)
+
+        items.append(Markup(
+            '<div class="project-item"><div class="project-header">'
+            '<div class="project-name">{}</div>{}</div>{}{}</div>'
+        ).format(
+            project.name or 'Project',
+            Markup('<div class="project-link">{}</div>').format(url) if url else '',
+            Markup('<div class="project-description">{}</div>').format(project.description) if project.description else '',
+            Markup('<div class="project-technologies">Technologies: {}</div>').format(', '.join(map(str, technologies)))
+            if technologies else ''
+        ))
+    return Markup('').join(items)
+
+def _volunteer_html(volunteer):
+    items = []
+    for entry in volunteer:
+        if not isinstance(entry, dict):
+            continue
+        period = format_date(entry['period']) if entry.get('period') else _period(entry.get('startDate'), entry.get('endDate'))
+        summary = entry.get('summary') or entry.get('description')
+        items.append(Markup(
+            '<div class="volunteer-item"><div class="volunteer-header">'
+            '<div class="volunteer-title-org"><div class="volunteer-position">{}</div>'
+            '<div class="volunteer-organization">{}</div></div>'
+            '<div class="volunteer-period">{}</div></div>{}</div>'
+        ).format(
+            entry.get('position') or entry.get('role') or 'Volunteer',
+            entry.get('organization') or '',
+            period,
+            Markup('<div class="volunteer-description">{}</div>').format(summary) if summary else ''
+        ))
+    return Markup('').join(items)
+
+def _awards_html(awards):
+    items = []
+    for award in awards:
+        if not isinstance(award, dict):
+            continue
+        issuer = award.get('awarder') or award.get('issuer') or award.get('organization')
+        date = format_date(award['date']) if award.get('date') else ''
+        summary = award.get('summary') or award.get('description')
+        items.append(Markup(
+            '<div class="award-item"><div class="award-header"><div class="award-title">{}</div>{}</div>{}{}</div>'
+        ).format(
+            award.get('title') or award.get('name') or 'Award',
+            Markup('<div class="award-date">{}</div>').format(date) if date else '',
+            Markup('<div class="award-issuer">{}</div>').format(issuer) if issuer else '',
+            Markup('<div class="award-description">{}</div>').format(summary) if summary else ''
+        ))
+    return Markup('').join(items)
+
+def _certifications_html(certifications):
+    items = []
+    for cert in certifications:
+        date = format_date(cert.date) if cert.date else ''
+        items.append(Markup(
+            '<div class="certification-item"><div class="certification-header">'
+            '<div class="certification-name">{}</div>{}</div>{}</div>'
+        ).format(
+            cert.name or 'Certification',
+            Markup('<div class="certification-date">{}</div>').format(date) if date else '',
+            Markup('<div class="certification-issuer">{}</div>').format(cert.issuer) if cert.issuer else ''
+        ))
+    return Markup('').join(items)
+
+def _languages_html(languages):
+    items = []
+    for lang in languages:
+        if isinstance(lang.raw, dict):
+            name = lang.language or lang.raw.get('name') or 'Language'
+            fluency = lang.proficiency or lang.raw.get('level')
+            text = f'{name}: {fluency}' if fluency else name
+        else:
+            text = lang.raw
+        items.append(Markup('<div class="language-item">{}</div>').format(text))
+    return Markup('<div class="languages-list">{}</div>').format(Markup('').join(items))
+
+def build_html_content(resume):
+    """Build the resume markup inserted into the page template, with the class names its CSS expects"""
+    resume = load_resume(resume)
+    raw = resume.raw
+    parts = [_header_html(resume.basics)]
+
+    if resume.summary:
+        parts.append(_section('Summary', Markup('<div class="summary-content">{}</div>').format(resume.summary)))
+    if resume.experience:
+        parts.append(_section('Experience', _experience_html(resume.experience)))
+    if resume.education:
+        parts.append(_section('Education', _education_html(resume.education)))
+    if resume.skills:
+        parts.append(_section('Skills', _skills_html(resume.skills)))
+    if resume.projects:
+        parts.append(_section('Projects', _projects_html(resume.projects)))
+    if isinstance(raw.get('volunteer'), list) and raw['volunteer']:
+        parts.append(_section('Volunteer Experience', _volunteer_html(raw['volunteer'])))
+    awards = raw.get('awards') or resume.achievements
+    if isinstance(awards, (list, tuple)) and awards:
+        parts.append(_section('Awards & Achievements', _awards_html(awards)))
+    if resume.certifications:
+        parts.append(_section('Certifications', _certifications_html(resume.certifications)))
+    if resume.languages:
+        parts.append(_section('Languages', _languages_html(resume.languages)))
+
+    return Markup('').join(parts)
+
+def render_html(resume, template, design_settings, file_name=PDF_TEMPLATE_FILE):
+    """Render the full HTML page (without its stylesheet) for a resume"""
+    resume = load_resume(resume)
+    page_template, _ = compile_template(file_name)
+    font_family, font_size, primary_color = _design_values(design_settings)
+    return page_template.render(
+        name=resume.basics.name or 'Resume',
+        fontFamily=font_family,
+        fontSize=font_size,
+        primaryColor=primary_color,
+        content=build_html_content(resume)
+    )
+
+def render_html_pdf_bytes(resume, template, design_settings):
+    """
+    Render a resume through the HTML template with WeasyPrint and return the PDF bytes
+    Runs inside HTML render pool workers; template and stylesheets are compiled once per worker
+    """
+    weasyprint = _weasyprint()
+    font_family, font_size, primary_color = _design_values(design_settings)
+    stylesheets = _stylesheets(PDF_TEMPLATE_FILE, font_family, font_size, primary_color)
+
+    html = weasyprint.HTML(string=render_html(resume, template, design_settings), base_url=TEMPLATES_DIR, url_fetcher=_refuse_url)
+    return html.write_pdf(stylesheets=list(stylesheets), font_config=_font_config())
+
+def warm_html_renderer():
+    """
+    Initializer of HTML render workers
+    Imports WeasyPrint, compiles the page template and parses the default stylesheet
+    """
+    compile_template()
+    try:
+        _stylesheets(PDF_TEMPLATE_FILE, *_design_values(None))
+    except HtmlRendererUnavailable as error:
+        logger.warning(str(error))
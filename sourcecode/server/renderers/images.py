@@ -0,0 +1,134 @@
+import io
+import os
+import base64
+import hashlib
+import logging
+import binascii
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+
+# Configure logging
+logging.basicConfig(level=logging.INFO,
+                    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Resolution images are resampled to for their printed size; more pixels would not be visible on paper
+PRINT_DPI = int(os.environ.get('IMAGE_PRINT_DPI', 200))
+
+# Number of prepared images kept for reuse across documents and renders
+IMAGE_CACHE_SIZE = int(os.environ.get('IMAGE_CACHE_SIZE', 128))
+
+# Larger uploads are ignored instead of being decoded
+MAX_IMAGE_BYTES = int(os.environ.get('MAX_IMAGE_BYTES', 5 * 1024 * 1024))
+
+JPEG_QUALITY = 85
+
+# Longest printed side of each kind of image, in points
+IMAGE_BOXES = {'photo': 72, 'logo': 24}
+
+@dataclass(frozen=True)
+class EmbeddedImage:
+    """An image prepared for printing: resampled, recompressed and sized in points"""
+    digest: str
+    mime_type: str
+    extension: str
+    width: float
+    height: float
+    pixel_width: int
+    pixel_height: int
+    data: bytes = field(repr=False)
+
+_image_cache = OrderedDict()
+_image_cache_lock = threading.Lock()
+
+def decode_image_source(value):
+    """
+    Return the bytes of an image given as a data URI or bare base64, or None
+    Remote URLs are not fetched: rendering never makes outbound requests on behalf of resume content
+    """
+    if not isinstance(value, str) or not value:
+        return None
+    if value.startswith('data:'):
+        header, _, value = value.partition(',')
+        if ';base64' not in header:
+            return None
+    elif value.startswith(('http://', 'https://', '/')):
+        logger.warning('Ignoring image given by URL; images must be embedded as data URIs')
+        return None
+
+    try:
+        data = base64.b64decode(value, validate=False)
+    except (binascii.Error, ValueError):
+        return None
+    return data or None
+
+def prepare_image(data, role):
+    """
+    Decode an image once, resample it to PRINT_DPI at its printed size and recompress it
+    Photos without transparency become JPEG, everything else PNG; results are cached by content hash
+    """
+    from PIL import Image, ImageOps
+
+    key = (hashlib.sha256(data).hexdigest(), role, PRINT_DPI)
+    with _image_cache_lock:
+        image = _image_cache.get(key)
+        if image is not None:
+            _image_cache.move_to_end(key)
+            return image
+
+    box = IMAGE_BOXES[role]
+    max_pixels = max(1, round(box / 72 * PRINT_DPI))
+    with Image.open(io.BytesIO(data)) as source:
+        # draft() lets the JPEG decoder scale down while decoding, which is much cheaper than a full decode
+        if source.format == 'JPEG':
+            source.draft('RGB', (max_pixels, max_pixels))
+        # Honour the camera's orientation before the EXIF data is dropped
+        picture = ImageOps.exif_transpose(source)
+        picture.thumbnail((max_pixels, max_pixels), Image.LANCZOS)
+
+        has_alpha = picture.mode in ('RGBA', 'LA', 'PA') or 'transparency' in picture.info
+        output = io.BytesIO()
+        if has_alpha:
+            picture = picture.convert('RGBA')
+            picture.save(output, 'PNG', optimize=True)
+            mime_type, extension = 'image/png', 'png'
+        else:
+            picture = picture.convert('RGB')
+            picture.save(output, 'JPEG', quality=JPEG_QUALITY, optimize=True, progressive=False)
+            mime_type, extension = 'image/jpeg', 'jpeg'
+
+    pixel_width, pixel_height = picture.size
+    scale = box / max(pixel_width, pixel_height)
+    prepared = output.getvalue()
+    image = EmbeddedImage(
+        digest=hashlib.sha256(prepared).hexdigest(),
+        mime_type=mime_type,
+        extension=extension,
+        width=round(pixel_width * scale, 2),
+        height=round(pixel_height * scale, 2),
+        pixel_width=pixel_width,
+        pixel_height=pixel_height,
+        data=prepared
+    )
+
+    with _image_cache_lock:
+        _image_cache[key] = image
+        while len(_image_cache) > IMAGE_CACHE_SIZE:
+            _image_cache.popitem(last=False)
+    logger.info(f'Prepared {role} image: {len(data)} bytes -> {len(prepared)} bytes at {pixel_width}x{pixel_height}px')
+    return image
+
+def load_image(value, role):
+    """Return the prepared image for a resume image field, or None if it is missing or unusable"""
+    data = decode_image_source(value)
+    if data is None:
+        return None
+    if len(data) > MAX_IMAGE_BYTES:
+        logger.warning(f'Ignoring {role} image of {len(data)} bytes; the limit is {MAX_IMAGE_BYTES}')
+        return None
+    try:
+        return prepare_image(data, role)
+    except Exception as error:
+        logger.warning(f'Ignoring {role} image that could not be decoded: {error}')
+        return None
@@ -0,0 +1,13 @@
+from contextlib import contextmanager
+
+@contextmanager
+def open_output(output):
+    """
+    Yield a writable binary file object for a backend's output
+    output may be a file path or an already open binary file object, which is left open
+    """
+    if hasattr(output, 'write'):
+        yield output
+    else:
+        with open(output, 'wb') as f:
+            yield f
@@ -0,0 +1,491 @@
+import io
+import os
+import copy
+import hashlib
+import logging
+import threading
+from collections import OrderedDict, deque, namedtuple
+from functools import lru_cache
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import A4
+from reportlab.platypus import (
+    BaseDocTemplate, Frame, FrameBreak, HRFlowable, Image, NextPageTemplate, PageTemplate,
+    Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+)
+from reportlab.platypus.doctemplate import ActionFlowable
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.lib.enums import TA_CENTER, TA_LEFT
+from renderers.fonts import resolve_font, preload_fonts
+from renderers.templates import TEMPLATE_SPECS, get_template
+
+# Configure logging
+logging.basicConfig(level=logging.INFO,
+                    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Space left after a section; sections not listed use the default
+SECTION_SPACING = {'summary': 10, 'languages': 10}
+DEFAULT_SECTION_SPACING = 5
+
+# Convert hex color to RGB
+def hex_to_rgb(hex_color):
+    hex_color = hex_color.lstrip('#')
+    return tuple(int(hex_color[i:i+2], 16)/255 for i in (0, 2, 4))
+
+# Number of built sections whose flowables are kept for reuse
+FLOWABLE_CACHE_SIZE = int(os.environ.get('PDF_FLOWABLE_CACHE_SIZE', 512))
+
+# Smallest scale of font sizes and spacing tried when fitting a resume onto fewer pages
+FIT_MIN_SCALE = 0.7
+FIT_SEARCH_STEPS = 8
+
+# Frame of every page: A4 minus the 40pt margins and ReportLab's 6pt frame padding
+PAGE_MARGIN = 40
+FRAME_PADDING = 6
+FRAME_WIDTH = A4[0] - 2 * PAGE_MARGIN - 2 * FRAME_PADDING
+FRAME_HEIGHT = A4[1] - 2 * PAGE_MARGIN - 2 * FRAME_PADDING
+
+def _style(name, parent, font_name, font_size, space_after, scale, leading=None, **extra):
+    return ParagraphStyle(
+        name,
+        parent=parent,
+        fontName=font_name,
+        fontSize=font_size * scale,
+        leading=(leading if leading is not None else parent.leading) * scale,
+        spaceAfter=space_after * scale,
+        **extra
+    )
+
+# Paragraph styles every template starts from:
+# key -> (style name, sample style sheet parent, font variant, size, space after, extra attributes)
+# A color of 'primary' stands for the primary color of the design settings
+BASE_STYLES = {
+    'name': ('Title', 'Title', 'bold', 18, 10, {'alignment': TA_CENTER}),
+    'headline': ('Subtitle', 'Normal', 'regular', 12, 5, {'alignment': TA_CENTER}),
+    'contact': ('Contact', 'Normal', 'regular', 8, 15, {'alignment': TA_CENTER}),
+    'section_title': ('SectionTitle', 'Heading2', 'bold', 10, 5, {'textColor': 'primary'}),
+    'item_title': ('ItemTitle', 'Normal', 'bold', 9, 2, {}),
+    'item_subtitle': ('ItemSubtitle', 'Normal', 'regular', 8, 2, {}),
+    'normal': ('Normal', 'Normal', 'regular', 8, 5, {}),
+    'bullet': ('Bullet', 'Normal', 'regular', 8, 2, {'leftIndent': 20})
+}
+HEADER_STYLE_KEYS = ('name', 'headline', 'contact')
+
+# Two-column templates: gap between the sidebar and the main column, and padding inside a header band
+SIDEBAR_GAP = 14
+BAND_PADDING = 12
+
+# Width of the page inside the margins; frames subtract their own padding from it
+CONTENT_WIDTH = A4[0] - 2 * PAGE_MARGIN
+CONTENT_HEIGHT = A4[1] - 2 * PAGE_MARGIN
+
+def _resolve_color(value, primary_rgb):
+    if value == 'primary':
+        return primary_rgb
+    return hex_to_rgb(value) if isinstance(value, str) else value
+
+# Layout of a document under a template: the flowables to build, the frames of the first page as
+# (x, y, width, height) or None for a single full-width frame, and (section, flowables, width) per section
+Layout = namedtuple('Layout', ['elements', 'first_page_frames', 'sections'])
+
+class PdfTemplate:
+    """
+    A template spec compiled for ReportLab
+    Style overrides are merged into the base styles and the section order, spacing and column
+    widths are resolved once per process; per request only cached style sets and flowables are used
+    """
+
+    def __init__(self, spec):
+        self.spec = spec
+        self.name = spec.name
+        self.style_definitions = self._compile_styles(spec)
+        self.order = {key: index for index, key in enumerate(spec.section_order)}
+        self.sidebar = frozenset(spec.sidebar)
+        self.section_spacing = {**SECTION_SPACING, **spec.section_spacing}
+        self.default_section_spacing = (
+            spec.default_section_spacing if spec.default_section_spacing is not None else DEFAULT_SECTION_SPACING
+        )
+        self.sidebar_outer_width = round(CONTENT_WIDTH * spec.sidebar_width, 2)
+        self.main_outer_width = CONTENT_WIDTH - self.sidebar_outer_width - SIDEBAR_GAP
+
+    @staticmethod
+    def _compile_styles(spec):
+        definitions = {}
+        for key, (name, parent, variant, size, space_after, extra) in BASE_STYLES.items():
+            extra = dict(extra)
+            if key in HEADER_STYLE_KEYS:
+                if spec.header == 'left':
+                    extra['alignment'] = TA_LEFT
+                elif spec.header == 'band':
+                    extra['textColor'] = '#ffffff'
+
+            override = dict(spec.styles.get(key, {}))
+            variant = override.pop('variant', variant)
+            size = override.pop('size', size)
+            space_after = override.pop('space_after', space_after)
+            leading = override.pop('leading', None)
+            extra.update(override)
+            definitions[key] = (name, parent, variant, size, space_after, leading, tuple(sorted(extra.items())))
+        return definitions
+
+    def build_styles(self, font, primary_color, scale):
+        primary_rgb = hex_to_rgb(primary_color)
+        sample = getSampleStyleSheet()
+
+        styles = {}
+        for key, (name, parent, variant, size, space_after, leading, extra) in self.style_definitions.items():
+            attributes = {
+                attribute: _resolve_color(value, primary_rgb) if attribute.endswith('Color') else value
+                for attribute, value in extra
+            }
+            styles[key] = _style(name, sample[parent], getattr(font, variant), size, space_after, scale, leading, **attributes)
+        # Not a paragraph style: the color of rules and header bands
+        styles['accent'] = colors.Color(*primary_rgb)
+        return styles
+
+    def title_flowables(self, title, styles, scale):
+        text = title.title() if self.spec.title_case else title
+        elements = [Paragraph(text, styles['section_title'])]
+        if self.spec.section_title == 'rule':
+            elements.append(HRFlowable(width='100%', thickness=0.75, color=styles['accent'], spaceBefore=0, spaceAfter=4 * scale))
+        return elements
+
+    def spacing_after(self, section_key):
+        return self.section_spacing.get(section_key, self.default_section_spacing)
+
+    def header_flowables(self, flowables, styles, scale):
+        """Wrap the header lines in the template's header decoration"""
+        if self.spec.header != 'band':
+            return flowables
+        band = Table([[flowables]], colWidths=[FRAME_WIDTH])
+        band.setStyle(TableStyle([
+            ('BACKGROUND', (0, 0), (-1, -1), styles['accent']),
+            ('LEFTPADDING', (0, 0), (-1, -1), BAND_PADDING),
+            ('RIGHTPADDING', (0, 0), (-1, -1), BAND_PADDING),
+            ('TOPPADDING', (0, 0), (-1, -1), BAND_PADDING),
+            ('BOTTOMPADDING', (0, 0), (-1, -1), BAND_PADDING)
+        ]))
+        return [band, Spacer(1, 12 * scale)]
+
+    def arrange(self, sections):
+        """Split the document's sections into header, sidebar and main column, in template order"""
+        header = [section for section in sections if section.key == 'header']
+        # sorted() is stable, so sections the template does not list keep their document order
+        body = sorted(
+            (section for section in sections if section.key != 'header'),
+            key=lambda section: self.order.get(section.key, len(self.order))
+        )
+        sidebar = [section for section in body if section.key in self.sidebar]
+        main = [section for section in body if section.key not in self.sidebar]
+        return header, sidebar, main
+
+    def layout(self, document, design_settings, scale=1.0):
+        header, sidebar, main = self.arrange(document.sections)
+        styles = build_styles(design_settings, scale, self.name)
+
+        sections = []
+        header_elements = []
+        for section in header:
+            flowables = self.header_flowables(cached_section_flowables(section, design_settings, scale, self.name), styles, scale)
+            sections.append((section, flowables, FRAME_WIDTH))
+            header_elements.extend(flowables)
+
+        if not sidebar:
+            elements = list(header_elements)
+            for section in main:
+                flowables = cached_section_flowables(section, design_settings, scale, self.name)
+                sections.append((section, flowables, FRAME_WIDTH))
+                elements.extend(flowables)
+            return Layout(elements, None, sections)
+
+        # The header spans the page above the two columns; its frame is as tall as the header itself
+        header_height = sum(
+            flowable.wrap(FRAME_WIDTH, FRAME_HEIGHT)[1] + flowable.getSpaceBefore() + flowable.getSpaceAfter()
+            for flowable in header_elements
+        ) + 2 * FRAME_PADDING + 1
+        body_height = CONTENT_HEIGHT - header_height
+        first_page_frames = (
+            (PAGE_MARGIN, PAGE_MARGIN + body_height, CONTENT_WIDTH, header_height),
+            (PAGE_MARGIN, PAGE_MARGIN, self.sidebar_outer_width, body_height),
+            (PAGE_MARGIN + self.sidebar_outer_width + SIDEBAR_GAP, PAGE_MARGIN, self.main_outer_width, body_height)
+        )
+
+        elements = [NextPageTemplate('later'), *header_elements, FrameBreak()]
+        for column, width in ((sidebar, self.sidebar_outer_width), (main, self.main_outer_width)):
+            for section in column:
+                flowables = cached_section_flowables(section, design_settings, scale, self.name)
+                sections.append((section, flowables, width - 2 * FRAME_PADDING))
+                elements.extend(flowables)
+            if column is sidebar:
+                elements.append(FrameBreak())
+        return Layout(elements, first_page_frames, sections)
+
+# Every template is compiled when the module is imported, i.e. once per process and render worker
+PDF_TEMPLATES = {spec.name: PdfTemplate(spec) for spec in TEMPLATE_SPECS}
+
+def pdf_template(template):
+    """Return the compiled template for a template name (unknown names use the default template)"""
+    return PDF_TEMPLATES[get_template(template).name]
+
+@lru_cache(maxsize=128)
+def _cached_styles(template_name, font, primary_color, scale):
+    return PDF_TEMPLATES[template_name].build_styles(font, primary_color, scale)
+
+def style_key(design_settings, scale=1.0, template=None):
+    """Return the hashable key identifying the style set of the given template and design settings"""
+    font = resolve_font(design_settings.get('font', 'Helvetica') if design_settings else 'Helvetica')
+    primary_color = design_settings.get('colors', {}).get('primary', '#4a6cf7') if design_settings else '#4a6cf7'
+    return pdf_template(template).name, font, primary_color, scale
+
+def build_styles(design_settings, scale=1.0, template=None):
+    """
+    Return the paragraph styles of a template for the given design settings, with font sizes and
+    spacing multiplied by scale; style sets are cached and shared, so treat them as read-only
+    """
+    return _cached_styles(*style_key(design_settings, scale, template))
+
+def _keyed_list_text(block, max_items=5):
+    items = [run.text for run in block.runs]
+    text = f"{block.label}: {', '.join(items[:max_items])}"
+    if len(items) > max_items:
+        text += "..."
+    return text
+
+def _image_flowable(block, styles, scale):
+    image = block.image
+    # Within a PDF ReportLab embeds identical images once; JPEG data is embedded without re-encoding
+    flowable = Image(
+        io.BytesIO(image.data),
+        width=image.width * scale,
+        height=image.height * scale,
+        mask='auto' if image.mime_type == 'image/png' else None,
+        # The photo follows the header's alignment, logos sit at the start of their entry
+        hAlign='CENTER' if block.label == 'photo' and styles['name'].alignment == TA_CENTER else 'LEFT'
+    )
+    flowable.spaceAfter = 4 * scale
+    return flowable
+
+def block_flowables(block, styles, scale=1.0, bullet='•'):
+    """Convert one document block into ReportLab flowables"""
+    kind = block.kind
+    if kind in ('name', 'headline', 'contact', 'item_title', 'item_subtitle'):
+        return [Paragraph(block.text, styles[kind])]
+    if kind in ('paragraph', 'fields'):
+        return [Paragraph(block.text, styles['normal'])]
+    if kind == 'bullet':
+        return [Paragraph(f"{bullet} {block.text}", styles['bullet'])]
+    if kind == 'keyed_list':
+        return [Paragraph(_keyed_list_text(block), styles['normal'])]
+    if kind == 'entry_break':
+        return [Spacer(1, 5 * scale)]
+    if kind == 'image':
+        return [_image_flowable(block, styles, scale)]
+    return []
+
+def section_flowables(section, styles, scale=1.0, template=None):
+    """Convert one document section into ReportLab flowables laid out by a template"""
+    template = pdf_template(template)
+    elements = []
+    if section.title:
+        elements.extend(template.title_flowables(section.title, styles, scale))
+
+    for block in section.blocks:
+        elements.extend(block_flowables(block, styles, scale, template.spec.bullet))
+
+    if section.key != 'header':
+        elements.append(Spacer(1, template.spacing_after(section.key) * scale))
+    return elements
+
+_flowable_cache = OrderedDict()
+_flowable_cache_lock = threading.Lock()
+
+def section_digest(section):
+    """Hash of a section's content; the dataclass repr covers its key, title and every block"""
+    return hashlib.sha256(repr(section).encode('utf-8')).hexdigest()
+
+def cached_section_flowables(section, design_settings, scale=1.0, template=None):
+    """
+    Return the flowables of a section, reusing the ones built for an identical section and style set
+    Parsing paragraph markup is the expensive part, so cached flowables are kept unlaid-out and every
+    caller gets shallow copies: the parsed text is shared while wrap() and split() state is per build
+    """
+    key = (section_digest(section), style_key(design_settings, scale, template))
+    with _flowable_cache_lock:
+        flowables = _flowable_cache.get(key)
+        if flowables is not None:
+            _flowable_cache.move_to_end(key)
+
+    if flowables is None:
+        flowables = section_flowables(section, build_styles(design_settings, scale, template), scale, template)
+        with _flowable_cache_lock:
+            _flowable_cache[key] = flowables
+            while len(_flowable_cache) > FLOWABLE_CACHE_SIZE:
+                _flowable_cache.popitem(last=False)
+
+    return [copy.copy(flowable) for flowable in flowables]
+
+def _two_column_doc(output, first_page_frames):
+    doc = BaseDocTemplate(
+        output,
+        pagesize=A4,
+        rightMargin=PAGE_MARGIN,
+        leftMargin=PAGE_MARGIN,
+        topMargin=PAGE_MARGIN,
+        bottomMargin=PAGE_MARGIN
+    )
+    frame_ids = ('header', 'sidebar', 'main')
+    doc.addPageTemplates([
+        PageTemplate('first', [Frame(*geometry, id=frame_id) for frame_id, geometry in zip(frame_ids, first_page_frames)]),
+        # Later pages continue the main column over the full width
+        PageTemplate('later', [Frame(PAGE_MARGIN, PAGE_MARGIN, CONTENT_WIDTH, CONTENT_HEIGHT, id='body')])
+    ])
+    return doc
+
+def render_pdf(document, template, design_settings, output):
+    """
+    Render the document model to PDF with the layout of the named template
+    output may be a file path or a writable binary file object
+    """
+    template = pdf_template(template)
+
+    scale = 1.0
+    target_pages = design_settings.get('fitToPages') if design_settings else None
+    if target_pages:
+        scale = fit_scale(document, design_settings, int(target_pages), template.name)
+
+    layout = template.layout(document, design_settings, scale)
+
+    if layout.first_page_frames:
+        doc = _two_column_doc(output, layout.first_page_frames)
+    else:
+        # Create a PDF document with A4 dimensions
+        # A4 size is 210mm x 297mm (8.27in x 11.69in)
+        doc = SimpleDocTemplate(
+            output,
+            pagesize=A4,
+            rightMargin=40,
+            leftMargin=40,
+            topMargin=40,
+            bottomMargin=40
+        )
+
+    # Set document metadata
+    doc.title = f"Resume - {document.name}"
+    doc.author = document.name
+    doc.subject = 'Professional Resume'
+    doc.keywords = ['resume', 'cv', 'professional']
+
+    doc.build(layout.elements)
+
+def _paginate(flowables, first_page_frames=None):
+    """
+    Count the pages the flowables fill, following the rules of a ReportLab frame:
+    space before is dropped at the top of a frame, paragraphs are split across frames and
+    FrameBreak moves on to the next frame. first_page_frames are the (x, y, width, height) frames
+    of page 1; every other page has a single full-width frame
+    """
+    frames = [(width - 2 * FRAME_PADDING, height - 2 * FRAME_PADDING) for _, _, width, height in first_page_frames or ()]
+    frames = frames or [(FRAME_WIDTH, FRAME_HEIGHT)]
+
+    frame_index = 0
+    frame_width, frame_height = frames[0]
+    used = 0.0
+
+    def next_frame():
+        nonlocal frame_index, frame_width, frame_height, used
+        frame_index += 1
+        frame_width, frame_height = frames[frame_index] if frame_index < len(frames) else (FRAME_WIDTH, FRAME_HEIGHT)
+        used = 0.0
+
+    pending = deque(flowables)
+    while pending:
+        flowable = pending.popleft()
+        if isinstance(flowable, ActionFlowable):
+            if flowable.action[0] == 'frameEnd':
+                next_frame()
+            continue
+
+        space_before = flowable.getSpaceBefore() if used else 0
+        available = frame_height - used - space_before
+        _, height = flowable.wrap(frame_width, available)
+
+        if height <= available + 1e-6:
+            used += space_before + height + flowable.getSpaceAfter()
+            continue
+
+        parts = flowable.split(frame_width, available) if available > 0 else []
+        if len(parts) > 1:
+            # The first part fills the rest of this frame, the remainder starts the next one
+            pending.extendleft(reversed(parts))
+            continue
+
+        if not used:
+            # Taller than a whole frame and cannot be split; it overflows the frame on its own
+            used = frame_height
+            continue
+
+        next_frame()
+        pending.appendleft(flowable)
+    # Page 1 holds all of its frames, every later frame is a page of its own
+    return 1 + max(0, frame_index - len(frames) + 1)
+
+def measure_layout(document, design_settings, scale=1.0, template=None):
+    """
+    Estimate the PDF layout without building a PDF
+    Flowables are measured with wrap() on the cached style set; returns the page count and the
+    height in points of every section
+    """
+    layout = pdf_template(template).layout(document, design_settings, scale)
+    sections = []
+    for section, flowables, width in layout.sections:
+        height = sum(
+            flowable.wrap(width, FRAME_HEIGHT)[1] + flowable.getSpaceBefore() + flowable.getSpaceAfter()
+            for flowable in flowables
+        )
+        sections.append({'key': section.key, 'title': section.title, 'height': round(height, 1)})
+
+    return {
+        'pages': _paginate(layout.elements, layout.first_page_frames),
+        'pageHeight': round(FRAME_HEIGHT, 1),
+        'totalHeight': round(sum(section['height'] for section in sections), 1),
+        'sections': sections,
+        'scale': scale
+    }
+
+def fit_scale(document, design_settings, target_pages, template=None):
+    """
+    Binary-search the largest scale of font sizes and spacing (down to FIT_MIN_SCALE) at which
+    the document fits on target_pages; returns FIT_MIN_SCALE when even that is not enough
+    """
+    if measure_layout(document, design_settings, template=template)['pages'] <= target_pages:
+        return 1.0
+
+    low, high = FIT_MIN_SCALE, 1.0
+    if measure_layout(document, design_settings, low, template)['pages'] > target_pages:
+        return low
+
+    for _ in range(FIT_SEARCH_STEPS):
+        middle = round((low + high) / 2, 4)
+        if measure_layout(document, design_settings, middle, template)['pages'] <= target_pages:
+            low = middle
+        else:
+            high = middle
+    return low
+
+def render_pdf_bytes(document, template, design_settings):
+    """Render the document model to PDF and return the bytes; runs inside render pool workers"""
+    output = io.BytesIO()
+    render_pdf(document, template, design_settings, output)
+    return output.getvalue()
+
+def warm_renderer():
+    """
+    Initializer of PDF render workers
+    Loads ReportLab's modules, style sheet and font metrics before the first job arrives
+    """
+    from reportlab.pdfbase import pdfmetrics
+    for font_name in ('Helvetica', 'Helvetica-Bold', 'Times-Roman', 'Times-Bold', 'Courier', 'Courier-Bold'):
+        pdfmetrics.getFont(font_name)
+    preload_fonts()
+    for template in PDF_TEMPLATES:
+        build_styles(None, template=template)
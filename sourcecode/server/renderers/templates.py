@@ -0,0 +1,110 @@
+import logging
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Tuple
+
+# Configure logging
+logging.basicConfig(level=logging.INFO,
+                    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Header layouts
+#   centered - name, headline and contact line centered on the page
+#   left     - the same lines aligned left
+#   band     - centered lines in white on a band of the primary color
+HEADER_STYLES = ('centered', 'left', 'band')
+
+# Section title decorations
+#   plain - the title alone
+#   rule  - the title over a thin line in the primary color
+SECTION_TITLE_STYLES = ('plain', 'rule')
+
+@dataclass(frozen=True)
+class TemplateSpec:
+    """
+    Declarative layout of a resume template, compiled once per process by the PDF renderer
+
+    section_order lists section keys in print order; the header always comes first and sections
+    not listed follow in document order. sidebar moves the listed sections into a narrow left
+    column on the first page. styles overrides the base paragraph styles by name, e.g.
+    {'name': {'size': 22, 'leading': 26}}; the value 'primary' stands for the design's primary color.
+    section_spacing overrides the space left after individual sections
+    """
+    name: str
+    section_order: Tuple[str, ...]
+    header: str = 'centered'
+    section_title: str = 'plain'
+    title_case: bool = False
+    sidebar: Tuple[str, ...] = ()
+    sidebar_width: float = 0.3
+    bullet: str = '•'
+    styles: Dict[str, Dict] = field(default_factory=dict)
+    section_spacing: Dict[str, float] = field(default_factory=dict)
+    default_section_spacing: Optional[float] = None
+
+    def __post_init__(self):
+        if self.header not in HEADER_STYLES:
+            raise ValueError(f'Template {self.name}: unknown header style {self.header}')
+        if self.section_title not in SECTION_TITLE_STYLES:
+            raise ValueError(f'Template {self.name}: unknown section title style {self.section_title}')
+
+DEFAULT_TEMPLATE = 'modern'
+
+TEMPLATE_SPECS = (
+    TemplateSpec(
+        name='modern',
+        section_order=('summary', 'experience', 'education', 'skills', 'projects', 'certifications', 'languages')
+    ),
+    TemplateSpec(
+        name='elegant',
+        section_order=('summary', 'experience', 'education', 'projects', 'skills', 'certifications', 'languages'),
+        section_title='rule',
+        title_case=True,
+        bullet='–',
+        styles={
+            'name': {'size': 22, 'leading': 26, 'space_after': 6, 'variant': 'regular'},
+            'headline': {'size': 11, 'textColor': 'primary'},
+            'section_title': {'size': 11, 'space_after': 1, 'variant': 'regular'},
+            'normal': {'leading': 12.5},
+            'bullet': {'leftIndent': 14, 'leading': 12.5}
+        },
+        section_spacing={'summary': 12, 'languages': 12},
+        default_section_spacing=8
+    ),
+    TemplateSpec(
+        name='professional',
+        section_order=('summary', 'experience', 'skills', 'education', 'certifications', 'projects', 'languages'),
+        header='left',
+        section_title='rule',
+        styles={
+            'name': {'size': 20, 'space_after': 4},
+            'headline': {'size': 11, 'textColor': 'primary', 'space_after': 3},
+            'contact': {'space_after': 10},
+            'section_title': {'textColor': '#222222', 'space_after': 1},
+            'bullet': {'leftIndent': 12}
+        }
+    ),
+    TemplateSpec(
+        name='creative',
+        section_order=('summary', 'experience', 'projects', 'education', 'skills', 'languages', 'certifications'),
+        header='band',
+        sidebar=('skills', 'languages', 'certifications'),
+        bullet='›',
+        styles={
+            'name': {'size': 22, 'leading': 26, 'space_after': 4},
+            'contact': {'space_after': 0},
+            'section_title': {'size': 11},
+            'bullet': {'leftIndent': 12}
+        }
+    )
+)
+
+TEMPLATES = {spec.name: spec for spec in TEMPLATE_SPECS}
+
+def get_template(name):
+    """Return the spec of a template by name; unknown or missing names use the default template"""
+    spec = TEMPLATES.get(str(name).lower()) if name else None
+    if spec is None:
+        if name:
+            logger.warning(f'Unknown template {name}, using {DEFAULT_TEMPLATE}')
+        spec = TEMPLATES[DEFAULT_TEMPLATE]
+    return spec
@@ -0,0 +1,83 @@
+import logging
+from renderers.output import open_output
+
+# Configure logging
+logging.basicConfig(level=logging.INFO,
+                    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Largest number of bytes buffered before a chunk is yielded to a streaming response;
+# every section is flushed as soon as it is written, so this only splits long sections
+TXT_CHUNK_SIZE = 4 * 1024
+
+def _sections(document):
+    # Accept the document model or any iterable of sections, e.g. iter_sections(resume)
+    return getattr(document, 'sections', document)
+
+def iter_section_lines(section, bullet='*', underline_titles=True):
+    """
+    Yield the plain-text lines of one section of the document model
+    """
+    if section.title:
+        yield section.title
+        if underline_titles:
+            yield '=' * len(section.title)
+
+    for block in section.blocks:
+        kind = block.kind
+        if kind in ('headline', 'contact'):
+            yield block.text
+            yield ''
+        elif kind == 'bullet':
+            yield f"{bullet} {block.text}"
+        elif kind == 'keyed_list':
+            yield f"{block.label}: {', '.join(run.text for run in block.runs)}"
+        elif kind == 'fields':
+            for run in block.runs:
+                yield f"{run.label}: {run.text}" if run.label else run.text
+        elif kind == 'entry_break':
+            yield ''
+        elif kind == 'image':
+            continue
+        else:
+            yield block.text
+
+    # Sections made of entries already end with a blank line
+    if section.title and not section.has_entries:
+        yield ''
+
+def iter_text_lines(document, bullet='*', underline_titles=True):
+    """
+    Yield the plain-text lines of the document model
+    """
+    for section in _sections(document):
+        yield from iter_section_lines(section, bullet, underline_titles)
+
+def iter_txt_chunks(document, chunk_size=TXT_CHUNK_SIZE):
+    """
+    Yield the UTF-8 encoded text of the document model, one chunk per section
+    document may also be an iterable of sections, so the header is sent before later sections are built;
+    sections longer than chunk_size bytes are split
+    """
+    for section in _sections(document):
+        buffer = []
+        size = 0
+        for line in iter_section_lines(section):
+            data = f"{line}\n".encode('utf-8')
+            buffer.append(data)
+            size += len(data)
+            if size >= chunk_size:
+                yield b''.join(buffer)
+                buffer = []
+                size = 0
+        if buffer:
+            yield b''.join(buffer)
+
+def render_txt(document, output):
+    """
+    Render the document model to plain text
+    output may be a file path or a writable binary file object
+    """
+    with open_output(output) as f:
+        for chunk in iter_txt_chunks(document):
+            f.write(chunk)
@@ -1,6 +1,8 @@
 #!/usr/bin/env python
 """
-Script to run both the PDF service and the Flask server
+Script to run the Flask server, and optionally the legacy Node.js PDF service
+PDFs from the HTML template are rendered in Python now; set START_NODE_PDF_SERVICE=true
+to also start server.js
 """
 import os
 import sys
@@ -9,7 +11,7 @@ import time
 import logging
 import requests
 import atexit
-from app import app
+from app import app, pdf_render_pool, html_render_pool, generation_jobs
 
 # Configure logging
 logging.basicConfig(level=logging.INFO,
@@ -125,11 +127,17 @@ def stop_pdf_service():
 atexit.register(stop_pdf_service)
 
 if __name__ == '__main__':
-    # Start the PDF service first
-    if start_pdf_service():
-        # Then start the Flask server
-        logger.info("Starting Flask server...")
-        app.run(host='0.0.0.0', port=3002, debug=True)
-    else:
-        logger.error("Failed to start PDF service. Exiting.")
-        sys.exit(1)
+    # The Node service is only needed by clients still calling its endpoints on port 3001
+    if os.environ.get('START_NODE_PDF_SERVICE', 'false').lower() == 'true':
+        # The reloader re-runs this script; only the parent process owns the Node service
+        if os.environ.get('WERKZEUG_RUN_MAIN') != 'true' and not start_pdf_service():
+            logger.error("Failed to start PDF service. Exiting.")
+            sys.exit(1)
+
+    logger.info("Starting Flask server...")
+    # Only the reloader's serving process handles requests, so only it starts render workers
+    if os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        pdf_render_pool.warm()
+        html_render_pool.warm()
+        generation_jobs.start()
+    app.run(host='0.0.0.0', port=3002, debug=True)
@@ -0,0 +1,91 @@
+#!/usr/bin/env python
+"""
+Test downloads of generated files from /artifacts
+Uses Flask's test client, so no server needs to be running
+"""
+import os
+import sys
+import tempfile
+
+TEST_DIR = tempfile.mkdtemp(prefix='artifacts-test-')
+os.environ.setdefault('GENERATION_JOBS_DB', os.path.join(TEST_DIR, 'jobs.sqlite3'))
+os.environ.setdefault('RESUME_INDEX_DB', os.path.join(TEST_DIR, 'resume_index.sqlite3'))
+os.environ.setdefault('PDF_RENDER_WORKERS', '0')
+
+from app import app
+from test_ats_controller import sample_resume
+
+def _generate(client, format_type):
+    """Generate a file and return (its bytes, its /artifacts URL)"""
+    response = client.post('/generate', json={'resumeData': sample_resume, 'format': format_type})
+    assert response.status_code == 200, response.get_data(as_text=True)
+    return response.get_data(), response.headers['Content-Location']
+
+def test_artifact_range():
+    """Test that an artifact can be downloaded in parts with Range"""
+    print("Testing Range requests on /artifacts...")
+    client = app.test_client()
+    pdf, url = _generate(client, 'pdf')
+
+    response = client.get(url)
+    assert response.status_code == 200
+    assert response.mimetype == 'application/pdf'
+    assert response.headers['Accept-Ranges'] == 'bytes'
+    assert response.get_data() == pdf
+
+    response = client.get(url, headers={'Range': 'bytes=0-99'})
+    assert response.status_code == 206
+    assert response.headers['Content-Range'] == f'bytes 0-99/{len(pdf)}'
+    head = response.get_data()
+
+    response = client.get(url, headers={'Range': 'bytes=100-'})
+    assert response.status_code == 206
+    assert head + response.get_data() == pdf
+
+    # A stale If-Range validator gets the whole file instead of a part
+    response = client.get(url, headers={'Range': 'bytes=100-', 'If-Range': '"stale"'})
+    assert response.status_code == 200
+    assert response.get_data() == pdf
+
+    print(f"✅ {url} resumes from byte 100 of {len(pdf)}")
+
+def test_artifact_not_modified():
+    """Test that a client holding the current copy gets 304"""
+    print("Testing If-None-Match on /artifacts...")
+    client = app.test_client()
+    _, url = _generate(client, 'pdf')
+
+    etag = client.head(url).headers['ETag']
+    response = client.get(url, headers={'If-None-Match': etag})
+    assert response.status_code == 304
+    assert response.get_data() == b''
+
+    print("✅ /artifacts answers 304 for the current ETag")
+
+def test_artifact_format_mismatch():
+    """Test that an artifact is only served under the extension it was generated in"""
+    print("Testing /artifacts with the wrong extension...")
+    client = app.test_client()
+    _, pdf_url = _generate(client, 'pdf')
+    txt, txt_url = _generate(client, 'txt')
+
+    assert client.get(pdf_url[:-len('.pdf')] + '.txt').status_code == 404
+    assert client.get(pdf_url[:-len('.pdf')] + '.png').status_code == 404
+    assert client.get(txt_url[:-len('.txt')] + '.pdf').status_code == 404
+
+    response = client.get(txt_url)
+    assert response.status_code == 200
+    assert response.mimetype == 'text/plain'
+    assert response.get_data() == txt
+
+    print("✅ Artifacts with the wrong extension answer 404")
+
+def main():
+    """Run all tests"""
+    test_artifact_range()
+    test_artifact_not_modified()
+    test_artifact_format_mismatch()
+    print("All tests completed!")
+
+if __name__ == '__main__':
+    sys.exit(main())
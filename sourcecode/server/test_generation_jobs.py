@@ -0,0 +1,124 @@
+#!/usr/bin/env python
+"""
+Test that background generation jobs run exactly once
+Uses Flask's test client, so no server needs to be running
+"""
+import os
+import sys
+import time
+import uuid
+import tempfile
+
+TEST_DIR = tempfile.mkdtemp(prefix='generation-jobs-test-')
+os.environ.setdefault('GENERATION_JOBS_DB', os.path.join(TEST_DIR, 'jobs.sqlite3'))
+os.environ.setdefault('RESUME_INDEX_DB', os.path.join(TEST_DIR, 'resume_index.sqlite3'))
+os.environ.setdefault('PDF_RENDER_WORKERS', '0')
+
+from app import app
+from controllers import jobs_controller
+from utils.job_store import JobStore
+from test_ats_controller import sample_resume
+
+def _wait_for_job(client, job_id, timeout=30):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        status = client.get(f'/generate/jobs/{job_id}').get_json()
+        if status['status'] in ('done', 'failed'):
+            return status
+        time.sleep(0.05)
+    return status
+
+def _count_calls(obj, name, counts, key_index=0):
+    """Replace obj.name with a wrapper counting successful calls per first argument"""
+    original = getattr(obj, name)
+
+    def counted(*args, **kwargs):
+        result = original(*args, **kwargs)
+        if result:
+            counts[args[key_index]] = counts.get(args[key_index], 0) + 1
+        return result
+
+    setattr(obj, name, counted)
+    return original
+
+def test_job_runs_once():
+    """Test that a job, including the first one after the queue starts, is claimed and rendered once"""
+    print("Testing that generation jobs run exactly once...")
+    client = app.test_client()
+    queue = jobs_controller.generation_jobs
+    claims = {}
+    renders = {}
+    original_claim = _count_calls(queue.store, 'claim', claims)
+    original_render = _count_calls(queue, '_render', renders)
+    try:
+        job_ids = []
+        for index in range(3):
+            # A name no other test uses, so the artifact is never already cached
+            resume = {**sample_resume, 'basics': {**sample_resume['basics'], 'name': f'Job Test {uuid.uuid4().hex}'}}
+            response = client.post('/generate/jobs', json={'resumeData': resume, 'format': 'txt'})
+            assert response.status_code == 202, response.get_data(as_text=True)
+            job_ids.append(response.get_json()['jobId'])
+
+        for job_id in job_ids:
+            status = _wait_for_job(client, job_id)
+            assert status['status'] == 'done', status
+
+        # Give a duplicate queue entry time to be picked up, if there were one
+        time.sleep(0.5)
+        for job_id in job_ids:
+            assert claims.get(job_id) == 1, f'job {job_id} was claimed {claims.get(job_id, 0)} times'
+        assert sum(renders.values()) == len(job_ids), f'{sum(renders.values())} renders for {len(job_ids)} jobs'
+        assert client.get(f'/generate/jobs/{job_ids[0]}/result').status_code == 200
+    finally:
+        queue.store.claim = original_claim
+        queue._render = original_render
+
+    print(f"✅ {len(job_ids)} jobs were each claimed and rendered once")
+
+def test_live_jobs_are_not_taken_over():
+    """Test that another process sharing the store only takes over jobs whose owner stopped"""
+    print("Testing take-over of unfinished jobs...")
+    queue = jobs_controller.generation_jobs
+    queue.start()
+    peer = JobStore(jobs_controller.job_store.db_path)
+
+    live_id = f'live-{uuid.uuid4().hex}'
+    queue.store.create(live_id, {}, 5, owner=queue.owner)
+    assert live_id not in [job_id for job_id, _ in peer.take_over_stale('peer', 60)]
+
+    stopped_id = f'stopped-{uuid.uuid4().hex}'
+    queue.store.create(stopped_id, {}, 5, owner='stopped-process')
+    queue.store._execute(
+        "UPDATE jobs SET status = 'running', heartbeat_at = ? WHERE id = ?", (time.time() - 120, stopped_id)
+    )
+    assert stopped_id in [job_id for job_id, _ in peer.take_over_stale('peer', 60)]
+    # The stopped owner can no longer claim or finish the job
+    assert not queue.store.claim(stopped_id, 'stopped-process')
+    assert not queue.store.update(stopped_id, owner='stopped-process', status='done')
+
+    print("✅ Only the stopped process's job was taken over")
+
+def test_invalid_priority():
+    """Test that a priority that is neither a known name nor an integer from 0 to 9 is rejected"""
+    print("Testing job priorities...")
+    client = app.test_client()
+    for priority in ([1], {'level': 1}, 'urgent', 10, -1, 2.5, True):
+        response = client.post('/generate/jobs', json={'resumeData': sample_resume, 'format': 'txt', 'priority': priority})
+        assert response.status_code == 400, (priority, response.status_code)
+        assert response.get_json()['error'] == 'Invalid priority'
+
+    for priority in ('HIGH', 'low', 0, 9):
+        response = client.post('/generate/jobs', json={'resumeData': sample_resume, 'format': 'txt', 'priority': priority})
+        assert response.status_code == 202, (priority, response.status_code)
+
+    print("✅ Invalid priorities answer 400")
+
+def main():
+    """Run all tests"""
+    test_job_runs_once()
+    test_live_jobs_are_not_taken_over()
+    test_invalid_priority()
+    print("All tests completed!")
+
+if __name__ == '__main__':
+    sys.exit(main())
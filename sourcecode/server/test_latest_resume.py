@@ -0,0 +1,122 @@
+#!/usr/bin/env python
+"""
+Test how /latest-rewritten-resume resolves the latest resume through the pointer records
+Uses Flask's test client and the in-memory bucket of test_resume_index, so no server or bucket is needed
+"""
+import os
+import sys
+import json
+import tempfile
+
+TEST_DIR = tempfile.mkdtemp(prefix='latest-resume-test-')
+os.environ.setdefault('GENERATION_JOBS_DB', os.path.join(TEST_DIR, 'jobs.sqlite3'))
+os.environ.setdefault('RESUME_INDEX_DB', os.path.join(TEST_DIR, 'resume_index.sqlite3'))
+os.environ.setdefault('AWS_S3_BUCKET', 'test-bucket')
+os.environ.setdefault('PDF_RENDER_WORKERS', '0')
+
+import utils.storage
+from app import app
+from controllers.aws_controller import resume_index
+from utils.resume_index import latest_pointer_key
+from test_resume_index import FakeS3
+
+def _with_bucket(test):
+    """Run test(client, s3) against a fresh in-memory bucket in place of the S3 client"""
+    def run():
+        s3 = FakeS3()
+        saved_client = utils.storage._client, utils.storage._client_pid
+        utils.storage._client, utils.storage._client_pid = s3, os.getpid()
+        try:
+            test(app.test_client(), s3)
+        finally:
+            utils.storage._client, utils.storage._client_pid = saved_client
+    run.__name__ = test.__name__
+    run.__doc__ = test.__doc__
+    return run
+
+def _put_resume(s3, key, name, modified):
+    s3.put(key, {'basics': {'name': name}}, modified)
+    etag = s3.get_object(Bucket=None, Key=key)['ETag']
+    return {'key': key, 'etag': etag, 'uploadedAt': modified}
+
+def _put_pointer(s3, session_id, pointer):
+    s3.put(latest_pointer_key(session_id), pointer, pointer['uploadedAt'])
+
+def _name(response):
+    return response.get_json()['basics']['name']
+
+@_with_bucket
+def test_session_pointer(client, s3):
+    """Test that a session gets the resume its pointer names, never another session's"""
+    print("Testing latest resume of a session...")
+    mine = _put_resume(s3, 'rewritten-resumes/mine.json', 'Mine', 2000)
+    newer = _put_resume(s3, 'rewritten-resumes/theirs.json', 'Theirs', 3000)
+    _put_pointer(s3, 'session-a', mine)
+    _put_pointer(s3, None, newer)
+
+    response = client.get('/latest-rewritten-resume?session=session-a')
+    assert response.status_code == 200
+    assert _name(response) == 'Mine'
+
+    response = client.get('/latest-rewritten-resume', headers={'X-Session-Id': 'session-a'})
+    assert response.status_code == 200
+    assert _name(response) == 'Mine'
+
+    # A session with nothing processed yet never falls back to the newest resume of all uploads
+    response = client.get('/latest-rewritten-resume?session=session-b')
+    assert response.status_code == 404
+
+    assert client.get('/latest-rewritten-resume?session=../_global').status_code == 400
+
+    print("✅ Sessions resolve to their own pointer")
+
+@_with_bucket
+def test_global_pointer_and_index_fallback(client, s3):
+    """Test that a request without a session uses the global pointer, then the index"""
+    print("Testing latest resume without a session...")
+    older = _put_resume(s3, 'rewritten-resumes/older.json', 'Older', 1000)
+    _put_pointer(s3, None, older)
+    response = client.get('/latest-rewritten-resume')
+    assert response.status_code == 200
+    assert _name(response) == 'Older'
+
+    # Before any pointer exists the index supplies the most recently modified resume
+    del s3.objects[latest_pointer_key()]
+    _put_resume(s3, 'rewritten-resumes/newest.json', 'Newest', 9000)
+    resume_index.sync()
+    response = client.get('/latest-rewritten-resume')
+    assert response.status_code == 200
+    assert _name(response) == 'Newest'
+
+    print("✅ Requests without a session use the global pointer, then the index")
+
+@_with_bucket
+def test_pointer_body_cache(client, s3):
+    """Test that a pointer naming an unchanged resume is answered without reading the resume again"""
+    print("Testing the resume body cache...")
+    resume = _put_resume(s3, 'rewritten-resumes/cached.json', 'Cached', 4000)
+    _put_pointer(s3, 'session-c', resume)
+
+    reads = []
+    get_object = s3.get_object
+    s3.get_object = lambda Bucket, Key: reads.append(Key) or get_object(Bucket=Bucket, Key=Key)
+
+    for _ in range(3):
+        response = client.get('/latest-rewritten-resume?session=session-c')
+        assert response.status_code == 200
+        assert _name(response) == 'Cached'
+
+    assert reads.count('rewritten-resumes/cached.json') <= 1, reads
+    assert reads.count(latest_pointer_key('session-c')) == 3, reads
+
+    print("✅ Each request read only the pointer once the body was cached")
+
+def main():
+    """Run all tests"""
+    test_session_pointer()
+    test_global_pointer_and_index_fallback()
+    test_pointer_body_cache()
+    print("All tests completed!")
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,125 @@
+#!/usr/bin/env python
+"""
+Test the PDF size optimization
+Uses Flask's test client, so no server needs to be running
+"""
+import io
+import os
+import sys
+import time
+import zipfile
+import tempfile
+from PyPDF2 import PdfReader
+from reportlab.pdfgen import canvas
+
+TEST_DIR = tempfile.mkdtemp(prefix='pdf-optimizer-test-')
+os.environ.setdefault('GENERATION_JOBS_DB', os.path.join(TEST_DIR, 'jobs.sqlite3'))
+os.environ.setdefault('RESUME_INDEX_DB', os.path.join(TEST_DIR, 'resume_index.sqlite3'))
+os.environ.setdefault('PDF_RENDER_WORKERS', '0')
+
+import utils.pdf_optimizer
+from app import app
+from utils.pdf_optimizer import optimize_pdf
+from test_ats_controller import sample_resume
+
+def _pdf_with_equal_forms():
+    """A two-page PDF whose pages each draw their own copy of the same form"""
+    output = io.BytesIO()
+    pdf = canvas.Canvas(output)
+    for name in ('first', 'second'):
+        pdf.beginForm(name)
+        for line in range(40):
+            pdf.drawString(50, 800 - line * 15, f'The same line {line} in both forms')
+        pdf.endForm()
+    for name in ('first', 'second'):
+        pdf.doForm(name)
+        pdf.showPage()
+    pdf.save()
+    return output.getvalue()
+
+def _forms(data):
+    reader = PdfReader(io.BytesIO(data))
+    return [form.idnum for page in reader.pages for form in page['/Resources']['/XObject'].values()]
+
+def test_equal_objects_written_once():
+    """Test that forms with equal content are written once and both pages still draw it"""
+    print("Testing merging of equal objects...")
+    data = _pdf_with_equal_forms()
+    assert len(set(_forms(data))) == 2
+
+    optimized, report = optimize_pdf(data)
+    assert len(set(_forms(optimized))) == 1, _forms(optimized)
+    assert report['optimizedBytes'] < report['originalBytes']
+    reader = PdfReader(io.BytesIO(optimized))
+    assert all('The same line 39' in page.extract_text() for page in reader.pages)
+
+    print(f"✅ Two equal forms written once: {report['originalBytes']} -> {report['optimizedBytes']} bytes")
+
+def test_invalid_optimize_option():
+    """Test that an optimize option that is not a known mode is rejected"""
+    print("Testing optimize options...")
+    client = app.test_client()
+    for option in ('bogus', 'gzip', [True], {'mode': 'compress'}):
+        for path in ('/generate', '/generate/jobs'):
+            response = client.post(path, json={'resumeData': sample_resume, 'format': 'pdf', 'optimize': option})
+            assert response.status_code == 400, (path, option, response.status_code)
+            assert response.get_json()['error'] == 'Invalid optimize option'
+
+    response = client.post('/generate', json={'resumeData': sample_resume, 'format': 'pdf', 'optimize': False})
+    assert response.status_code == 200
+    assert 'X-PDF-Optimized-Size' not in response.headers
+
+    print("✅ Unknown optimize options answer 400")
+
+def test_linearize_without_qpdf():
+    """Test that linearize without qpdf serves the compressed PDF under the compress key"""
+    print("Testing linearize without qpdf...")
+    client = app.test_client()
+    saved_binary = utils.pdf_optimizer.QPDF_BINARY
+    utils.pdf_optimizer.QPDF_BINARY = os.path.join(TEST_DIR, 'missing-qpdf')
+    try:
+        compressed = client.post('/generate', json={'resumeData': sample_resume, 'format': 'pdf', 'optimize': 'compress'})
+        linearized = client.post('/generate', json={'resumeData': sample_resume, 'format': 'pdf', 'optimize': 'linearize'})
+    finally:
+        utils.pdf_optimizer.QPDF_BINARY = saved_binary
+    assert compressed.status_code == linearized.status_code == 200
+    assert linearized.headers['ETag'] == compressed.headers['ETag']
+    assert linearized.headers['Content-Location'] == compressed.headers['Content-Location']
+    assert linearized.get_data() == compressed.get_data()
+
+    print("✅ Linearize without qpdf shares the compressed PDF's key")
+
+def test_bundles_and_jobs_optimize():
+    """Test that bundles and jobs return the same optimized PDF as a single-format request"""
+    print("Testing optimize in bundles and jobs...")
+    client = app.test_client()
+    single = client.post('/generate', json={'resumeData': sample_resume, 'format': 'pdf', 'optimize': True})
+    assert single.status_code == 200
+    plain = client.post('/generate', json={'resumeData': sample_resume, 'format': 'pdf'})
+    assert plain.get_data() != single.get_data()
+
+    bundle = client.post('/generate', json={'resumeData': sample_resume, 'formats': ['pdf', 'txt'], 'optimize': True})
+    assert bundle.status_code == 200
+    with zipfile.ZipFile(io.BytesIO(bundle.get_data())) as archive:
+        assert archive.read('resume.pdf') == single.get_data()
+
+    job = client.post('/generate/jobs', json={'resumeData': sample_resume, 'format': 'pdf', 'optimize': True})
+    assert job.status_code == 202
+    status_url = job.get_json()['statusUrl']
+    deadline = time.time() + 30
+    while client.get(status_url).get_json()['status'] not in ('done', 'failed') and time.time() < deadline:
+        time.sleep(0.05)
+    assert client.get(job.get_json()['resultUrl']).get_data() == single.get_data()
+
+    print("✅ Bundles and jobs return the optimized PDF")
+
+def main():
+    """Run all tests"""
+    test_equal_objects_written_once()
+    test_invalid_optimize_option()
+    test_linearize_without_qpdf()
+    test_bundles_and_jobs_optimize()
+    print("All tests completed!")
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,92 @@
+#!/usr/bin/env python
+"""
+Test the layout pre-flight estimate and fit-to-N-pages scaling against rendered PDFs
+Uses Flask's test client, so no server needs to be running
+"""
+import io
+import os
+import sys
+import tempfile
+from PyPDF2 import PdfReader
+
+TEST_DIR = tempfile.mkdtemp(prefix='preflight-test-')
+os.environ.setdefault('GENERATION_JOBS_DB', os.path.join(TEST_DIR, 'jobs.sqlite3'))
+os.environ.setdefault('RESUME_INDEX_DB', os.path.join(TEST_DIR, 'resume_index.sqlite3'))
+os.environ.setdefault('PDF_RENDER_WORKERS', '0')
+
+from app import app
+from test_ats_controller import sample_resume
+
+def _resume_with_jobs(count):
+    """The sample resume with count experience entries of five highlights each"""
+    job = sample_resume['experience'][0]
+    return {**sample_resume, 'experience': [{
+        **job,
+        'company': f'Company {index}',
+        'highlights': [
+            f'Delivered project {item} for team {index} with measurable results across several quarters'
+            for item in range(5)
+        ]
+    } for index in range(count)]}
+
+def _pdf_pages(client, resume, design_settings=None):
+    response = client.post('/generate', json={'resumeData': resume, 'format': 'pdf', 'designSettings': design_settings})
+    assert response.status_code == 200, response.get_data(as_text=True)
+    return len(PdfReader(io.BytesIO(response.get_data())).pages)
+
+def test_preflight_page_count():
+    """Test that the estimated page count matches the rendered PDF"""
+    print("Testing pre-flight page count...")
+    client = app.test_client()
+    for count in (1, 3, 5, 8):
+        resume = _resume_with_jobs(count)
+        response = client.post('/generate/preflight', json={'resumeData': resume})
+        assert response.status_code == 200, response.get_data(as_text=True)
+        estimate = response.get_json()
+        assert estimate['pages'] == _pdf_pages(client, resume), (count, estimate['pages'])
+        assert estimate['sections'], estimate
+
+    print("✅ Pre-flight page counts match the rendered PDFs")
+
+def test_fit_to_pages():
+    """Test that a resume scaled to fit one page renders on one page"""
+    print("Testing fit-to-N-pages scaling...")
+    client = app.test_client()
+    resume = _resume_with_jobs(5)
+    assert _pdf_pages(client, resume) == 2
+
+    response = client.post('/generate/preflight', json={'resumeData': resume, 'fitToPages': 1})
+    fit = response.get_json()['fit']
+    assert fit['fits'] and fit['pages'] == 1, fit
+    assert 0.7 <= fit['scale'] < 1.0, fit
+
+    assert _pdf_pages(client, resume, fit['designSettings']) == 1
+
+    print(f"✅ Scaled to {fit['scale']} the resume fits on one page")
+
+def test_preflight_invalid_target():
+    """Test that a target page count that is not a positive integer is rejected by pre-flight and /generate"""
+    print("Testing invalid fit-to-N-pages targets...")
+    client = app.test_client()
+    for target in ('two', 0.5, -1, 0, True, [1]):
+        response = client.post('/generate/preflight', json={'resumeData': sample_resume, 'fitToPages': target})
+        assert response.status_code == 400, (target, response.status_code)
+        for path in ('/generate/preflight', '/generate'):
+            response = client.post(path, json={'resumeData': sample_resume, 'designSettings': {'fitToPages': target}})
+            assert response.status_code == 400, (path, target, response.status_code)
+            assert response.get_json()['error'] == 'Invalid fitToPages'
+
+    response = client.post('/generate', json={'resumeData': sample_resume, 'designSettings': {'fitToPages': '1'}})
+    assert response.status_code == 200
+
+    print("✅ Invalid targets answer 400")
+
+def main():
+    """Run all tests"""
+    test_preflight_page_count()
+    test_fit_to_pages()
+    test_preflight_invalid_target()
+    print("All tests completed!")
+
+if __name__ == '__main__':
+    sys.exit(main())
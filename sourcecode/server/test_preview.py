@@ -0,0 +1,42 @@
+#!/usr/bin/env python
+"""
+Test the batch preview endpoint
+Uses Flask's test client, so no server needs to be running
+"""
+import os
+import sys
+import tempfile
+
+TEST_DIR = tempfile.mkdtemp(prefix='preview-test-')
+os.environ.setdefault('GENERATION_JOBS_DB', os.path.join(TEST_DIR, 'jobs.sqlite3'))
+os.environ.setdefault('RESUME_INDEX_DB', os.path.join(TEST_DIR, 'resume_index.sqlite3'))
+os.environ.setdefault('PDF_RENDER_WORKERS', '0')
+
+from app import app
+from test_ats_controller import sample_resume
+
+def test_batch_invalid_items():
+    """Test that items that are not resumes get an error each, and valid items still get their preview"""
+    print("Testing batch previews with invalid items...")
+    client = app.test_client()
+    items = [{'resumeData': sample_resume}, 5, {}, {'resumeData': 'text'}, {'resumeData': sample_resume, 'template': 'elegant'}]
+    response = client.post('/preview/batch', json={'items': items, 'width': 100})
+    assert response.status_code == 200, response.get_data(as_text=True)
+    previews = response.get_json()['previews']
+    assert len(previews) == len(items)
+
+    for index in (0, 4):
+        assert previews[index]['dataUri'].startswith('data:image/png;base64,'), previews[index]
+    for index in (1, 2, 3):
+        assert previews[index]['error'] == 'Missing data', previews[index]
+        assert 'dataUri' not in previews[index]
+
+    print("✅ Invalid items answered with errors, valid items with previews")
+
+def main():
+    """Run all tests"""
+    test_batch_invalid_items()
+    print("All tests completed!")
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,49 @@
+#!/usr/bin/env python
+"""
+Test that the render pool recovers when one of its worker processes dies
+Starts real worker processes; no server needs to be running
+"""
+import os
+import sys
+import signal
+from concurrent.futures.process import BrokenProcessPool
+from utils.render_pool import RenderPool
+
+def _worker_pid():
+    return os.getpid()
+
+def _kill_worker():
+    # What the kernel's OOM killer or a crash in a native library does to a worker
+    os.kill(os.getpid(), signal.SIGKILL)
+
+def test_pool_recovers_from_dead_worker():
+    """Test that a job killing its worker fails alone and later jobs run in a new pool"""
+    print("Testing render pool recovery after a worker dies...")
+    pool = RenderPool('test', max_workers=1, max_queue=2)
+    try:
+        first_pid = pool.run(_worker_pid, timeout=60)
+
+        try:
+            pool.run(_kill_worker, timeout=60)
+            raise AssertionError('the killed job should have failed')
+        except BrokenProcessPool:
+            pass
+
+        for _ in range(3):
+            pid = pool.run(_worker_pid, timeout=60)
+            assert pid != first_pid
+        stats = pool.stats()
+        assert stats['restarts'] == 1, stats
+        assert stats['inFlight'] == 0, stats
+    finally:
+        pool.shutdown()
+
+    print("✅ Jobs after the dead worker ran in a fresh pool")
+
+def main():
+    """Run all tests"""
+    test_pool_recovers_from_dead_worker()
+    print("All tests completed!")
+
+if __name__ == '__main__':
+    sys.exit(main())
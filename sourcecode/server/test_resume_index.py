@@ -0,0 +1,196 @@
+#!/usr/bin/env python
+"""
+Test the rewritten-resume index against an in-memory stand-in for the S3 bucket
+Uses Flask's test client, so no server or bucket is needed
+"""
+import io
+import os
+import sys
+import json
+import tempfile
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from botocore.exceptions import ClientError
+
+TEST_DIR = tempfile.mkdtemp(prefix='resume-index-test-')
+os.environ.setdefault('GENERATION_JOBS_DB', os.path.join(TEST_DIR, 'jobs.sqlite3'))
+os.environ.setdefault('RESUME_INDEX_DB', os.path.join(TEST_DIR, 'resume_index.sqlite3'))
+os.environ.setdefault('AWS_S3_BUCKET', 'test-bucket')
+os.environ.setdefault('PDF_RENDER_WORKERS', '0')
+
+from utils.resume_index import ResumeIndex
+
+class FakeS3:
+    """The calls the server makes to S3, served from a dict; listings return 1000 keys per page like S3"""
+    page_size = 1000
+
+    def __init__(self):
+        self.objects = {}
+        self.list_calls = []
+
+    def put(self, key, body, modified):
+        data = body if isinstance(body, bytes) else json.dumps(body).encode('utf-8')
+        self.objects[key] = (data, datetime.fromtimestamp(modified, timezone.utc))
+
+    def _missing(self, operation):
+        return ClientError({'Error': {'Code': 'NoSuchKey', 'Message': 'Not found'}}, operation)
+
+    def get_object(self, Bucket, Key):
+        if Key not in self.objects:
+            raise self._missing('GetObject')
+        data, modified = self.objects[Key]
+        return {'Body': io.BytesIO(data), 'ETag': f'"{hash(data) & 0xffffffff:x}"', 'LastModified': modified}
+
+    def head_object(self, Bucket, Key):
+        if Key not in self.objects:
+            raise self._missing('HeadObject')
+        return {'LastModified': self.objects[Key][1]}
+
+    def get_paginator(self, name):
+        assert name == 'list_objects_v2'
+        return self
+
+    def paginate(self, Bucket, Prefix, StartAfter=''):
+        self.list_calls.append((Prefix, StartAfter))
+        keys = sorted(key for key in self.objects if key.startswith(Prefix) and key > StartAfter)
+        for start in range(0, len(keys), self.page_size):
+            yield {'Contents': [
+                {'Key': key, 'Size': len(self.objects[key][0]), 'ETag': '"e"', 'LastModified': self.objects[key][1]}
+                for key in keys[start:start + self.page_size]
+            ]}
+        if not keys:
+            yield {'KeyCount': 0}
+
+def _resume_key(index):
+    return f'rewritten-resumes/{index:05d}.json'
+
+def _bucket_with(count):
+    s3 = FakeS3()
+    for index in range(count):
+        s3.put(_resume_key(index), {'basics': {'name': f'Candidate {index}'}}, 1000 + index)
+    return s3
+
+def _result_key():
+    # The lambda names results after the upload, which starts with a random UUID
+    return f'rewritten-resumes/{uuid.uuid4()}-resume.json'
+
+def test_sync_past_1000_keys():
+    """Test that a sync pages through more keys than one listing returns"""
+    print("Testing index sync of 2500 keys...")
+    s3 = _bucket_with(2500)
+    index = ResumeIndex(':memory:', client=s3, bucket='test-bucket', sync_interval=0)
+
+    assert index.sync() == 2500
+    assert len(index.list()) == 2500
+    assert index.latest()['Key'] == _resume_key(2499)
+    page = index.list(start_after=_resume_key(1999), limit=10)
+    assert [item['Key'] for item in page] == [_resume_key(i) for i in range(2000, 2010)]
+
+    # Keys gone from the bucket are dropped by the next sync
+    del s3.objects[_resume_key(0)]
+    assert index.sync() == 2499
+    assert index.stats()['keys'] == 2499
+
+    print("✅ 2500 keys indexed over three listing pages")
+
+def test_sync_finds_uuid_keys():
+    """Test that every new result is indexed, wherever its random key sorts in the prefix"""
+    print("Testing index sync of UUID-named results...")
+    s3 = FakeS3()
+    for index in range(200):
+        s3.put(_result_key(), {'basics': {'name': f'Candidate {index}'}}, 1000 + index)
+    index = ResumeIndex(':memory:', client=s3, bucket='test-bucket', prefixes=('rewritten-resumes/',), sync_interval=0)
+    assert index.sync() == 200
+
+    indexed = 0
+    for count in range(50):
+        key = _result_key()
+        s3.put(key, {'basics': {'name': f'New {count}'}}, 5000 + count)
+        index.sync()
+        keys = {item['Key'] for item in index.list()}
+        indexed += key in keys
+        assert index.latest()['Key'] == key
+    assert indexed == 50, f'{indexed} of 50 new results indexed'
+    assert index.stats()['keys'] == 250
+
+    print("✅ All 50 new results were indexed by the next sync")
+
+def test_list_endpoint_pages():
+    """Test that /list-rewritten-resumes pages through the index past 1000 keys"""
+    print("Testing list-rewritten-resumes past 1000 keys...")
+    import utils.storage
+    from app import app
+    from controllers.aws_controller import resume_index
+
+    s3 = _bucket_with(1200)
+    saved_client = utils.storage._client, utils.storage._client_pid
+    utils.storage._client, utils.storage._client_pid = s3, os.getpid()
+    try:
+        resume_index.sync()
+
+        client = app.test_client()
+        files = client.get('/list-rewritten-resumes').get_json()
+        assert len(files) == 1200
+        page = client.get(f'/list-rewritten-resumes?startAfter={_resume_key(1100)}&limit=50').get_json()
+        assert [item['Key'] for item in page] == [_resume_key(i) for i in range(1101, 1151)]
+    finally:
+        utils.storage._client, utils.storage._client_pid = saved_client
+
+    print(f"✅ Listed {len(files)} resumes and paged from key 1101")
+
+class BlockingS3(FakeS3):
+    """Bucket whose listings wait until release() is called"""
+
+    def __init__(self):
+        super().__init__()
+        self._released = threading.Event()
+
+    def release(self):
+        self._released.set()
+
+    def paginate(self, **params):
+        self._released.wait(10)
+        return super().paginate(**params)
+
+def test_fresh_index_answers_503():
+    """Test that lookups on an index still being filled answer 503 instead of an empty bucket"""
+    print("Testing lookups before the first sync...")
+    from app import app
+    from controllers import aws_controller
+
+    s3 = BlockingS3()
+    s3.put(_result_key(), {'basics': {'name': 'Only'}}, 1000)
+    fresh = ResumeIndex(':memory:', client=s3, bucket='test-bucket', prefixes=('rewritten-resumes/',), sync_interval=60)
+    saved_index = aws_controller.resume_index
+    aws_controller.resume_index = fresh
+    try:
+        client = app.test_client()
+        response = client.get('/list-rewritten-resumes')
+        assert response.status_code == 503
+        assert response.headers['Retry-After'] == str(aws_controller.INDEX_SYNC_RETRY_AFTER)
+
+        s3.release()
+        deadline = time.time() + 10
+        while not fresh.ensure_synced() and time.time() < deadline:
+            time.sleep(0.02)
+        response = client.get('/list-rewritten-resumes')
+        assert response.status_code == 200
+        assert len(response.get_json()) == 1
+    finally:
+        aws_controller.resume_index = saved_index
+        s3.release()
+
+    print("✅ The fresh index answered 503 until its first sync finished")
+
+def main():
+    """Run all tests"""
+    test_sync_past_1000_keys()
+    test_sync_finds_uuid_keys()
+    test_list_endpoint_pages()
+    test_fresh_index_answers_503()
+    print("All tests completed!")
+
+if __name__ == '__main__':
+    sys.exit(main())
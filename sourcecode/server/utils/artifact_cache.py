@@ -0,0 +1,188 @@
+import os
+import json
+import time
+import hashlib
+import logging
+import threading
+import uuid
+from collections import OrderedDict
+
+# Configure logging
+logging.basicConfig(level=logging.INFO,
+                    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Bump this whenever a renderer change alters the bytes produced for the same input,
+# so stale artifacts are never served after a deploy
+RENDERER_VERSION = '6'
+
+def compute_artifact_key(resume_digest, template, design_settings, format_type):
+    """
+    Compute the content-addressed key of a rendered artifact
+    The key covers everything that influences the output bytes; the resume itself is
+    represented by the digest of its input, which normalization maps deterministically
+    """
+    payload = json.dumps({
+        'resume': resume_digest,
+        'template': template,
+        'designSettings': design_settings,
+        'format': format_type,
+        'rendererVersion': RENDERER_VERSION
+    }, sort_keys=True, separators=(',', ':'), default=str)
+
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+def artifact_url(key, extension):
+    """Stable URL of a cached artifact; the key is a content hash, so the URL always means the same bytes"""
+    return f'/artifacts/{key}.{extension}'
+
+class ArtifactCache:
+    """
+    Two-tier cache of rendered artifacts
+    The memory tier is an LRU bounded by total bytes, the optional disk tier
+    keeps artifacts across restarts and is promoted into memory on a hit
+    """
+
+    def __init__(self, max_bytes, disk_dir=None):
+        self.max_bytes = max_bytes
+        self.disk_dir = disk_dir
+        self._entries = OrderedDict()
+        self._stored_at = {}
+        self._formats = {}
+        self._size = 0
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+        if self.disk_dir:
+            os.makedirs(self.disk_dir, exist_ok=True)
+
+    def _disk_path(self, key):
+        return os.path.join(self.disk_dir, key[:2], key)
+
+    def _format_path(self, key):
+        return f'{self._disk_path(key)}.format'
+
+    def get(self, key):
+        """Return the artifact bytes for a key, or None on a miss"""
+        with self._lock:
+            data = self._entries.get(key)
+            if data is not None:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return data
+
+        if self.disk_dir:
+            try:
+                with open(self._disk_path(key), 'rb') as f:
+                    data = f.read()
+            except FileNotFoundError:
+                data = None
+            except Exception as error:
+                logger.error(f'Error reading cached artifact {key}: {error}')
+                data = None
+
+            if data is not None:
+                self._remember(key, data, self._read_format(key))
+                with self._lock:
+                    self._hits += 1
+                return data
+
+        with self._lock:
+            self._misses += 1
+        return None
+
+    def path(self, key):
+        """Return the disk path of an artifact, or None if it is not stored on disk"""
+        if not self.disk_dir:
+            return None
+        path = self._disk_path(key)
+        return path if os.path.isfile(path) else None
+
+    def stored_at(self, key):
+        """Return when an artifact was stored (time.time()), or None if it is not cached"""
+        path = self.path(key)
+        if path is not None:
+            return os.path.getmtime(path)
+        with self._lock:
+            return self._stored_at.get(key)
+
+    def format(self, key):
+        """Return the file format (extension) an artifact was stored with, or None if it is unknown"""
+        with self._lock:
+            extension = self._formats.get(key)
+        if extension is not None or not self.disk_dir:
+            return extension
+        return self._read_format(key)
+
+    def _read_format(self, key):
+        # Artifacts written before formats were recorded have none and are never served by format
+        try:
+            with open(self._format_path(key)) as f:
+                return f.read().strip() or None
+        except FileNotFoundError:
+            return None
+        except Exception as error:
+            logger.error(f'Error reading the format of cached artifact {key}: {error}')
+            return None
+
+    def _write(self, path, data):
+        # Write to a temporary name first so readers never see a partial file
+        temp_path = f'{path}.{uuid.uuid4().hex}.tmp'
+        with open(temp_path, 'wb') as f:
+            f.write(data)
+        os.replace(temp_path, path)
+
+    def put(self, key, data, extension):
+        """Store artifact bytes under a key in both tiers, with the file format they are in"""
+        self._remember(key, data, extension)
+
+        if self.disk_dir:
+            path = self._disk_path(key)
+            try:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                # The format is written first, so an artifact on disk always has one
+                self._write(self._format_path(key), extension.encode('ascii'))
+                self._write(path, data)
+            except Exception as error:
+                logger.error(f'Error writing cached artifact {key}: {error}')
+
+    def _remember(self, key, data, extension):
+        size = len(data)
+        # Artifacts larger than the whole memory budget only live on disk
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size -= len(previous)
+
+            self._entries[key] = data
+            self._formats[key] = extension
+            self._stored_at.setdefault(key, time.time())
+            self._size += size
+
+            while self._size > self.max_bytes:
+                evicted_key, evicted = self._entries.popitem(last=False)
+                self._stored_at.pop(evicted_key, None)
+                self._formats.pop(evicted_key, None)
+                self._size -= len(evicted)
+
+    def stats(self):
+        """Return cache usage counters"""
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'bytes': self._size,
+                'maxBytes': self.max_bytes,
+                'hits': self._hits,
+                'misses': self._misses,
+                'diskDir': self.disk_dir
+            }
+
+# Process-wide cache shared by all generation endpoints
+artifact_cache = ArtifactCache(
+    max_bytes=int(os.environ.get('ARTIFACT_CACHE_MAX_BYTES', 64 * 1024 * 1024)),
+    disk_dir=os.environ.get('ARTIFACT_CACHE_DIR') or None
+)
@@ -0,0 +1,240 @@
+import os
+import gzip
+import zlib
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Configure logging
+logging.basicConfig(level=logging.INFO,
+                    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Bodies smaller than this are sent as they are; compression would not pay for its headers
+COMPRESSION_MIN_SIZE = int(os.environ.get('COMPRESSION_MIN_SIZE', 1024))
+
+# Buffered bodies larger than this are not compressed in memory
+COMPRESSION_MAX_SIZE = int(os.environ.get('COMPRESSION_MAX_SIZE', 16 * 1024 * 1024))
+
+# Cached variants are compressed once, so they use stronger settings than streamed bodies
+CACHED_LEVELS = {'br': 9, 'gzip': 9}
+STREAMING_LEVELS = {'br': 5, 'gzip': 6}
+
+# Content types worth compressing; PDF, DOCX, ZIP and images are compressed already
+COMPRESSIBLE_TYPES = ('text/', 'application/json', 'application/javascript', 'application/xml', 'image/svg+xml')
+
+def supported_encodings():
+    """Content codings this server can produce, in order of preference"""
+    return ('br', 'gzip') if brotli is not None else ('gzip',)
+
+def negotiate_encoding(accept_encodings):
+    """Pick the preferred encoding the client accepts from a werkzeug Accept-Encoding header"""
+    best = None
+    best_quality = 0
+    for encoding in supported_encodings():
+        quality = accept_encodings[encoding]
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+def compress(data, encoding, level):
+    if encoding == 'br':
+        return brotli.compress(data, quality=level)
+    return gzip.compress(data, compresslevel=level, mtime=0)
+
+def iter_compressed(chunks, encoding):
+    """Compress a streamed body chunk by chunk, flushing after every chunk so the client sees progress"""
+    if encoding == 'br':
+        compressor = brotli.Compressor(quality=STREAMING_LEVELS['br'])
+        for chunk in chunks:
+            data = compressor.process(chunk) + compressor.flush()
+            if data:
+                yield data
+        yield compressor.finish()
+    else:
+        # wbits=31 writes a gzip header and trailer around the deflate stream
+        compressor = zlib.compressobj(STREAMING_LEVELS['gzip'], zlib.DEFLATED, 31)
+        for chunk in chunks:
+            data = compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+            if data:
+                yield data
+        yield compressor.flush()
+
+class CompressionCache:
+    """
+    LRU of compressed response bodies bounded by total bytes
+    Keyed by the response's ETag (or a hash of its body) and encoding, so a hot response is compressed once
+    """
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            data = self._entries.get(key)
+            if data is not None:
+                self._entries.move_to_end(key)
+            return data
+
+    def put(self, key, data):
+        if len(data) > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size -= len(previous)
+            self._entries[key] = data
+            self._size += len(data)
+            while self._size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+
+    def stats(self):
+        with self._lock:
+            return {'entries': len(self._entries), 'bytes': self._size, 'maxBytes': self.max_bytes}
+
+class Compressor:
+    """
+    Response compression for a Flask app
+    Negotiates br/gzip from Accept-Encoding, compresses buffered bodies once per ETag or content
+    hash and streamed bodies on the fly, and counts the bytes saved
+    """
+
+    def __init__(self, app=None, cache_max_bytes=None):
+        self.cache = CompressionCache(
+            cache_max_bytes if cache_max_bytes is not None
+            else int(os.environ.get('COMPRESSION_CACHE_MAX_BYTES', 16 * 1024 * 1024))
+        )
+        self._lock = threading.Lock()
+        self._counters = {encoding: {'responses': 0, 'bytesIn': 0, 'bytesOut': 0} for encoding in ('br', 'gzip')}
+        self._streamed = 0
+        self._cache_hits = 0
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.after_request(self.after_request)
+
+    def _count(self, encoding, bytes_in, bytes_out):
+        with self._lock:
+            counters = self._counters[encoding]
+            counters['responses'] += 1
+            counters['bytesIn'] += bytes_in
+            counters['bytesOut'] += bytes_out
+
+    def _count_stream(self, chunks, encoding):
+        bytes_in = 0
+        bytes_out = 0
+
+        def measured(chunks):
+            nonlocal bytes_in
+            for chunk in chunks:
+                bytes_in += len(chunk)
+                yield chunk
+
+        for data in iter_compressed(measured(chunks), encoding):
+            bytes_out += len(data)
+            yield data
+
+        # Only streams that ran to completion are counted
+        self._count(encoding, bytes_in, bytes_out)
+        with self._lock:
+            self._streamed += 1
+
+    def _should_compress(self, request, response):
+        if request.method == 'HEAD' or response.status_code != 200:
+            return False
+        if 'Content-Encoding' in response.headers or 'Content-Range' in response.headers:
+            return False
+        if not (response.mimetype or '').startswith(COMPRESSIBLE_TYPES):
+            return False
+        length = response.content_length
+        if length is not None and (length < COMPRESSION_MIN_SIZE or length > COMPRESSION_MAX_SIZE):
+            return False
+        return True
+
+    def _cache_key(self, response, data, encoding):
+        etag, weak = response.get_etag()
+        if etag and not weak:
+            return f'etag:{etag}:{encoding}'
+        return f'sha256:{hashlib.sha256(data).hexdigest()}:{encoding}'
+
+    def _set_encoded_headers(self, response, encoding):
+        response.headers['Content-Encoding'] = encoding
+        response.vary.add('Accept-Encoding')
+        response.headers.pop('Accept-Ranges', None)
+        # The compressed body is a different representation, so a strong validator becomes weak
+        etag, weak = response.get_etag()
+        if etag and not weak:
+            response.set_etag(etag, weak=True)
+
+    def after_request(self, response):
+        from flask import request
+
+        if not self._should_compress(request, response):
+            return response
+        response.vary.add('Accept-Encoding')
+
+        encoding = negotiate_encoding(request.accept_encodings)
+        if encoding is None:
+            return response
+
+        # Generators (streamed TXT, JSON lines) are compressed as they are produced
+        if response.is_streamed and not response.direct_passthrough:
+            response.response = self._count_stream(response.iter_encoded(), encoding)
+            response.headers.pop('Content-Length', None)
+            self._set_encoded_headers(response, encoding)
+            return response
+
+        # File responses of known, bounded size are buffered; their content was already in memory or cache
+        if response.direct_passthrough:
+            if response.content_length is None:
+                return response
+            response.direct_passthrough = False
+
+        data = response.get_data()
+        if len(data) < COMPRESSION_MIN_SIZE:
+            return response
+
+        key = self._cache_key(response, data, encoding)
+        compressed = self.cache.get(key)
+        if compressed is None:
+            compressed = compress(data, encoding, CACHED_LEVELS[encoding])
+            self.cache.put(key, compressed)
+        else:
+            with self._lock:
+                self._cache_hits += 1
+
+        if len(compressed) >= len(data):
+            return response
+
+        self._count(encoding, len(data), len(compressed))
+        response.set_data(compressed)
+        self._set_encoded_headers(response, encoding)
+        return response
+
+    def stats(self):
+        """Return per-encoding counters, bytes saved and cache usage"""
+        with self._lock:
+            encodings = {
+                encoding: {**counters, 'bytesSaved': counters['bytesIn'] - counters['bytesOut']}
+                for encoding, counters in self._counters.items()
+            }
+            return {
+                'encodings': encodings,
+                'bytesSaved': sum(counters['bytesSaved'] for counters in encodings.values()),
+                'streamedResponses': self._streamed,
+                'cacheHits': self._cache_hits,
+                'cache': self.cache.stats(),
+                'minSize': COMPRESSION_MIN_SIZE,
+                'supportedEncodings': list(supported_encodings())
+            }
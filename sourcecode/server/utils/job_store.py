@@ -0,0 +1,159 @@
+import os
+import json
+import time
+import sqlite3
+import logging
+import threading
+
+# Configure logging
+logging.basicConfig(level=logging.INFO,
+                    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Job states; queued and running jobs are taken over by another process when theirs stops
+JOB_QUEUED = 'queued'
+JOB_RUNNING = 'running'
+JOB_DONE = 'done'
+JOB_FAILED = 'failed'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    priority INTEGER NOT NULL,
+    progress REAL NOT NULL DEFAULT 0,
+    request TEXT NOT NULL,
+    result_path TEXT,
+    result_name TEXT,
+    content_type TEXT,
+    error TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    expires_at REAL,
+    owner TEXT,
+    heartbeat_at REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, priority, created_at);
+CREATE INDEX IF NOT EXISTS jobs_expires_at ON jobs (expires_at);
+"""
+
+class JobStore:
+    """
+    SQLite-backed store of generation jobs
+    A single connection is shared by all threads and serialized with a lock. Several processes may
+    share the database: every unfinished job has an owner process that refreshes its heartbeat,
+    and only jobs whose owner has stopped are taken over
+    """
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        if db_path != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self._lock = threading.Lock()
+        # Wait for other processes' transactions instead of failing with "database is locked"
+        self._connection = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None, timeout=30)
+        self._connection.row_factory = sqlite3.Row
+        with self._lock:
+            self._connection.execute('PRAGMA journal_mode=WAL')
+            # Databases created before jobs had owners
+            columns = {row['name'] for row in self._connection.execute('PRAGMA table_info(jobs)')}
+            if columns and 'owner' not in columns:
+                self._connection.execute('ALTER TABLE jobs ADD COLUMN owner TEXT')
+                self._connection.execute('ALTER TABLE jobs ADD COLUMN heartbeat_at REAL')
+            self._connection.executescript(SCHEMA)
+
+    def _execute(self, sql, params=()):
+        with self._lock:
+            return self._connection.execute(sql, params).fetchall()
+
+    def _execute_count(self, sql, params=()):
+        with self._lock:
+            return self._connection.execute(sql, params).rowcount
+
+    def create(self, job_id, request_data, priority, owner=None):
+        now = time.time()
+        self._execute(
+            'INSERT INTO jobs (id, status, priority, request, created_at, updated_at, owner, heartbeat_at) '
+            'VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+            (job_id, JOB_QUEUED, priority, json.dumps(request_data), now, now, owner, now)
+        )
+
+    def get(self, job_id):
+        """Return the job as a dict (without its request payload), or None"""
+        rows = self._execute(
+            'SELECT id, status, priority, progress, result_path, result_name, content_type, error, '
+            'created_at, updated_at, expires_at FROM jobs WHERE id = ?',
+            (job_id,)
+        )
+        return dict(rows[0]) if rows else None
+
+    def get_request(self, job_id):
+        rows = self._execute('SELECT request FROM jobs WHERE id = ?', (job_id,))
+        return json.loads(rows[0]['request']) if rows else None
+
+    def update(self, job_id, owner=None, **fields):
+        """Update a job; with an owner, only while that owner still holds it. Returns whether it was updated"""
+        fields['updated_at'] = time.time()
+        assignments = ', '.join(f'{name} = ?' for name in fields)
+        if owner is None:
+            return self._execute_count(f'UPDATE jobs SET {assignments} WHERE id = ?', (*fields.values(), job_id)) == 1
+        return self._execute_count(
+            f'UPDATE jobs SET {assignments} WHERE id = ? AND owner = ?', (*fields.values(), job_id, owner)
+        ) == 1
+
+    def claim(self, job_id, owner):
+        """Mark a queued job of this owner running; False if it was claimed, taken over or finished already"""
+        now = time.time()
+        return self._execute_count(
+            'UPDATE jobs SET status = ?, progress = 0, updated_at = ?, heartbeat_at = ? '
+            'WHERE id = ? AND status = ? AND owner = ?',
+            (JOB_RUNNING, now, now, job_id, JOB_QUEUED, owner)
+        ) == 1
+
+    def heartbeat(self, owner):
+        """Record that the owner is alive, keeping its unfinished jobs from being taken over"""
+        self._execute(
+            'UPDATE jobs SET heartbeat_at = ? WHERE owner = ? AND status IN (?, ?)',
+            (time.time(), owner, JOB_QUEUED, JOB_RUNNING)
+        )
+
+    def take_over_stale(self, owner, stale_after):
+        """
+        Take over unfinished jobs whose owner has not sent a heartbeat for stale_after seconds
+        Running jobs are queued again. Returns (id, priority) of the jobs taken over, in queue order
+        """
+        now = time.time()
+        # Jobs without an owner were created before owners were recorded
+        stale = 'status IN (?, ?) AND (owner IS NULL OR heartbeat_at IS NULL OR heartbeat_at < ?)'
+        stale_params = (JOB_QUEUED, JOB_RUNNING, now - stale_after)
+        with self._lock:
+            # An immediate transaction keeps two processes from taking over the same job
+            self._connection.execute('BEGIN IMMEDIATE')
+            try:
+                rows = self._connection.execute(
+                    f'SELECT id, priority FROM jobs WHERE {stale} ORDER BY priority, created_at', stale_params
+                ).fetchall()
+                self._connection.execute(
+                    f'UPDATE jobs SET status = ?, owner = ?, heartbeat_at = ?, updated_at = ? WHERE {stale}',
+                    (JOB_QUEUED, owner, now, now, *stale_params)
+                )
+                self._connection.execute('COMMIT')
+            except Exception:
+                self._connection.execute('ROLLBACK')
+                raise
+        return [(row['id'], row['priority']) for row in rows]
+
+    def pop_expired(self, now=None):
+        """Delete finished jobs past their expiry time and return them"""
+        now = now or time.time()
+        with self._lock:
+            rows = self._connection.execute(
+                'SELECT id, result_path FROM jobs WHERE expires_at IS NOT NULL AND expires_at <= ?', (now,)
+            ).fetchall()
+            if rows:
+                self._connection.execute('DELETE FROM jobs WHERE expires_at IS NOT NULL AND expires_at <= ?', (now,))
+        return [dict(row) for row in rows]
+
+    def counts(self):
+        rows = self._execute('SELECT status, COUNT(*) AS count FROM jobs GROUP BY status')
+        return {row['status']: row['count'] for row in rows}
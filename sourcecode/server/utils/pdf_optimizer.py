@@ -0,0 +1,254 @@
+import io
+import os
+import shutil
+import logging
+import tempfile
+import subprocess
+
+# Configure logging
+logging.basicConfig(level=logging.INFO,
+                    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Optimization modes a request may ask for
+#   compress  - binary streams, compressed page content, shared resources and deduplicated objects
+#   linearize - the same, then linearized with qpdf for fast web view when qpdf is installed
+OPTIMIZE_MODES = ('compress', 'linearize')
+
+# qpdf executable used for linearization
+QPDF_BINARY = os.environ.get('QPDF_BINARY', 'qpdf')
+
+# Seconds qpdf may take to linearize one document
+QPDF_TIMEOUT = 20
+
+def linearization_available():
+    """Whether qpdf is installed to linearize PDFs"""
+    return shutil.which(QPDF_BINARY) is not None
+
+def parse_optimize_mode(value):
+    """
+    Map the optimize option of a request to one of OPTIMIZE_MODES, or None for no optimization
+    Raises ValueError for any other value. Without qpdf, linearize means compress, so the compressed
+    bytes are cached and tagged under one key whichever mode was asked for
+    """
+    option = str(value).lower()
+    if value is None or option in ('false', '0', 'no', 'off', ''):
+        return None
+    if option in ('true', '1', 'yes', 'compress'):
+        return 'compress'
+    if option == 'linearize':
+        return 'linearize' if linearization_available() else 'compress'
+    raise ValueError(f'optimize must be true, false or one of {", ".join(OPTIMIZE_MODES)}')
+
+def _strip_ascii85(stream):
+    """
+    Drop the ASCII85 layer ReportLab wraps around every stream by default
+    Binary streams are 20% smaller and every PDF reader handles them
+    """
+    from PyPDF2.filters import ASCII85Decode
+    from PyPDF2.generic import ArrayObject, NameObject
+
+    filters = stream.get('/Filter')
+    if filters == '/ASCII85Decode':
+        remaining = []
+    elif isinstance(filters, ArrayObject) and filters and filters[0] == '/ASCII85Decode':
+        remaining = list(filters[1:])
+    else:
+        return
+
+    stream._data = ASCII85Decode.decode(stream._data)
+    if not remaining:
+        del stream[NameObject('/Filter')]
+    elif len(remaining) == 1:
+        stream[NameObject('/Filter')] = remaining[0]
+    else:
+        stream[NameObject('/Filter')] = ArrayObject(remaining)
+
+    parameters = stream.get('/DecodeParms')
+    if isinstance(parameters, ArrayObject):
+        parameters = parameters[1:]
+        if any(parameters):
+            stream[NameObject('/DecodeParms')] = parameters[0] if len(parameters) == 1 else ArrayObject(parameters)
+        else:
+            del stream[NameObject('/DecodeParms')]
+
+def _strip_streams(root):
+    """Strip ASCII85 from every stream reachable from root, visiting shared objects once"""
+    from PyPDF2.generic import ArrayObject, DictionaryObject, EncodedStreamObject, IndirectObject
+
+    visited = set()
+    pending = [root]
+    while pending:
+        item = pending.pop()
+        if isinstance(item, IndirectObject):
+            if item.idnum in visited:
+                continue
+            visited.add(item.idnum)
+            item = item.get_object()
+        if isinstance(item, EncodedStreamObject):
+            _strip_ascii85(item)
+        if isinstance(item, DictionaryObject):
+            # /Parent points back up the page tree
+            pending.extend(value for key, value in item.items() if key != '/Parent')
+        elif isinstance(item, ArrayObject):
+            pending.extend(item)
+
+def _content_key(item, canonical):
+    """Hashable content of a direct object, with references replaced by the object they were merged into"""
+    from PyPDF2.generic import ArrayObject, DictionaryObject, IndirectObject, StreamObject
+
+    if isinstance(item, IndirectObject):
+        return ('ref', canonical.get(item.idnum, item.idnum))
+    if isinstance(item, DictionaryObject):
+        entries = tuple(sorted((key, _content_key(value, canonical)) for key, value in item.items()))
+        return ('stream', entries, item._data) if isinstance(item, StreamObject) else ('dict', entries)
+    if isinstance(item, ArrayObject):
+        return ('array', tuple(_content_key(value, canonical) for value in item))
+    return (type(item).__name__, str(item))
+
+def _repoint(item, canonical, references):
+    """Replace references inside a direct object by references to the objects they were merged into"""
+    from PyPDF2.generic import ArrayObject, DictionaryObject, IndirectObject
+
+    if isinstance(item, DictionaryObject):
+        entries = list(item.items())
+    elif isinstance(item, ArrayObject):
+        entries = list(enumerate(item))
+    else:
+        return
+    for key, value in entries:
+        if isinstance(value, IndirectObject):
+            target = canonical.get(value.idnum, value.idnum)
+            if target != value.idnum:
+                item[key] = references[target]
+        else:
+            _repoint(value, canonical, references)
+
+def _merge_duplicates(reader):
+    """
+    Point references to objects with equal content at one of them, so the writer copies repeated
+    images, fonts and forms once however many pages use them
+    Objects are compared with their references already merged, so this repeats until nothing more
+    merges: two forms drawing two equal images are equal once the images are
+    """
+    from PyPDF2.generic import ArrayObject, DictionaryObject, IndirectObject
+
+    objects = {}
+    references = {}
+    pending = [value for page in reader.pages for key, value in page.items() if key != '/Parent']
+    while pending:
+        item = pending.pop()
+        if isinstance(item, IndirectObject):
+            if item.idnum in references:
+                continue
+            references[item.idnum] = item
+            idnum, item = item.idnum, item.get_object()
+            # Pages reached through links or annotations are never merged, even when they look alike
+            if isinstance(item, DictionaryObject) and item.get('/Type') in ('/Page', '/Pages'):
+                continue
+            objects[idnum] = item
+        if isinstance(item, DictionaryObject):
+            pending.extend(value for key, value in item.items() if key != '/Parent')
+        elif isinstance(item, ArrayObject):
+            pending.extend(item)
+
+    canonical = {}
+    while True:
+        first = {}
+        merged = {idnum: first.setdefault(_content_key(objects[idnum], canonical), idnum) for idnum in sorted(objects)}
+        if merged == canonical:
+            break
+        canonical = merged
+
+    if len(set(canonical.values())) < len(canonical):
+        for item in [*reader.pages, *objects.values()]:
+            _repoint(item, canonical, references)
+        logger.info(f'Merged {len(canonical) - len(set(canonical.values()))} duplicate PDF objects')
+
+def _share_resources(writer):
+    """
+    Point pages with identical resources at one shared dictionary and drop entries that only
+    repeat defaults: empty /Trans, /Rotate 0 and the obsolete /ProcSet
+    """
+    from PyPDF2.generic import DictionaryObject, NameObject
+
+    shared = {}
+    for page in writer.pages:
+        for key, default in (('/Rotate', 0), ('/Trans', {})):
+            if key in page and page[key] == default:
+                del page[NameObject(key)]
+
+        resources = page.get('/Resources')
+        if not isinstance(resources, DictionaryObject):
+            continue
+        resources = resources.get_object()
+        if '/ProcSet' in resources:
+            del resources[NameObject('/ProcSet')]
+        key = resources.hash_value()
+        if key not in shared:
+            shared[key] = writer._add_object(resources)
+        page[NameObject('/Resources')] = shared[key]
+
+def _rewrite(data):
+    from PyPDF2 import PdfReader, PdfWriter
+    from PyPDF2.generic import TextStringObject
+
+    reader = PdfReader(io.BytesIO(data))
+    writer = PdfWriter()
+    writer.pdf_header = reader.pdf_header.encode('ascii')
+    for page in reader.pages:
+        _strip_streams(page.indirect_reference)
+    _merge_duplicates(reader)
+    for page in reader.pages:
+        writer.add_page(page)
+    for page in writer.pages:
+        if '/Filter' not in page['/Contents'].get_object():
+            page.compress_content_streams()
+    _share_resources(writer)
+    if reader.metadata:
+        writer.add_metadata({key: value for key, value in reader.metadata.items() if isinstance(value, TextStringObject)})
+
+    output = io.BytesIO()
+    writer.write(output)
+    return output.getvalue()
+
+def _linearize(data):
+    """Linearize with qpdf, also packing objects into object streams; returns None if qpdf is not installed"""
+    executable = shutil.which(QPDF_BINARY)
+    if not executable:
+        logger.warning('qpdf is not installed; returning the PDF without linearization')
+        return None
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        source_path = os.path.join(work_dir, 'source.pdf')
+        output_path = os.path.join(work_dir, 'linearized.pdf')
+        with open(source_path, 'wb') as f:
+            f.write(data)
+        result = subprocess.run(
+            [executable, '--linearize', '--object-streams=generate', source_path, output_path],
+            capture_output=True,
+            timeout=QPDF_TIMEOUT
+        )
+        # Exit code 3 means success with warnings
+        if result.returncode not in (0, 3):
+            raise RuntimeError(f'qpdf failed: {result.stderr.decode("utf-8", "replace").strip()}')
+        with open(output_path, 'rb') as f:
+            return f.read()
+
+def optimize_pdf(data, mode='compress'):
+    """
+    Rewrite a PDF for size and return (optimized bytes, report)
+    The report holds the sizes before and after; the original is returned when it is already smaller
+    """
+    optimized = _rewrite(data)
+    linearized = False
+    if mode == 'linearize':
+        result = _linearize(optimized)
+        if result is not None:
+            optimized, linearized = result, True
+
+    if len(optimized) >= len(data) and not linearized:
+        optimized = data
+    report = {'mode': mode, 'originalBytes': len(data), 'optimizedBytes': len(optimized), 'linearized': linearized}
+    logger.info(f'Optimized PDF: {len(data)} bytes -> {len(optimized)} bytes ({mode})')
+    return optimized, report
@@ -0,0 +1,76 @@
+import io
+import os
+import shutil
+import logging
+import tempfile
+import subprocess
+from PIL import Image
+
+# Configure logging
+logging.basicConfig(level=logging.INFO,
+                    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Image formats a page can be encoded to, with their content types
+IMAGE_FORMATS = {'png': 'image/png', 'webp': 'image/webp'}
+
+# Seconds pdftoppm may take for one page
+PDFTOPPM_TIMEOUT = 20
+
+class RasterizerUnavailable(Exception):
+    """Raised when neither PyMuPDF nor pdftoppm is installed"""
+
+def _rasterize_with_pymupdf(fitz, pdf_bytes, width):
+    with fitz.open(stream=pdf_bytes, filetype='pdf') as pdf:
+        page = pdf[0]
+        zoom = width / page.rect.width
+        pixmap = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), alpha=False)
+        return Image.frombytes('RGB', (pixmap.width, pixmap.height), pixmap.samples)
+
+def _rasterize_with_pdftoppm(executable, pdf_bytes, width):
+    with tempfile.TemporaryDirectory() as work_dir:
+        pdf_path = os.path.join(work_dir, 'page.pdf')
+        with open(pdf_path, 'wb') as f:
+            f.write(pdf_bytes)
+        subprocess.run(
+            [executable, '-f', '1', '-l', '1', '-singlefile', '-png',
+             '-scale-to-x', str(width), '-scale-to-y', '-1', pdf_path, os.path.join(work_dir, 'page')],
+            check=True,
+            capture_output=True,
+            timeout=PDFTOPPM_TIMEOUT
+        )
+        with Image.open(os.path.join(work_dir, 'page.png')) as image:
+            return image.convert('RGB')
+
+def available_rasterizer():
+    """Return the name of the rasterizer that will be used, or None if none is installed"""
+    try:
+        import fitz  # noqa: F401
+        return 'pymupdf'
+    except ImportError:
+        pass
+    return 'pdftoppm' if shutil.which('pdftoppm') else None
+
+def rasterize_first_page(pdf_bytes, width, image_format='png'):
+    """
+    Render page 1 of a PDF to an image exactly width pixels wide and return the encoded bytes
+    Uses PyMuPDF when it is installed and falls back to poppler's pdftoppm
+    """
+    try:
+        import fitz
+        image = _rasterize_with_pymupdf(fitz, pdf_bytes, width)
+    except ImportError:
+        executable = shutil.which('pdftoppm')
+        if not executable:
+            raise RasterizerUnavailable('No PDF rasterizer installed; install PyMuPDF or poppler-utils')
+        image = _rasterize_with_pdftoppm(executable, pdf_bytes, width)
+
+    if image.width != width:
+        image = image.resize((width, max(1, round(image.height * width / image.width))), Image.LANCZOS)
+
+    output = io.BytesIO()
+    if image_format == 'webp':
+        image.save(output, 'WEBP', quality=80, method=4)
+    else:
+        image.save(output, 'PNG', optimize=True)
+    return output.getvalue()
@@ -0,0 +1,185 @@
+import os
+import time
+import atexit
+import logging
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+
+# Configure logging
+logging.basicConfig(level=logging.INFO,
+                    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+class RenderQueueFull(Exception):
+    """Raised when a job is submitted while the pool's queue is at capacity"""
+
+    def __init__(self, message, retry_after):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+class RenderTimeout(Exception):
+    """Raised when a job does not finish before its deadline"""
+
+def _run_before_deadline(deadline, fn, *args):
+    # Runs in the worker: jobs that waited in the queue past their deadline are dropped unrendered
+    if deadline is not None and time.time() > deadline:
+        raise RenderTimeout('Deadline expired before the job started')
+    return fn(*args)
+
+def _noop():
+    return None
+
+class RenderPool:
+    """
+    Pool of pre-warmed worker processes for CPU-bound rendering
+    The number of jobs in flight is bounded; once workers and queue are full new jobs are
+    rejected immediately so the caller can shed load instead of piling up requests.
+    When a worker dies (killed for memory, crashed in a native library) the executor is broken
+    for good, so it is discarded and the next job starts a fresh one
+    """
+
+    def __init__(self, name, max_workers, max_queue, initializer=None, start_method='spawn'):
+        self.name = name
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.initializer = initializer
+        self.start_method = start_method
+        self._executor = None
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._submitted = 0
+        self._completed = 0
+        self._rejected = 0
+        self._timed_out = 0
+        self._restarts = 0
+        self._total_seconds = 0.0
+
+    @property
+    def enabled(self):
+        return self.max_workers > 0
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                logger.info(f'Starting {self.name} render pool with {self.max_workers} workers')
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context(self.start_method),
+                    initializer=self.initializer
+                )
+            return self._executor
+
+    def _discard_executor(self, executor):
+        """Drop a broken executor so the next job creates a new one; later callers with the same one are no-ops"""
+        with self._lock:
+            if self._executor is not executor:
+                return
+            self._executor = None
+            self._restarts += 1
+        logger.warning(f'{self.name} render pool is broken (a worker died); starting a new one for the next job')
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def warm(self):
+        """Start every worker process now so the first requests don't pay for imports and font loading"""
+        if not self.enabled:
+            return
+        executor = self._get_executor()
+        for future in [executor.submit(_noop) for _ in range(self.max_workers)]:
+            future.result()
+        logger.info(f'{self.name} render pool warmed up')
+
+    def _job_done(self, executor, started, future):
+        with self._lock:
+            self._in_flight -= 1
+            if not future.cancelled():
+                self._completed += 1
+                self._total_seconds += time.monotonic() - started
+        if not future.cancelled() and isinstance(future.exception(), BrokenProcessPool):
+            self._discard_executor(executor)
+
+    def submit(self, fn, *args, deadline=None):
+        """
+        Submit a job that should finish before the given time.time() deadline
+        Raises RenderQueueFull when the pool is saturated
+        """
+        with self._lock:
+            if self._in_flight >= self.max_workers + self.max_queue:
+                self._rejected += 1
+                raise RenderQueueFull(f'{self.name} render queue is full', retry_after=self.retry_after())
+            self._in_flight += 1
+            self._submitted += 1
+
+        started = time.monotonic()
+        try:
+            executor = self._get_executor()
+            try:
+                future = executor.submit(_run_before_deadline, deadline, fn, *args)
+            except BrokenProcessPool:
+                # A worker died since the last job; the job never ran, so submit it to a new pool
+                self._discard_executor(executor)
+                executor = self._get_executor()
+                future = executor.submit(_run_before_deadline, deadline, fn, *args)
+        except Exception:
+            with self._lock:
+                self._in_flight -= 1
+            raise
+        future.add_done_callback(lambda done: self._job_done(executor, started, done))
+        return future
+
+    def run(self, fn, *args, timeout):
+        """Run a job in the pool and wait for its result for at most timeout seconds"""
+        future = self.submit(fn, *args, deadline=time.time() + timeout)
+        try:
+            return future.result(timeout=timeout)
+        except FutureTimeoutError:
+            future.cancel()
+            with self._lock:
+                self._timed_out += 1
+            raise RenderTimeout(f'{self.name} render did not finish within {timeout} seconds')
+
+    def retry_after(self):
+        """Seconds a rejected client should wait, estimated from the average job duration"""
+        average = self._total_seconds / self._completed if self._completed else 1.0
+        return max(1, int(round(average * (self.max_queue / max(1, self.max_workers) + 1))))
+
+    def stats(self):
+        """Return queue depth and job counters"""
+        with self._lock:
+            return {
+                'name': self.name,
+                'workers': self.max_workers,
+                'maxQueue': self.max_queue,
+                'inFlight': self._in_flight,
+                'queueDepth': max(0, self._in_flight - self.max_workers),
+                'submitted': self._submitted,
+                'completed': self._completed,
+                'rejected': self._rejected,
+                'timedOut': self._timed_out,
+                'restarts': self._restarts,
+                'averageSeconds': round(self._total_seconds / self._completed, 4) if self._completed else None
+            }
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+def create_render_pool(name, env_prefix, initializer=None, default_workers=None):
+    """
+    Create a render pool configured from <env_prefix>_WORKERS, <env_prefix>_QUEUE and
+    RENDER_POOL_START_METHOD; zero workers disables the pool
+    """
+    workers = int(os.environ.get(f'{env_prefix}_WORKERS', default_workers if default_workers is not None else (os.cpu_count() or 2)))
+    queue = int(os.environ.get(f'{env_prefix}_QUEUE', workers * 2))
+    pool = RenderPool(
+        name,
+        max_workers=workers,
+        max_queue=queue,
+        initializer=initializer,
+        start_method=os.environ.get('RENDER_POOL_START_METHOD', 'spawn')
+    )
+    atexit.register(pool.shutdown)
+    return pool
@@ -0,0 +1,280 @@
+import os
+import re
+import time
+import sqlite3
+import logging
+import threading
+from datetime import datetime, timezone
+from utils.storage import get_bucket, get_s3_client
+
+# Configure logging
+logging.basicConfig(level=logging.INFO,
+                    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Prefix the lambda writes rewritten resumes under, and the prefix of the uploads it reads
+REWRITTEN_PREFIX = 'rewritten-resumes/'
+UPLOAD_PREFIX = 'textract-output/'
+
+# Prefixes indexed besides REWRITTEN_PREFIX; older deployments wrote resumes under these
+LEGACY_PREFIXES = ('rewritten_resumes/', 'rewrittenresumes/', 'rewritten-resume/', 'rewritten/')
+
+# The lambda keeps one pointer object per session at latest-pointers/<session>.json, naming the
+# newest resume rewritten for it, and one for all uploads at latest-pointers/_global.json
+LATEST_POINTER_PREFIX = 'latest-pointers/'
+GLOBAL_POINTER = '_global'
+SESSION_ID = re.compile('[A-Za-z0-9][A-Za-z0-9_-]{0,127}')
+
+# Uploads are stored as <uuid>-<original file name>
+UPLOAD_NAME = re.compile('[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}-(.+)')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS resumes (
+    key TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    etag TEXT,
+    last_modified REAL NOT NULL,
+    upload_key TEXT,
+    file_name TEXT,
+    candidate_name TEXT,
+    generation INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS resumes_last_modified ON resumes (last_modified);
+CREATE INDEX IF NOT EXISTS resumes_upload_key ON resumes (upload_key);
+CREATE TABLE IF NOT EXISTS uploads (
+    upload_key TEXT PRIMARY KEY,
+    result_key TEXT,
+    file_name TEXT,
+    content_type TEXT,
+    uploaded_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS sync_state (
+    name TEXT PRIMARY KEY,
+    value REAL NOT NULL
+);
+"""
+
+UPSERT = """
+INSERT INTO resumes (key, size, etag, last_modified, upload_key, file_name, generation)
+VALUES (?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (key) DO UPDATE SET
+    size = excluded.size,
+    etag = excluded.etag,
+    last_modified = excluded.last_modified,
+    candidate_name = CASE WHEN resumes.etag IS excluded.etag THEN resumes.candidate_name END,
+    generation = MAX(resumes.generation, excluded.generation)
+"""
+
+def result_key_for(key):
+    """
+    Key the lambda writes the rewritten resume of key to
+    Upload keys map textract-output/<name>.<ext> to rewritten-resumes/<name>.json; rewritten-resume
+    keys map to themselves and bare names are taken as names under rewritten-resumes/
+    """
+    if key.startswith((REWRITTEN_PREFIX,) + LEGACY_PREFIXES):
+        return key
+    name = key[len(UPLOAD_PREFIX):] if key.startswith(UPLOAD_PREFIX) else key
+    stem, dot, extension = name.rpartition('.')
+    if dot and extension.lower() == 'pdf':
+        name = f'{stem}.json'
+    return f'{REWRITTEN_PREFIX}{name}'
+
+def derive_fields(key):
+    """
+    Return (upload key, original file name) of a rewritten resume key
+    The lambda writes textract-output/<name>.pdf to rewritten-resumes/<name>.json
+    """
+    if not key.startswith(REWRITTEN_PREFIX):
+        return None, None
+    stem = key[len(REWRITTEN_PREFIX):]
+    upload_name = f'{stem[:-len(".json")] if stem.endswith(".json") else stem}.pdf'
+    match = UPLOAD_NAME.fullmatch(upload_name)
+    return f'{UPLOAD_PREFIX}{upload_name}', match.group(1) if match else upload_name
+
+def latest_pointer_key(session_id=None):
+    """Key of the latest-resume pointer of a session, or of the global pointer"""
+    return f'{LATEST_POINTER_PREFIX}{session_id or GLOBAL_POINTER}.json'
+
+def _timestamp(value):
+    return value.timestamp() if isinstance(value, datetime) else float(value)
+
+def _as_listing(row):
+    """Shape an index row like an entry of list_objects_v2's Contents"""
+    return {
+        'Key': row['key'],
+        'LastModified': datetime.fromtimestamp(row['last_modified'], timezone.utc),
+        'ETag': row['etag'],
+        'Size': row['size']
+    }
+
+class ResumeIndex:
+    """
+    SQLite index of the rewritten resumes in the bucket: key, size, ETag, LastModified and
+    fields derived from them. Listing and latest-resume lookups are answered from it instead of
+    listing the bucket on every request
+
+    A sync, run by a background thread, lists the indexed prefixes in full page by page, upserts each
+    page in its own transaction, then drops keys the listing no longer returned. Result keys start with
+    a random UUID, so a listing that starts after the last key seen would miss most new resumes.
+    Objects the server reads or writes are recorded immediately, so the index does not wait for the
+    next sync to learn about them
+    """
+
+    def __init__(self, db_path, client=None, bucket=None, prefixes=(REWRITTEN_PREFIX,) + LEGACY_PREFIXES, sync_interval=300):
+        self.db_path = db_path
+        self._client = client
+        self._bucket = bucket
+        self.prefixes = prefixes
+        self.sync_interval = sync_interval
+        if db_path != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+        self._syncer = None
+        self._connection = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self._connection.row_factory = sqlite3.Row
+        with self._lock:
+            self._connection.execute('PRAGMA journal_mode=WAL')
+            self._connection.executescript(SCHEMA)
+            # Indexes created before uploads recorded their result key
+            columns = {row['name'] for row in self._connection.execute('PRAGMA table_info(uploads)')}
+            if 'result_key' not in columns:
+                self._connection.execute('ALTER TABLE uploads ADD COLUMN result_key TEXT')
+            self._connection.execute('CREATE INDEX IF NOT EXISTS uploads_result_key ON uploads (result_key)')
+
+    @property
+    def client(self):
+        return self._client or get_s3_client()
+
+    @property
+    def bucket(self):
+        return self._bucket or get_bucket()
+
+    def _execute(self, sql, params=()):
+        with self._lock:
+            return self._connection.execute(sql, params).fetchall()
+
+    def _state(self, name):
+        rows = self._execute('SELECT value FROM sync_state WHERE name = ?', (name,))
+        return rows[0]['value'] if rows else None
+
+    def _set_state(self, name, value):
+        self._execute('INSERT OR REPLACE INTO sync_state (name, value) VALUES (?, ?)', (name, value))
+
+    def _upsert_many(self, objects, generation):
+        rows = []
+        for item in objects:
+            upload_key, file_name = derive_fields(item['Key'])
+            rows.append((
+                item['Key'], item['Size'], item.get('ETag'), _timestamp(item['LastModified']),
+                upload_key, file_name, generation
+            ))
+        with self._lock:
+            self._connection.execute('BEGIN')
+            try:
+                self._connection.executemany(UPSERT, rows)
+                self._connection.execute('COMMIT')
+            except Exception:
+                self._connection.execute('ROLLBACK')
+                raise
+
+    def sync(self):
+        """List the indexed prefixes and bring the index up to date; returns the number of keys seen"""
+        with self._sync_lock:
+            started = time.time()
+            # Rows recorded by write-through during the sync get a later generation and survive the sweep
+            generation = time.time_ns()
+            seen = 0
+            paginator = self.client.get_paginator('list_objects_v2')
+            for prefix in self.prefixes:
+                for page in paginator.paginate(Bucket=self.bucket, Prefix=prefix):
+                    objects = [item for item in page.get('Contents', []) if not item['Key'].endswith('/')]
+                    if objects:
+                        self._upsert_many(objects, generation)
+                        seen += len(objects)
+
+            with self._lock:
+                removed = self._connection.execute('DELETE FROM resumes WHERE generation < ?', (generation,)).rowcount
+            self._set_state('synced_at', time.time())
+            logger.info(f'Resume index synced: {seen} keys, {removed} removed in {time.time() - started:.2f}s')
+            return seen
+
+    def start(self):
+        """Start the background sync thread; calling it again is a no-op"""
+        with self._lock:
+            if self._syncer is not None or not self.sync_interval:
+                return
+            self._syncer = threading.Thread(target=self._run_syncer, name='resume-index-sync', daemon=True)
+        self._syncer.start()
+
+    def _run_syncer(self):
+        while True:
+            try:
+                self.sync()
+            except Exception as error:
+                logger.error(f'Resume index sync failed: {error}')
+            time.sleep(self.sync_interval)
+
+    def ensure_synced(self):
+        """
+        Keep the index current in the background; returns False until the first sync has finished
+        A fresh index is filled by the background thread, so no request waits for a full listing;
+        only with background syncs disabled does the first sync run in the caller
+        """
+        self.start()
+        if self._state('synced_at') is not None:
+            return True
+        if self._syncer is None:
+            self.sync()
+            return True
+        return False
+
+    def record_object(self, key, size, etag, last_modified, candidate_name=None):
+        """Write-through of an object the server has just read or written"""
+        self._upsert_many([{'Key': key, 'Size': size, 'ETag': etag, 'LastModified': last_modified}], time.time_ns())
+        if candidate_name:
+            self._execute('UPDATE resumes SET candidate_name = ? WHERE key = ?', (candidate_name, key))
+
+    def record_upload(self, upload_key, file_name, content_type):
+        """Write-through of a resume uploaded for rewriting; returns the key its result will be written to"""
+        result_key = result_key_for(upload_key)
+        self._execute(
+            'INSERT OR REPLACE INTO uploads (upload_key, result_key, file_name, content_type, uploaded_at) '
+            'VALUES (?, ?, ?, ?, ?)',
+            (upload_key, result_key, file_name, content_type, time.time())
+        )
+        return result_key
+
+    def find_upload(self, result_key):
+        """Return the recorded upload whose result is written to result_key, or None"""
+        rows = self._execute(
+            'SELECT upload_key, result_key, file_name, uploaded_at FROM uploads WHERE result_key = ?', (result_key,)
+        )
+        return dict(rows[0]) if rows else None
+
+    def list(self, prefix=REWRITTEN_PREFIX, start_after=None, limit=None):
+        """Return the entries under prefix in key order, like list_objects_v2"""
+        rows = self._execute(
+            'SELECT key, size, etag, last_modified FROM resumes WHERE key >= ? AND key > ? AND key < ? '
+            'ORDER BY key LIMIT ?',
+            (prefix, start_after or '', prefix + '\U0010ffff', -1 if limit is None else limit)
+        )
+        return [_as_listing(row) for row in rows]
+
+    def latest(self):
+        """Return the most recently modified resume, or None"""
+        rows = self._execute('SELECT key, size, etag, last_modified FROM resumes ORDER BY last_modified DESC LIMIT 1')
+        return _as_listing(rows[0]) if rows else None
+
+    def stats(self):
+        rows = self._execute('SELECT COUNT(*) AS keys, COALESCE(SUM(size), 0) AS bytes FROM resumes')
+        uploads = self._execute('SELECT COUNT(*) AS uploads FROM uploads')
+        synced_at = self._state('synced_at')
+        return {
+            'keys': rows[0]['keys'],
+            'bytes': rows[0]['bytes'],
+            'uploads': uploads[0]['uploads'],
+            'syncedAt': synced_at,
+            'syncAge': round(time.time() - synced_at, 1) if synced_at else None,
+            'syncInterval': self.sync_interval
+        }
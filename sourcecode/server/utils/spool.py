@@ -0,0 +1,221 @@
+import os
+import time
+import uuid
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+
+# Configure logging
+logging.basicConfig(level=logging.INFO,
+                    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Files are spread over 256 subdirectories so no single directory grows large
+SHARD_CHARS = 2
+
+# Read size used when a spooled file is streamed to a client
+SPOOL_CHUNK_SIZE = 64 * 1024
+
+class SpoolFile:
+    """Index entry of a spooled file"""
+
+    __slots__ = ('path', 'size', 'created_at', 'readers')
+
+    def __init__(self, path, size, created_at):
+        self.path = path
+        self.size = size
+        self.created_at = created_at
+        self.readers = 0
+
+class Spool:
+    """
+    Managed directory of temporary files
+    Files are allocated in sharded subdirectories and tracked in an index; a janitor thread
+    deletes files older than max_age and the oldest files once the total exceeds max_bytes.
+    Files being streamed are never deleted by the janitor
+    """
+
+    def __init__(self, name, root, max_bytes, max_age, janitor_interval=30):
+        self.name = name
+        self.root = root
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.janitor_interval = janitor_interval
+        # Oldest first, so evicting for the byte cap pops from the front
+        self._index = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self._janitor = None
+        self._counters = {'allocated': 0, 'streamedAndDeleted': 0, 'expired': 0, 'evicted': 0, 'removed': 0}
+        self._sweeps = 0
+        self._last_sweep = None
+
+        os.makedirs(self.root, exist_ok=True)
+        self._load()
+
+    def _load(self):
+        """Index files left behind by a previous process, so the caps apply to them too"""
+        found = []
+        for shard in os.scandir(self.root):
+            if not (shard.is_dir() and len(shard.name) == SHARD_CHARS):
+                continue
+            for entry in os.scandir(shard.path):
+                if entry.is_file():
+                    stat = entry.stat()
+                    found.append(SpoolFile(entry.path, stat.st_size, stat.st_mtime))
+
+        found.sort(key=lambda spool_file: spool_file.created_at)
+        with self._lock:
+            for spool_file in found:
+                self._index[spool_file.path] = spool_file
+                self._size += spool_file.size
+        if found:
+            logger.info(f'Spool {self.name}: indexed {len(found)} existing files')
+
+    def start(self):
+        """Start the janitor thread; calling it again is a no-op"""
+        with self._lock:
+            if self._janitor is not None:
+                return
+            self._janitor = threading.Thread(target=self._run_janitor, name=f'spool-janitor-{self.name}', daemon=True)
+        self._janitor.start()
+
+    def _run_janitor(self):
+        while True:
+            time.sleep(self.janitor_interval)
+            try:
+                self.sweep()
+            except Exception as error:
+                logger.error(f'Spool {self.name}: sweep failed: {error}')
+
+    def allocate(self, suffix='', name=None):
+        """
+        Return a new path in the spool for the caller to write; call commit() once it is written
+        The shard is taken from a hash of the name, so names need not be random
+        """
+        self.start()
+        name = name or uuid.uuid4().hex
+        shard = hashlib.sha1(name.encode('utf-8')).hexdigest()[:SHARD_CHARS]
+        directory = os.path.join(self.root, shard)
+        os.makedirs(directory, exist_ok=True)
+        return os.path.join(directory, f'{name}{suffix}')
+
+    def commit(self, path):
+        """Add a written file to the index and enforce the byte cap"""
+        size = os.path.getsize(path)
+        with self._lock:
+            previous = self._index.pop(path, None)
+            if previous is not None:
+                self._size -= previous.size
+            self._index[path] = SpoolFile(path, size, time.time())
+            self._size += size
+            self._counters['allocated'] += 1
+            over_cap = self._size > self.max_bytes
+        if over_cap:
+            # The file just written is kept even if it alone exceeds the cap; its caller is about to use it
+            self._evict_over_cap(keep=path)
+        return path
+
+    def remove(self, path, counter='removed'):
+        """Delete a file, whether or not it is indexed"""
+        with self._lock:
+            spool_file = self._index.pop(path, None)
+            if spool_file is not None:
+                self._size -= spool_file.size
+                self._counters[counter] += 1
+        self._unlink(path)
+
+    def _unlink(self, path):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        except Exception as error:
+            logger.error(f'Spool {self.name}: error deleting {path}: {error}')
+
+    def _take(self, predicate, counter):
+        """Drop index entries matching predicate (skipping files being read) and return their paths"""
+        taken = []
+        with self._lock:
+            for spool_file in list(self._index.values()):
+                if spool_file.readers or not predicate(spool_file):
+                    continue
+                del self._index[spool_file.path]
+                self._size -= spool_file.size
+                self._counters[counter] += 1
+                taken.append(spool_file.path)
+        return taken
+
+    def _evict_over_cap(self, keep=None):
+        def over_cap(spool_file):
+            # Called under the lock with the size already reduced by earlier evictions
+            return spool_file.path != keep and self._size > self.max_bytes
+
+        for path in self._take(over_cap, 'evicted'):
+            self._unlink(path)
+
+    def sweep(self, now=None):
+        """Delete expired files, then the oldest files until the spool is under its byte cap"""
+        now = now or time.time()
+        for path in self._take(lambda spool_file: now - spool_file.created_at >= self.max_age, 'expired'):
+            self._unlink(path)
+        self._evict_over_cap()
+        with self._lock:
+            self._sweeps += 1
+            self._last_sweep = now
+
+    def _acquire(self, path):
+        with self._lock:
+            spool_file = self._index.get(path)
+            if spool_file is not None:
+                spool_file.readers += 1
+
+    def _release(self, path):
+        with self._lock:
+            spool_file = self._index.get(path)
+            if spool_file is not None:
+                spool_file.readers -= 1
+
+    def stream(self, path, delete=True, chunk_size=SPOOL_CHUNK_SIZE):
+        """
+        Yield the contents of a spooled file; with delete, the file is removed once the last chunk is sent
+        A client that disconnects midway leaves the file to the janitor
+        """
+        self._acquire(path)
+        try:
+            with open(path, 'rb') as f:
+                while True:
+                    chunk = f.read(chunk_size)
+                    if not chunk:
+                        break
+                    yield chunk
+        finally:
+            self._release(path)
+
+        if delete:
+            self.remove(path, counter='streamedAndDeleted')
+
+    def stats(self):
+        """Return usage and deletion counters"""
+        with self._lock:
+            return {
+                'root': self.root,
+                'files': len(self._index),
+                'bytes': self._size,
+                'maxBytes': self.max_bytes,
+                'maxAge': self.max_age,
+                'oldestAge': round(time.time() - next(iter(self._index.values())).created_at, 1) if self._index else None,
+                **self._counters,
+                'sweeps': self._sweeps,
+                'lastSweepAt': self._last_sweep
+            }
+
+def create_spool(name, env_prefix, root, default_max_bytes, default_max_age):
+    """Create a spool configured from <env_prefix>_DIR, <env_prefix>_MAX_BYTES and <env_prefix>_MAX_AGE"""
+    return Spool(
+        name,
+        os.environ.get(f'{env_prefix}_DIR') or root,
+        max_bytes=int(os.environ.get(f'{env_prefix}_MAX_BYTES', default_max_bytes)),
+        max_age=int(os.environ.get(f'{env_prefix}_MAX_AGE', default_max_age))
+    )
@@ -0,0 +1,71 @@
+import os
+import logging
+import threading
+
+# Configure logging
+logging.basicConfig(level=logging.INFO,
+                    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Connections the S3 client keeps open; requests beyond this wait for a free connection
+S3_MAX_POOL_CONNECTIONS = int(os.environ.get('S3_MAX_POOL_CONNECTIONS', 50))
+
+# Seconds to establish a connection and to wait for data on one
+S3_CONNECT_TIMEOUT = float(os.environ.get('S3_CONNECT_TIMEOUT', 5))
+S3_READ_TIMEOUT = float(os.environ.get('S3_READ_TIMEOUT', 30))
+
+# Attempts per request, including the first; adaptive mode also rate-limits the client when S3 throttles
+S3_MAX_ATTEMPTS = int(os.environ.get('S3_MAX_ATTEMPTS', 5))
+
+# TCP keep-alive stops idle pooled connections from being dropped by NAT gateways and load balancers
+S3_TCP_KEEPALIVE = os.environ.get('S3_TCP_KEEPALIVE', 'true').lower() in ('1', 'true', 'yes')
+
+_client = None
+_client_pid = None
+_client_lock = threading.Lock()
+_bucket = None
+
+def create_s3_client(max_pool_connections=None):
+    """Create an S3 client with the tuned connection pool, timeouts and retries"""
+    import boto3
+    from botocore.config import Config
+
+    return boto3.client(
+        's3',
+        aws_access_key_id=os.environ.get('AWS_ACCESS_KEY_ID'),
+        aws_secret_access_key=os.environ.get('AWS_SECRET_ACCESS_KEY'),
+        region_name=os.environ.get('AWS_REGION', 'us-east-1'),
+        config=Config(
+            max_pool_connections=max_pool_connections or S3_MAX_POOL_CONNECTIONS,
+            connect_timeout=S3_CONNECT_TIMEOUT,
+            read_timeout=S3_READ_TIMEOUT,
+            retries={'mode': 'adaptive', 'total_max_attempts': S3_MAX_ATTEMPTS},
+            tcp_keepalive=S3_TCP_KEEPALIVE
+        )
+    )
+
+def get_s3_client():
+    """
+    Return the S3 client of this process, creating it on first use
+    Clients are thread-safe once created, so every thread shares its connection pool; a forked
+    worker gets a client of its own instead of the parent's sockets
+    """
+    global _client, _client_pid
+    pid = os.getpid()
+    if _client is not None and _client_pid == pid:
+        return _client
+    with _client_lock:
+        # Creating a client is not thread-safe, and concurrent first calls must share one pool
+        if _client is None or _client_pid != pid:
+            _client = create_s3_client()
+            _client_pid = pid
+            logger.info(f'Created S3 client with {S3_MAX_POOL_CONNECTIONS} pooled connections')
+        return _client
+
+def get_bucket():
+    """Return the bucket name, read from AWS_S3_BUCKET once it is set"""
+    global _bucket
+    if _bucket is None:
+        # The environment is loaded after the controllers are imported, so this is not read at import time
+        _bucket = os.environ.get('AWS_S3_BUCKET') or None
+    return _bucket
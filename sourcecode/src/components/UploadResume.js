@@ -86,15 +86,19 @@ const UploadResume = ({ onSuccess, onError }) => {
       // Check the structure of the response to extract the key correctly
       let uploadedKey;
       let fullKey = '';
+      // Key to poll for; without one the server answers with this session's latest resume
+      let pollKey;
 
       if (uploadResult.data && uploadResult.data.data && uploadResult.data.data.Key) {
         // If the structure is { data: { data: { Key: "..." } } }
         fullKey = uploadResult.data.data.Key;
+        pollKey = fullKey;
         console.log("Full S3 key from data.data.Key:", fullKey);
         uploadedKey = fullKey.split('/').pop();
       } else if (uploadResult.data && uploadResult.data.Key) {
         // If the structure is { data: { Key: "..." } }
         fullKey = uploadResult.data.Key;
+        pollKey = fullKey;
         console.log("Full S3 key from data.Key:", fullKey);
         uploadedKey = fullKey.split('/').pop();
       } else {
@@ -126,9 +130,10 @@ const UploadResume = ({ onSuccess, onError }) => {
           setProcessingAttempts(attempts);
           console.log(`Attempt ${attempts}: Fetching latest resume...`);
 
-          // Get the latest resume from S3 using the uploaded file key
-          console.log(`Fetching resume with key: ${uploadedFileKey}`);
-          const latestResume = await getLatestRewrittenResume(uploadedFileKey);
+          // Get the resume rewritten from this upload; the uploadedFileKey state is not
+          // updated inside this closure, so the key from the upload response is used
+          console.log(`Fetching resume with key: ${pollKey || "(latest of this session)"}`);
+          const latestResume = await getLatestRewrittenResume(pollKey);
 
           if (latestResume) {
             console.log("Latest resume data received:", latestResume);
@@ -1,4 +1,5 @@
 import axios from 'axios';
+import { getSessionId } from '../utils/session';
 
 const BASE_URL = 'http://localhost:3001'; // Change this to your actual backend URL if different
 
@@ -19,6 +20,10 @@ export const getRewrittenResumeByKey = async (key) => {
     const response = await axios.get(`${BASE_URL}/rewritten`, {
       params: { key },
     });
+    // 202 means the upload is still being processed
+    if (response.status === 202) {
+      return null;
+    }
     return response.data;
   } catch (error) {
     console.error("Error fetching rewritten resume by key:", error);
@@ -32,7 +37,8 @@ export const getLatestRewrittenResume = async (specificKey) => {
     console.log("Fetching latest rewritten resume from API...");
 
     // Only use a specific key if provided, otherwise let the server find the latest file
-    const params = specificKey ? { key: specificKey } : {};
+    // uploaded in this browser's session
+    const params = specificKey ? { key: specificKey } : { session: getSessionId() };
 
     console.log("Using params:", params);
 
@@ -42,6 +48,12 @@ export const getLatestRewrittenResume = async (specificKey) => {
     });
 
     console.log("Latest resume API response status:", response.status);
+
+    // 202 means the uploaded resume is still being processed; callers poll again
+    if (response.status === 202) {
+      console.log("Resume is still being processed:", response.data.resultKey);
+      return null;
+    }
     console.log("Latest resume data type:", typeof response.data);
 
     if (typeof response.data === 'object') {
@@ -1,4 +1,5 @@
 import axios from 'axios';
+import { getSessionId } from '../utils/session';
 
 const BASE_URL = 'http://localhost:3001'; // Change this to your actual backend URL if different
 
@@ -157,6 +158,11 @@ const normalizeResumeData = (resumeData) => {
 
 export const uploadResume = async (formData) => {
   try {
+    // Tie the upload to this browser's session, so the latest resume it asks for is its own
+    if (!formData.has("sessionId")) {
+      formData.append("sessionId", getSessionId());
+    }
+
     const response = await axios.post(`${BASE_URL}/upload`, formData, {
       headers: {
         "Content-Type": "multipart/form-data",
@@ -191,7 +197,9 @@ export const fetchRewrittenResume = async (key) => {
     } catch (error) {
       // If the exact key doesn't work, try to get the latest resume
       console.log("Couldn't find resume with exact key, trying to get latest resume...");
-      const latestResponse = await axios.get(`${BASE_URL}/latest-rewritten-resume`);
+      const latestResponse = await axios.get(`${BASE_URL}/latest-rewritten-resume`, {
+        params: { session: getSessionId() },
+      });
       console.log("Received latest resume data:", latestResponse.data);
       return latestResponse.data;
     }
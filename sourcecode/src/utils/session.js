@@ -0,0 +1,41 @@
+/**
+ * Helper for the upload session id
+ * The server keeps a latest-resume pointer per session, so a browser only ever
+ * gets back the resumes it uploaded itself
+ */
+
+const SESSION_STORAGE_KEY = 'resumeSessionId';
+
+// The server accepts [A-Za-z0-9][A-Za-z0-9_-]{0,127}
+const SESSION_ID_PATTERN = /^[A-Za-z0-9][A-Za-z0-9_-]{0,127}$/;
+
+const generateSessionId = () => {
+  if (window.crypto && window.crypto.randomUUID) {
+    return window.crypto.randomUUID();
+  }
+  // Fallback for browsers without crypto.randomUUID
+  return `${Date.now().toString(36)}-${Math.random().toString(36).slice(2, 12)}`;
+};
+
+/**
+ * Gets the session id of this browser, creating and persisting one on first use
+ *
+ * @returns {string} - Session id sent with uploads and latest-resume requests
+ */
+export const getSessionId = () => {
+  try {
+    const stored = localStorage.getItem(SESSION_STORAGE_KEY);
+    if (stored && SESSION_ID_PATTERN.test(stored)) {
+      return stored;
+    }
+    const sessionId = generateSessionId();
+    localStorage.setItem(SESSION_STORAGE_KEY, sessionId);
+    return sessionId;
+  } catch (error) {
+    // localStorage may be unavailable (e.g. private mode); keep the id for this page load only
+    if (!window.__resumeSessionId) {
+      window.__resumeSessionId = generateSessionId();
+    }
+    return window.__resumeSessionId;
+  }
+};